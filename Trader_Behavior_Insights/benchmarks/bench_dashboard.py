@@ -0,0 +1,165 @@
+"""Time and memory of each dashboard data path on synthetic daily_metrics.
+
+    python benchmarks/bench_dashboard.py --rows 1000000 --backend pandas duckdb
+    python benchmarks/bench_dashboard.py --rows 1000000 --save baseline.json
+    python benchmarks/bench_dashboard.py --rows 1000000 --baseline baseline.json
+
+Each step runs the same backend calls as the matching dashboard section, with
+every sidebar filter value selected (the default view) or, with ``--narrow``,
+one sentiment over the last 90 days. Times are the best of ``--repeat`` runs;
+peak memory is measured in a separate traced run (Python and numpy/pandas
+allocations only, so DuckDB's own memory is not included); each backend's
+memory breakdown is printed after its steps. With ``--baseline`` the run
+exits non-zero when a step is more than ``--tolerance`` slower than the saved
+results.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import read_daily_metrics
+from downsample import DEFAULT_MAX_POINTS, bucket_sums, lttb
+from filters import FILTER_COLUMNS, sort_by_date
+from query_backend import DuckDBBackend, PandasBackend
+from synthetic_data import write_dataset
+
+# Steps slower than the baseline by less than this are treated as noise
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def dashboard_steps(backend, selections, date_range):
+    """The backend calls behind each dashboard section, by step name."""
+    def rollup(aggs, by=None):
+        return backend.rollup(selections, date_range, aggs, by=by)
+
+    def trends():
+        time_data = rollup({'total_pnl': 'mean', 'win_rate': 'mean', 'num_trades': 'sum'}, by='date').reset_index()
+        lttb(time_data, 'date', 'total_pnl', DEFAULT_MAX_POINTS)
+        lttb(time_data, 'date', 'win_rate', DEFAULT_MAX_POINTS)
+        bucket_sums(time_data, 'date', 'num_trades', DEFAULT_MAX_POINTS)
+
+    def summary():
+        rollup({'total_pnl': 'mean'}, by='classification')['total_pnl'].idxmax()
+        rollup({'win_rate': 'mean'}, by='leverage_segment')['win_rate'].idxmax()
+
+    return {
+        'header overview': backend.overview,
+        'filter rows': lambda: backend.rows(selections, date_range),
+        'filtered totals': lambda: rollup({'rows': 'sum', 'total_pnl': 'mean', 'win_rate': 'mean', 'num_trades': 'sum'}),
+        'sentiment': lambda: rollup({'rows': 'sum'}, by='classification'),
+        'performance': lambda: backend.box_stats(selections, date_range, 'total_pnl', 'classification'),
+        'win rates': lambda: rollup({'win_rate': 'mean'}, by='classification'),
+        'leverage': lambda: rollup({'total_pnl': 'mean', 'win_rate': 'mean'}, by=['classification', 'leverage_segment']),
+        'frequency': lambda: rollup({'total_pnl': 'mean', 'num_trades': 'mean'}, by=['classification', 'frequency_segment']),
+        'trends': trends,
+        'data explorer': lambda: backend.page(selections, date_range, 0, 20, sort_col='total_pnl', ascending=False),
+        'summary insights': summary,
+    }
+
+
+def measure(fn, repeat):
+    """``(best seconds, peak traced MB, result)`` of calling ``fn``."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 2**20, result
+
+
+def load_backend(name, data_dir):
+    if name == 'pandas':
+        return PandasBackend(sort_by_date(read_daily_metrics(data_dir)))
+    return DuckDBBackend(data_dir)
+
+
+def run_backend(name, data_dir, narrow, repeat):
+    results = {}
+    load_seconds, load_mb, backend = measure(lambda: load_backend(name, data_dir), 1)
+    results['load + index'] = (load_seconds, load_mb)
+
+    selections = {col: backend.options(col) for col in FILTER_COLUMNS}
+    date_range = backend.date_bounds()
+    if narrow:
+        selections['classification'] = selections['classification'][:1]
+        date_range = (pd.Timestamp(date_range[1]) - pd.Timedelta(days=89), date_range[1])
+
+    for step, fn in dashboard_steps(backend, selections, date_range).items():
+        # The explorer caches its sort order, so only its first call is timed
+        step_repeat = 1 if step == 'data explorer' else repeat
+        seconds, peak_mb, _ = measure(fn, step_repeat)
+        results[step] = (seconds, peak_mb)
+
+    print(f"{name} backend memory after all steps:")
+    print(backend.memory_report().round(3).to_string(), end='\n\n')
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Steps slower than ``baseline`` by more than ``tolerance``, as messages."""
+    regressions = []
+    for key, (seconds, _) in results.items():
+        if key not in baseline:
+            continue
+        before = baseline[key][0]
+        if seconds > before * (1 + tolerance) and seconds - before > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{key}: {before:.4f}s -> {seconds:.4f}s ({seconds / before:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--backend', nargs='+', default=['pandas'], choices=['pandas', 'duckdb'])
+    parser.add_argument('--narrow', action='store_true', help="one sentiment over the last 90 days")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save', metavar='JSON', help="write the results for later --baseline runs")
+    parser.add_argument('--baseline', metavar='JSON', help="fail on steps slower than these saved results")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown vs --baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir, n_daily_metrics=args.rows, seed=args.seed)
+        for name in args.backend:
+            for step, value in run_backend(name, data_dir, args.narrow, args.repeat).items():
+                results[f"{name} / {step}"] = value
+
+    print(f"{'step':<36} {'time (s)':>10} {'peak (MB)':>10} {'vs baseline':>12}")
+    for key, (seconds, peak_mb) in results.items():
+        ratio = f"{seconds / baseline[key][0]:.2f}x" if key in baseline and baseline[key][0] else ''
+        print(f"{key:<36} {seconds:>10.4f} {peak_mb:>10.1f} {ratio:>12}")
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n{args.rows:,} rows; process peak RSS {max_rss_mb:,.0f} MB")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        sys.exit("Slower than baseline:\n  " + "\n  ".join(regressions))
+
+
+if __name__ == '__main__':
+    main()
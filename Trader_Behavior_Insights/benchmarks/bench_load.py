@@ -0,0 +1,100 @@
+"""Load time of daily_metrics from CSV vs the Parquet store, by row count.
+
+Also reports the in-memory size of the loaded table with plain pandas dtypes
+(object/str accounts, int64 counts) vs the compact schema, and the compact
+table's per-column breakdown for the largest row count. At each size it
+checks that the compact table holds the same values as the plain one and
+gives the same derived metrics (win rate, per-sentiment and per-segment
+means and totals), and exits with an error if not.
+
+    python benchmarks/bench_load.py --rows 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import DAILY_METRICS_CSV, DASHBOARD_COLUMNS, memory_report, parquet_available, read_daily_metrics
+from synthetic_data import write_dataset
+
+
+# Tolerances for the float32 sentiment features (about 7 significant digits)
+RTOL, ATOL = 1e-6, 1e-4
+
+
+def derived_metrics(df):
+    """The notebook's headline numbers, as one flat array."""
+    parts = [
+        [df['total_pnl'].sum(), df['num_trades'].sum(), df['win_rate'].mean()],
+        (df['winning_trades'] / df['num_trades']).to_numpy(dtype=float),
+    ]
+    for by in ['classification', 'leverage_segment', 'frequency_segment']:
+        grouped = df.groupby(df[by].astype(str), sort=True)
+        parts.append(grouped[['total_pnl', 'win_rate', 'avg_trade_size']].mean().to_numpy().ravel())
+        parts.append(grouped['num_trades'].sum().to_numpy(dtype=float))
+    return np.concatenate([np.asarray(part, dtype=float).ravel() for part in parts])
+
+
+def compact_mismatches(plain, compact):
+    """Columns (and derived metrics) where the compact table differs from the plain one."""
+    mismatches = []
+    for col in plain.columns:
+        a, b = plain[col], compact[col]
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            same = np.allclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float), rtol=RTOL, atol=ATOL, equal_nan=True)
+        elif col == 'date':
+            same = pd.to_datetime(a).equals(pd.to_datetime(b))
+        else:
+            same = a.astype(str).equals(b.astype(str))
+        if not same:
+            mismatches.append(col)
+    if not np.allclose(derived_metrics(plain), derived_metrics(compact), rtol=RTOL, atol=ATOL, equal_nan=True):
+        mismatches.append('derived metrics')
+    return mismatches
+
+
+def time_load(data_dir, fmt, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read_daily_metrics(data_dir, fmt=fmt)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not parquet_available():
+        sys.exit('pyarrow is not installed; install it to benchmark the Parquet store')
+
+    print(f"{'rows':>12} {'csv (s)':>10} {'parquet (s)':>12} {'speedup':>8} {'plain (MB)':>11} {'compact (MB)':>13}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_dataset(data_dir, n_daily_metrics=n_rows)
+            csv_s = time_load(data_dir, 'csv', args.repeat)
+            parquet_s = time_load(data_dir, 'parquet', args.repeat)
+            plain = pd.read_csv(os.path.join(data_dir, DAILY_METRICS_CSV), usecols=DASHBOARD_COLUMNS)
+            compact = read_daily_metrics(data_dir)
+        mismatches = compact_mismatches(plain, compact)
+        if mismatches:
+            sys.exit(f"Compact schema changed values at {n_rows:,} rows: {', '.join(mismatches)}")
+        plain_mb = plain.memory_usage(deep=True).sum() / 2**20
+        compact_mb = compact.memory_usage(deep=True).sum() / 2**20
+        print(f"{n_rows:>12,} {csv_s:>10.3f} {parquet_s:>12.3f} {csv_s / parquet_s:>7.1f}x {plain_mb:>11.1f} {compact_mb:>13.1f}")
+
+    print(f"\nCompact schema, {args.rows[-1]:,} rows:")
+    print(memory_report(compact).round(3).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Worker-count scaling of the sharded trades -> daily partials aggregation.
+
+    python benchmarks/bench_parallel.py --trades 2000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import parallel_partial_aggregates
+from synthetic_data import account_ids, fear_greed_index, trading_days, trades as synthetic_trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trades', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    trades = synthetic_trades(args.trades, account_ids(5_000), trading_days(fear_greed_index(), 180))
+    print(f"{args.trades:,} trades, {os.cpu_count()} CPU cores")
+    print(f"{'workers':>8} {'best (s)':>10} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            parallel_partial_aggregates(trades, workers)
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        print(f"{workers:>8} {best:>10.3f} {baseline / best:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Progressive rendering: exact aggregates vs stratified-sample estimates.
+
+    python benchmarks/bench_progressive.py --rows 100000 1000000 5000000
+
+For each size, times building the sample, the Leverage chart's roll-up and
+the Performance chart's box statistics over the filtered rows (a groupby
+scan, as a backend without the cube runs them) against their estimates from
+the sample, and reports how many exact group means fall inside the
+estimates' 95% error bars.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from box_stats import box_stats_from_frame
+from data_store import apply_schema
+from filters import sort_by_date
+from progressive import SAMPLE_ROWS, StratifiedSample
+from synthetic_data import daily_metrics
+
+AGGS = {'total_pnl': 'mean', 'win_rate': 'mean'}
+BY = ['classification', 'leverage_segment']
+
+
+def timed(fn, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--sample-rows', type=int, default=SAMPLE_ROWS)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'sample build (s)':>17} {'exact rollup (ms)':>18} {'estimate (ms)':>14} "
+          f"{'exact box (ms)':>15} {'sample box (ms)':>16} {'in 95% bars':>12}")
+    for n_rows in args.rows:
+        df = sort_by_date(apply_schema(daily_metrics(n_rows, seed=args.seed)))
+        # The middle half of the date range, so the filter cuts through strata
+        dates = df['date']
+        date_range = (dates.quantile(0.25), dates.quantile(0.75))
+
+        start = time.perf_counter()
+        sample = StratifiedSample.from_frame(df, args.sample_rows, seed=args.seed)
+        build = time.perf_counter() - start
+
+        def exact_rows():
+            return df[(dates >= date_range[0]) & (dates <= date_range[1])]
+
+        exact, exact_ms = timed(lambda: exact_rows().groupby(BY, observed=True)[list(AGGS)].mean())
+        (estimate, error), estimate_ms = timed(lambda: sample.rollup({}, date_range, AGGS, by=BY))
+        _, exact_box_ms = timed(lambda: box_stats_from_frame(exact_rows(), 'classification', 'total_pnl'))
+        _, sample_box_ms = timed(lambda: box_stats_from_frame(
+            sample.select({}, date_range), 'classification', 'total_pnl'))
+
+        exact = exact.reindex(estimate.index)
+        covered = (exact - estimate).abs() <= error
+        print(f"{n_rows:>10,} {build:>17.3f} {exact_ms:>18.1f} {estimate_ms:>14.1f} "
+              f"{exact_box_ms:>15.1f} {sample_box_ms:>16.1f} {covered.to_numpy().mean():>12.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Segment cut-points: exact ``pd.qcut`` vs merged KLL quantile sketches.
+
+    python benchmarks/bench_segments.py --rows 100000 1000000 10000000 --shards 8
+
+For each row count, times ``qcut`` on the three segment source columns
+against sketches built chunk by chunk on ``--shards`` shards and merged, and
+reports each sketched cut-point's rank error (how far its empirical quantile
+is from the target) and the share of rows whose segment differs from
+``qcut``'s. On columns with many tied values (``win_rate`` is a ratio of
+small counts) a cut one distinct value away from ``qcut``'s moves the whole
+tie group, so the relabeled share can exceed the rank error.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantile_sketch import DEFAULT_K, SEGMENTS, KLLSketch, cut_segment, segment_cuts, sketch_column
+
+
+def source_columns(n_rows, seed):
+    """Columns shaped like daily_metrics' avg_position, num_trades and win_rate."""
+    rng = np.random.default_rng(seed)
+    num_trades = rng.geometric(0.05, n_rows)
+    return pd.DataFrame({
+        'avg_position': rng.lognormal(8, 2, n_rows) * rng.choice([-1, 1], n_rows),
+        'num_trades': num_trades,
+        'win_rate': rng.binomial(num_trades, 0.45) / num_trades,
+    })
+
+
+def sharded_cuts(df, shards, k):
+    sketches = {}
+    for col in df.columns:
+        merged = KLLSketch(k)
+        for i, shard in enumerate(np.array_split(df[col].to_numpy(), shards)):
+            merged.merge(sketch_column(shard, k, seed=i))
+        sketches[col] = merged
+    return segment_cuts(sketches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--shards', type=int, default=8)
+    parser.add_argument('--k', type=int, default=DEFAULT_K)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'column':<14} {'qcut (s)':>9} {'sketch (s)':>11} {'max rank error':>15} {'rows relabeled':>15}")
+    for n_rows in args.rows:
+        df = source_columns(n_rows, args.seed)
+        start = time.perf_counter()
+        cuts = sharded_cuts(df, args.shards, args.k)
+        sketch_seconds = time.perf_counter() - start
+
+        for _, source, labels in SEGMENTS:
+            source = 'avg_position' if source == 'leverage' else source
+            values = df[source]
+            start = time.perf_counter()
+            exact = pd.qcut(values, len(labels), labels=labels)
+            qcut_seconds = time.perf_counter() - start
+
+            targets = np.arange(1, len(labels)) / len(labels)
+            sorted_values = np.sort(values.to_numpy())
+            # Share of rows below / at most the cut; with ties a cut covers a range of ranks
+            below = np.searchsorted(sorted_values, cuts[source], side='left') / len(sorted_values)
+            at_most = np.searchsorted(sorted_values, cuts[source], side='right') / len(sorted_values)
+            rank_error = np.maximum(below - targets, targets - at_most).clip(min=0)
+            relabeled = (np.asarray(cut_segment(values, cuts[source], labels)) != np.asarray(exact)).mean()
+            # The sketches of all three columns are timed together
+            sketch_cell = f"{sketch_seconds:.3f}" if source == 'avg_position' else ''
+            print(f"{n_rows:>12,} {source:<14} {qcut_seconds:>9.3f} {sketch_cell:>11} "
+                  f"{rank_error.max():>15.4f} {relabeled:>14.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Fear/Greed join: the notebook's ``merge`` on date vs the dense calendar lookup.
+
+    python benchmarks/bench_sentiment.py --rows 1000000 10000000
+
+For each size, times the ``drop_duplicates`` + left ``merge`` of the index
+onto random trade dates, and the ``SentimentCalendar`` lookup of the same
+columns (with and without the window features). The calendar build is timed
+once; it depends on the number of days, not rows.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_calendar import SENTIMENT_COLUMNS, SentimentCalendar
+from synthetic_data import fear_greed_index
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    fear_greed_df = fear_greed_index(seed=args.seed)
+    fear_greed_df['date'] = pd.to_datetime(fear_greed_df['date'])
+    start = time.perf_counter()
+    calendar = SentimentCalendar(fear_greed_df)
+    print(f"calendar build: {len(calendar):,} days in {time.perf_counter() - start:.4f}s")
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'rows':>12} {'merge (s)':>10} {'lookup (s)':>11} {'+ features (s)':>15}")
+    for n_rows in args.rows:
+        dates = fear_greed_df['date'].to_numpy()[rng.integers(0, len(fear_greed_df), n_rows)]
+        rows = pd.DataFrame({'date': dates})
+
+        def merge():
+            sentiment = fear_greed_df[['date', 'classification', 'value']].drop_duplicates('date')
+            rows.merge(sentiment, on='date', how='left')
+
+        merge_s = timed(merge)
+        lookup_s = timed(lambda: calendar.lookup(rows['date'], ['classification', 'value']))
+        features_s = timed(lambda: calendar.lookup(rows['date'], SENTIMENT_COLUMNS))
+        print(f"{n_rows:>12,} {merge_s:>10.3f} {lookup_s:>11.3f} {features_s:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
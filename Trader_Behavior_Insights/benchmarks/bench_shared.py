@@ -0,0 +1,102 @@
+"""Memory of N dashboard processes with private vs shared (memory-mapped) data.
+
+    python benchmarks/bench_shared.py --rows 1000000 --processes 4
+
+Each child process loads daily_metrics and builds the pandas query backend,
+either from the data files (a private copy each) or through
+``shared_data.load_shared`` in a temporary directory under ``/dev/shm``.
+While all children are alive, each reports its proportional set size (PSS:
+shared pages are split between the processes mapping them) and its private
+memory from ``/proc/self/smaps_rollup``, so this benchmark needs Linux.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import write_dataset
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_SCRIPT = """
+import sys
+sys.path.insert(0, {app_dir!r})
+from data_store import dataset_version, read_daily_metrics, read_fear_greed
+from filters import sort_by_date
+from query_backend import PandasBackend
+from shared_data import load_shared
+
+def read_data():
+    return {{'daily_metrics': sort_by_date(read_daily_metrics({data_dir!r})),
+             'fear_greed': read_fear_greed({data_dir!r})}}
+
+tables = load_shared({shared_dir!r}, dataset_version({data_dir!r}), ['daily_metrics', 'fear_greed'], read_data)
+backend = PandasBackend(tables['daily_metrics'])
+print('ready', flush=True)
+
+# Measure once every process has loaded
+sys.stdin.readline()
+memory = {{}}
+for line in open('/proc/self/smaps_rollup'):
+    key, _, value = line.partition(':')
+    if key in ('Pss', 'Private_Clean', 'Private_Dirty'):
+        memory[key] = int(value.split()[0])
+print(memory['Pss'], memory['Private_Clean'] + memory['Private_Dirty'], flush=True)
+sys.stdin.read()
+"""
+
+
+def measure(data_dir, shared_dir, n_processes):
+    """``[(pss MB, private MB)]`` per process, measured while all are running."""
+    script = CHILD_SCRIPT.format(app_dir=APP_DIR, data_dir=data_dir, shared_dir=shared_dir)
+    children = []
+    results = []
+    try:
+        # Started one after another, so only the first one loads into shared memory
+        for _ in range(n_processes):
+            child = subprocess.Popen([sys.executable, '-c', script], stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE, text=True)
+            children.append(child)
+            if child.stdout.readline().strip() != 'ready':
+                raise RuntimeError("child process failed to load the data")
+        for child in children:
+            child.stdin.write('\n')
+            child.stdin.flush()
+            pss_kb, private_kb = map(int, child.stdout.readline().split())
+            results.append((pss_kb / 1024, private_kb / 1024))
+        for child in children:
+            child.stdin.close()
+            child.wait()
+    finally:
+        for child in children:
+            if child.poll() is None:
+                child.kill()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir, n_daily_metrics=args.rows)
+        shared_dir = tempfile.mkdtemp(prefix='bench_shared_', dir='/dev/shm')
+        try:
+            print(f"{'data':<10} {'processes':>10} {'total PSS (MB)':>15} {'private / process (MB)':>23}")
+            for label, directory in [('private', None), ('shared', shared_dir)]:
+                results = measure(data_dir, directory, args.processes)
+                total_pss = sum(pss for pss, _ in results)
+                private = sum(priv for _, priv in results) / len(results)
+                print(f"{label:<10} {args.processes:>10} {total_pss:>15.1f} {private:>23.1f}")
+        finally:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
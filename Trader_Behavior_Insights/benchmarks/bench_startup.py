@@ -0,0 +1,97 @@
+"""Cold-start cost of the dashboard: per-import time and time to first paint.
+
+    python benchmarks/bench_startup.py --rows 100000 --repeat 5
+
+Every measurement runs in a fresh interpreter, as on a newly started pod.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import write_dataset
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTS = [
+    'numpy', 'pandas', 'pyarrow.parquet', 'streamlit', 'plotly.graph_objects', 'plotly.express', 'duckdb',
+    'data_store', 'filters', 'metrics_cube', 'query_backend', 'charts', 'figure_cache', 'stat_tests', 'pnl_model',
+]
+
+IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {app_dir!r})
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+# Time from interpreter start to the end of the first script run, which is
+# when Streamlit has sent every element of the first page to the browser
+PAINT_SCRIPT = """
+import time
+start = time.perf_counter()
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({dashboard!r}, default_timeout=600)
+at.session_state['show_all'] = {show_all!r}
+run_start = time.perf_counter()
+at.run()
+end = time.perf_counter()
+if at.exception:
+    sys.exit(at.exception[0].value)
+print(end - start, end - run_start, int('plotly.express' in sys.modules))
+"""
+
+
+def run_child(script, cwd=None):
+    result = subprocess.run([sys.executable, '-c', script], cwd=cwd, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip() or result.stdout.strip())
+    return [float(v) for v in result.stdout.split()]
+
+
+def time_import(module, repeat):
+    script = IMPORT_SCRIPT.format(app_dir=APP_DIR, module=module)
+    try:
+        return statistics.median(run_child(script)[0] for _ in range(repeat))
+    except RuntimeError:
+        return None
+
+
+def time_first_paint(data_dir, show_all, repeat):
+    script = PAINT_SCRIPT.format(dashboard=os.path.join(APP_DIR, 'dashboard.py'), show_all=show_all)
+    runs = [run_child(script, cwd=data_dir) for _ in range(repeat)]
+    total = statistics.median(r[0] for r in runs)
+    script_run = statistics.median(r[1] for r in runs)
+    return total, script_run, bool(runs[0][2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'import':<22} {'cold (ms)':>10}")
+    for module in IMPORTS:
+        seconds = time_import(module, args.repeat)
+        cost = 'missing' if seconds is None else f"{seconds * 1000:.0f}"
+        print(f"{module:<22} {cost:>10}")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir, n_daily_metrics=args.rows)
+        print()
+        print(f"{'page':<22} {'first paint (s)':>16} {'script run (s)':>15} {'plotly.express':>15}")
+        for page, show_all in [('empty state', False), ('all charts', True)]:
+            total, script_run, express_loaded = time_first_paint(data_dir, show_all, args.repeat)
+            loaded = 'loaded' if express_loaded else 'not loaded'
+            print(f"{page:<22} {total:>16.2f} {script_run:>15.2f} {loaded:>15}")
+
+
+if __name__ == '__main__':
+    main()
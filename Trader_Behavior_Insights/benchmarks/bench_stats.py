@@ -0,0 +1,69 @@
+"""Significance tests: the notebook's per-test loops vs the batched engine.
+
+    python benchmarks/bench_stats.py --rows 1000000 --workers 1 4
+
+The notebook-style run is one ``f_oneway`` per metric over ``groupby``
+lists plus ``ttest_ind`` and ``mannwhitneyu`` for every metric and sentiment
+pair; the batched run is ``stat_tests.anova`` and ``pairwise_tests``. The
+bootstrap CIs are timed for each worker count.
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import apply_schema
+from stat_tests import TEST_METRICS, GroupedArrays, anova, bootstrap_means, pairwise_tests
+from synthetic_data import daily_metrics
+
+
+def notebook_tests(df):
+    from scipy import stats
+
+    for metric in TEST_METRICS:
+        groups = [group[metric].dropna().values for _, group in df.groupby('classification', observed=True)]
+        stats.f_oneway(*groups)
+    for a, b in combinations(sorted(df['classification'].dropna().unique()), 2):
+        for metric in TEST_METRICS:
+            x = df[df['classification'] == a][metric]
+            y = df[df['classification'] == b][metric]
+            stats.ttest_ind(x, y, nan_policy='omit')
+            stats.mannwhitneyu(x.dropna(), y.dropna(), alternative='two-sided')
+
+
+def batched_tests(df):
+    grouped = GroupedArrays.from_frame(df)
+    anova(grouped)
+    pairwise_tests(grouped)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--resamples', type=int, default=1000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    df = apply_schema(daily_metrics(args.rows, seed=args.seed))
+    print(f"{'step':<32} {'time (s)':>10}")
+    print(f"{'notebook loops':<32} {timed(lambda: notebook_tests(df)):>10.3f}")
+    print(f"{'batched tests':<32} {timed(lambda: batched_tests(df)):>10.3f}")
+
+    grouped = GroupedArrays.from_frame(df)
+    for workers in dict.fromkeys(args.workers):
+        seconds = timed(lambda: bootstrap_means(grouped, args.resamples, workers=workers))
+        print(f"{f'bootstrap x{args.resamples}, {workers} worker(s)':<32} {seconds:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Trader drill-down: account index lookup vs a boolean scan of daily_metrics.
+
+    python benchmarks/bench_trader.py --rows 100000 1000000 5000000
+
+For each size, times building the account index, fetching one account's
+rows through it and with ``df[df['account'] == account]``, and the rolling
+statistics over those rows (averaged over a sample of accounts).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import apply_schema
+from filters import sort_by_date
+from synthetic_data import daily_metrics
+from trader_history import HISTORY_COLUMNS, AccountIndex, rolling_stats
+
+
+def timed(fn, accounts):
+    start = time.perf_counter()
+    for account in accounts:
+        fn(account)
+    return (time.perf_counter() - start) / len(accounts) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--lookups', type=int, default=20)
+    parser.add_argument('--window', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'index build (s)':>16} {'index (ms)':>11} {'scan (ms)':>10} {'rolling (ms)':>13}")
+    for n_rows in args.rows:
+        df = sort_by_date(apply_schema(daily_metrics(n_rows, seed=args.seed)))
+        columns = [c for c in HISTORY_COLUMNS if c in df.columns]
+        column_positions = df.columns.get_indexer(columns)
+
+        start = time.perf_counter()
+        index = AccountIndex(df['account'])
+        build = time.perf_counter() - start
+
+        rng = np.random.default_rng(args.seed)
+        accounts = rng.choice(np.asarray(index.accounts), size=min(args.lookups, len(index.accounts)), replace=False)
+        lookup = timed(lambda a: df.iloc[index.positions(a), column_positions], accounts)
+        scan = timed(lambda a: df.loc[df['account'] == a, columns], accounts)
+        rolling = timed(lambda a: rolling_stats(df.iloc[index.positions(a), column_positions], args.window), accounts)
+        print(f"{n_rows:>10,} {build:>16.3f} {lookup:>11.2f} {scan:>10.2f} {rolling:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
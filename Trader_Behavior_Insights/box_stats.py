@@ -0,0 +1,99 @@
+"""Server-side box-plot statistics.
+
+Instead of shipping every row to Plotly and letting the browser compute the
+quartiles, the dashboard computes per-group quartiles, whisker ends and a
+capped, sampled set of outliers, and draws them as precomputed box traces.
+The figure size then depends on the number of groups, not on the rows.
+
+Statistics follow Plotly's defaults: linear-interpolated quartiles and
+whiskers at the most extreme points within 1.5 IQR of the box.
+"""
+import numpy as np
+import pandas as pd
+
+MAX_OUTLIERS = 200
+STAT_COLUMNS = ['count', 'mean', 'q1', 'median', 'q3', 'lowerfence', 'upperfence']
+
+
+def group_box_stats(values, max_outliers=MAX_OUTLIERS, seed=0):
+    """Box statistics for one group of values (NaNs ignored)."""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    if len(outliers) > max_outliers:
+        # Keep the extremes so the axis range matches the full data
+        rng = np.random.default_rng(seed)
+        extremes = [outliers.min(), outliers.max()]
+        sample = rng.choice(outliers, max_outliers - 2, replace=False)
+        outliers = np.concatenate([extremes, sample])
+
+    return {
+        'count': len(values),
+        'mean': values.mean(),
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': inside.min(),
+        'upperfence': inside.max(),
+        'outliers': np.sort(outliers),
+    }
+
+
+def box_stats_from_arrays(keys, values, max_outliers=MAX_OUTLIERS):
+    """Per-group box statistics of ``values`` grouped by ``keys``; groups are sorted.
+
+    Rows with a missing key are dropped, as in a pandas groupby.
+    """
+    codes, groups = pd.factorize(keys, sort=True)
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+    stats = {}
+    for i, key in enumerate(groups):
+        group = group_box_stats(values[order[bounds[i]:bounds[i + 1]]], max_outliers)
+        if group is not None:
+            stats[key] = group
+    return pd.DataFrame.from_dict(stats, orient='index', columns=STAT_COLUMNS + ['outliers'])
+
+
+def box_stats_from_frame(df, by, col, max_outliers=MAX_OUTLIERS):
+    """Per-group box statistics, indexed by ``by``; groups are sorted."""
+    return box_stats_from_arrays(df[by].array, df[col].to_numpy(dtype=float, na_value=np.nan), max_outliers)
+
+
+def box_traces(stats, colors):
+    """Plotly traces for precomputed box statistics (one box per group)."""
+    # Imported here: the query backends use this module without plotting
+    import plotly.graph_objects as go
+
+    traces = []
+    for i, (name, row) in enumerate(stats.iterrows()):
+        color = colors[i % len(colors)]
+        traces.append(go.Box(
+            name=str(name),
+            x=[str(name)],
+            q1=[row['q1']],
+            median=[row['median']],
+            q3=[row['q3']],
+            lowerfence=[row['lowerfence']],
+            upperfence=[row['upperfence']],
+            mean=[row['mean']],
+            marker_color=color,
+            hoverinfo='y',
+        ))
+        if len(row['outliers']):
+            traces.append(go.Scatter(
+                x=[str(name)] * len(row['outliers']),
+                y=row['outliers'],
+                mode='markers',
+                marker=dict(color=color, size=4),
+                name=f"{name} outliers",
+                showlegend=False,
+            ))
+    return traces
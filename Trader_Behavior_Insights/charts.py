@@ -0,0 +1,205 @@
+"""Plotly figure builders for the dashboard's chart sections.
+
+Each builder takes the already-aggregated data for one chart and returns the
+styled figure; querying and caching stay in ``dashboard.py``.
+
+The roll-up charts take an optional ``errors`` frame, row-aligned with the
+data, of 95% error margins; the progressive dashboard passes it while it
+shows sample estimates, and the bars get error bars.
+
+Plotly is imported inside the builders rather than at module level, so
+importing this module is free and only the sections on screen pay for
+``plotly.express`` (the slowest import in the dashboard). Pages without
+charts, such as the empty state, never load it.
+"""
+from box_stats import box_traces
+from downsample import max_points
+
+# Downsampled Trends charts: pixels of plot area per point. The lines keep
+# one LTTB point per two pixels; volume bars need a few pixels each to show
+TREND_PIXELS_PER_POINT = {'pnl_trend': 2, 'win_rate_trend': 2, 'volume': 4}
+# Plotly's default left and right margins, outside the plot area
+PLOT_MARGIN_PX = 160
+
+
+def _error(errors, col):
+    return None if errors is None else errors[col].to_numpy()
+
+
+def sentiment_figure(sentiment_counts):
+    import plotly.express as px
+
+    fig = px.pie(
+        values=sentiment_counts.values,
+        names=sentiment_counts.index,
+        title="Market Sentiment Distribution",
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        hole=0.4
+    )
+    fig.update_layout(showlegend=True, title_x=0.5, title_font_color="blue")
+    return fig
+
+
+def performance_figure(pnl_box_stats):
+    # Precomputed boxes don't need plotly.express at all
+    import plotly.graph_objects as go
+    from plotly.colors import qualitative
+
+    fig = go.Figure(box_traces(pnl_box_stats, qualitative.Set1))
+    fig.update_layout(
+        title="PnL Distribution by Market Sentiment",
+        xaxis_title="classification",
+        yaxis_title="total_pnl",
+        showlegend=False,
+        title_x=0.5,
+        title_font_color="blue"
+    )
+    return fig
+
+
+def win_rate_figure(win_data, errors=None):
+    import plotly.express as px
+
+    fig = px.bar(
+        win_data,
+        x='classification',
+        y='win_rate',
+        error_y=_error(errors, 'win_rate'),
+        title="Win Rate by Market Sentiment",
+        color='classification',
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+    fig.update_layout(showlegend=False, title_x=0.5, title_font_color="blue")
+    return fig
+
+
+def leverage_figure(leverage_data, errors=None):
+    import plotly.express as px
+
+    fig = px.bar(
+        leverage_data,
+        x='classification',
+        y='total_pnl',
+        error_y=_error(errors, 'total_pnl'),
+        color='leverage_segment',
+        barmode='group',
+        title="Performance by Leverage Segment",
+        color_discrete_sequence=['#48bb78', '#f56565']
+    )
+    fig.update_layout(title_x=0.5, title_font_color="blue")
+    return fig
+
+
+def frequency_figure(freq_data, errors=None):
+    import plotly.express as px
+
+    fig = px.scatter(
+        freq_data,
+        x='num_trades',
+        y='total_pnl',
+        error_x=_error(errors, 'num_trades'),
+        error_y=_error(errors, 'total_pnl'),
+        color='classification',
+        size='num_trades',
+        symbol='frequency_segment',
+        title="Trading Frequency vs Performance",
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    fig.update_layout(title_x=0.5, title_font_color="blue")
+    return fig
+
+
+def trend_max_points(chart, chart_width=None):
+    """Point budget of a full-width Trends chart rendered ``chart_width`` pixels wide (None: unknown)."""
+    plot_width = max(chart_width - PLOT_MARGIN_PX, 1) if chart_width else None
+    return max_points(plot_width, TREND_PIXELS_PER_POINT[chart])
+
+
+def pnl_trend_figure(pnl_points):
+    import plotly.express as px
+
+    fig = px.line(
+        pnl_points,
+        x='date',
+        y='total_pnl',
+        title="Average Daily PnL Over Time",
+        markers=True,
+        color_discrete_sequence=['#1f77b4']
+    )
+    fig.update_layout(title_x=0.5, title_font_color="blue")
+    return fig
+
+
+def win_rate_trend_figure(win_points):
+    import plotly.express as px
+
+    fig = px.line(
+        win_points,
+        x='date',
+        y='win_rate',
+        title="Win Rate Trend Over Time",
+        markers=True,
+        color_discrete_sequence=['#ff7f0e']
+    )
+    fig.update_layout(title_x=0.5, title_font_color="blue")
+    return fig
+
+
+def volume_figure(volume_points, title):
+    import plotly.express as px
+
+    fig = px.bar(
+        volume_points,
+        x='date',
+        y='num_trades',
+        title=title,
+        color_discrete_sequence=['#2ca02c']
+    )
+    fig.update_layout(title_x=0.5, title_font_color="blue")
+    return fig
+
+
+def mean_ci_figure(group_cis, metric):
+    import plotly.express as px
+
+    data = group_cis[group_cis['metric'] == metric]
+    fig = px.scatter(
+        data,
+        x='group',
+        y='mean',
+        error_y=data['ci_high'] - data['mean'],
+        error_y_minus=data['mean'] - data['ci_low'],
+        title=f"Mean {metric} by Market Sentiment (bootstrap CI)",
+        color='group',
+        color_discrete_sequence=px.colors.qualitative.Set1
+    )
+    fig.update_traces(marker=dict(size=10))
+    fig.update_layout(showlegend=False, title_x=0.5, title_font_color="blue",
+                      xaxis_title="classification", yaxis_title=metric)
+    return fig
+
+
+def account_history_figure(stats, account, window):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(
+        rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.06,
+        subplot_titles=["Cumulative PnL and Drawdown", f"Rolling {window}-day PnL and Trades",
+                        f"Rolling {window}-day Win Rate"],
+        specs=[[{}], [{'secondary_y': True}], [{}]]
+    )
+    fig.add_trace(go.Scatter(x=stats['date'], y=stats['cumulative_pnl'], name="Cumulative PnL",
+                             line=dict(color='#1f77b4')), row=1, col=1)
+    fig.add_trace(go.Scatter(x=stats['date'], y=stats['drawdown'], name="Drawdown", fill='tozeroy',
+                             line=dict(color='#d62728')), row=1, col=1)
+    fig.add_trace(go.Bar(x=stats['date'], y=stats['rolling_trades'], name="Trades", opacity=0.35,
+                         marker_color='#2ca02c'), row=2, col=1, secondary_y=True)
+    fig.add_trace(go.Scatter(x=stats['date'], y=stats['rolling_pnl'], name="Rolling PnL",
+                             line=dict(color='#9467bd')), row=2, col=1)
+    fig.add_trace(go.Scatter(x=stats['date'], y=stats['rolling_win_rate'], name="Win Rate",
+                             line=dict(color='#ff7f0e')), row=3, col=1)
+    fig.update_yaxes(tickformat='.0%', row=3, col=1)
+    fig.update_layout(height=750, title=f"Trader {account}", title_x=0.5, title_font_color="blue",
+                      legend=dict(orientation='h', y=-0.08))
+    return fig
@@ -1,9 +1,32 @@
+import functools
+import json
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 
+import charts
+from box_stats import box_stats_from_frame
+from data_store import add_derived_segments, dataset_version, read_daily_metrics, read_fear_greed
+from downsample import bucket_sums, chart_width, lttb
+from figure_cache import FigureCache, figure_cache_bytes
+from parallel import resolve_workers
+from filters import filter_signature, filters_from_signature, sort_by_date
+from pnl_model import latest_model_path, load_model, score_traders
+from progressive import POLL_SECONDS, ExactResults, latency_budget
+from query_backend import DuckDBBackend, PandasBackend, query_backend_name
+from sentiment_calendar import SENTIMENT_FEATURES, SentimentCalendar, add_sentiment
+from shared_data import load_shared, shared_data_dir
+from snapshot import SnapshotManager
+from stat_tests import CONFIDENCE, N_RESAMPLES, TEST_METRICS, anova, bootstrap_means, pairwise_tests
+from tracing import RunTrace, stage_percentiles, trace_log_path, tracing_enabled
+from trader_history import ROLLING_WINDOWS, account_summary, rolling_stats
+
 # Configure page
 st.set_page_config(
     page_title="DS Project Dashboard",
@@ -12,6 +35,29 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Opt-in hot-path timing: DASHBOARD_TRACE=1 logs one JSON line per run to
+# dashboard_log.txt; ?debug=1 in the URL shows this session's p50/p95
+TRACE_HISTORY = 500
+debug_panel = st.query_params.get('debug') == '1'
+st.session_state.setdefault('trace_session', uuid.uuid4().hex[:8])
+
+def start_trace(kind):
+    return RunTrace(
+        st.session_state['trace_session'],
+        kind,
+        enabled=tracing_enabled() or debug_panel,
+        log_path=trace_log_path() if tracing_enabled() else None
+    )
+
+def finish_trace(trace):
+    record = trace.finish()
+    if record is not None:
+        st.session_state.setdefault('trace_history', deque(maxlen=TRACE_HISTORY)).append(record)
+
+run_trace = start_trace('run')
+# Trace the current stages report to; fragment reruns swap in their own
+active_trace = run_trace
+
 # Modern, clean CSS styling
 st.markdown("""
 <style>
@@ -280,37 +326,115 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load data with error handling
-@st.cache_data
-def load_data():
-    try:
-        daily_metrics = pd.read_csv('daily_metrics.csv')
-        fear_greed_df = pd.read_csv('fear_greed_index.csv')
+# Load data. No Streamlit calls in here: reloads run in a background thread
+def read_data():
+    # Typed Parquet store written by the notebook; falls back to the CSVs
+    daily_metrics = read_daily_metrics()
+    fear_greed_df = read_fear_greed()
+
+    # Data preprocessing: segments missing from older stores are cut at the
+    # stored cut-points, or at sketched quantiles without them
+    add_derived_segments(daily_metrics)
+
+    # Sentiment-window features missing from older stores are looked up on
+    # the day-indexed Fear/Greed calendar
+    missing_features = [c for c in SENTIMENT_FEATURES if c not in daily_metrics.columns]
+    if missing_features:
+        add_sentiment(daily_metrics, SentimentCalendar(fear_greed_df), missing_features)
 
-        # Data preprocessing
-        if 'leverage_segment' not in daily_metrics.columns:
-            daily_metrics['leverage_proxy'] = daily_metrics['avg_position']
-            daily_metrics['leverage_segment'] = pd.qcut(daily_metrics['leverage_proxy'], q=2, labels=['Low Leverage', 'High Leverage'])
+    # Keep rows in date order so date-range filters are a binary search
+    daily_metrics = sort_by_date(daily_metrics)
 
-        if 'frequency_segment' not in daily_metrics.columns:
-            daily_metrics['frequency_segment'] = pd.qcut(daily_metrics['num_trades'], q=2, labels=['Infrequent', 'Frequent'])
+    return {'daily_metrics': daily_metrics, 'fear_greed': fear_greed_df}
 
-        return daily_metrics, fear_greed_df
+# One read-only copy of the data: shared by all sessions through the snapshot,
+# and with DASHBOARD_SHARED_DATA set, memory-mapped by every server process
+def load_data():
+    tables = load_shared(shared_data_dir(), dataset_version('.'), ['daily_metrics', 'fear_greed'], read_data)
+    return tables['daily_metrics'], tables['fear_greed']
+
+# Query backend: the in-memory pandas path (filter indexes + metrics cube)
+# by default, or DuckDB over the data files
+def build_query_backend(name):
+    if name == 'pandas':
+        daily_metrics, _ = load_data()
+        return PandasBackend(daily_metrics)
+    return DuckDBBackend('.')
+
+# Backend snapshot shared across reruns and sessions. When the data files
+# change on disk, a new backend is built in the background and swapped in;
+# sessions keep using the old snapshot until then
+@st.cache_resource
+def load_snapshots(name):
+    return SnapshotManager(lambda: build_query_backend(name), lambda: dataset_version('.'))
+
+# Statistics behind the significance tests per filter state: the filtered rows
+# (pandas) or per-bucket moments and rank statistics computed in SQL (DuckDB)
+@st.cache_resource(max_entries=8)
+def load_significance_stats(_backend, backend_name, version, signature):
+    selections, date_range = filters_from_signature(signature)
+    return _backend.significance_stats(selections, date_range, TEST_METRICS)
+
+# ANOVA and pairwise t/Mann-Whitney tests per filter state, batched over the
+# metrics; the bootstrap CIs run on the background pool (see significance_section)
+@st.cache_data(max_entries=32)
+def load_significance(_backend, backend_name, version, signature):
+    grouped = load_significance_stats(_backend, backend_name, version, signature)
+    return {'anova': anova(grouped), 'pairwise': pairwise_tests(grouped)}
+
+# Threads for the bootstrap resamples, one per core (numpy releases the GIL
+# while drawing them), shared by all sessions
+@st.cache_resource
+def load_bootstrap_pool():
+    return ThreadPoolExecutor(resolve_workers(None), thread_name_prefix='bootstrap')
+
+# Latest PnL-bucket model written by `python pnl_model.py`; a newer file is picked up on the next run
+@st.cache_resource(max_entries=2)
+def load_pnl_model(path, mtime):
+    return load_model(path)
+
+# Figure cache shared by all sessions, bounded by DASHBOARD_FIGURE_CACHE_MB
+@st.cache_resource
+def load_figure_cache():
+    return FigureCache(figure_cache_bytes())
+
+# Background pool for the exact aggregates behind progressive rendering, shared by all sessions
+@st.cache_resource
+def load_exact_results():
+    return ExactResults()
+
+# Dataset-wide header metrics don't depend on any widget
+@st.cache_data
+def load_overview(_backend, backend_name, version):
+    return _backend.overview()
+
+# Load data
+data_loaded = False
+with run_trace.stage('load_data'):
+    try:
+        snapshots = load_snapshots(query_backend_name())
+        # One snapshot for the whole run, even if a reload lands meanwhile
+        snapshot = snapshots.current()
+        query_backend = snapshot.data
+        data_version = snapshot.version
+        figure_cache = load_figure_cache()
+        exact_results = load_exact_results()
+        bootstrap_pool = load_bootstrap_pool()
+        data_loaded = True
     except FileNotFoundError:
         st.error("📁 Data files not found. Please run the analysis notebook first to generate the required data.")
+        query_backend = None
+    except ImportError as e:
+        # An optional backend (duckdb) that isn't installed; the data itself is fine
+        st.error(f"📦 {e}. Install it, or unset DASHBOARD_QUERY_BACKEND to use the default pandas backend.")
         st.stop()
     except Exception as e:
         st.error(f"❌ Error loading data: {str(e)}")
-        st.stop()
+        query_backend = None
 
-# Load data
-data_loaded = False
-try:
-    daily_metrics, fear_greed_df = load_data()
-    data_loaded = True
-except:
-    daily_metrics = pd.DataFrame()
-    fear_greed_df = pd.DataFrame()
+    if data_loaded:
+        overview_totals = load_overview(query_backend, query_backend.name, data_version)
+        run_trace.note(rows_out=overview_totals['total_rows'])
 
 # Welcome Section
 if not data_loaded:
@@ -335,19 +459,19 @@ st.markdown("""
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_traders = daily_metrics['account'].nunique()
+    total_traders = overview_totals['total_traders']
     st.metric("Total Traders", f"{total_traders:,}")
 
 with col2:
-    total_days = daily_metrics['date'].nunique()
+    total_days = overview_totals['total_days']
     st.metric("Trading Days", f"{total_days:,}")
 
 with col3:
-    avg_win_rate = daily_metrics['win_rate'].mean()
+    avg_win_rate = overview_totals['avg_win_rate']
     st.metric("Avg Win Rate", f"{avg_win_rate:.1%}")
 
 with col4:
-    total_pnl = daily_metrics['total_pnl'].sum()
+    total_pnl = overview_totals['total_pnl']
     st.metric("Total PnL", f"${total_pnl:,.0f}")
 
 # Sidebar Controls
@@ -359,6 +483,12 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
+    # Background data refresh status
+    if snapshots.reloading:
+        st.caption("🔄 New data found, loading in the background…")
+    elif snapshots.reload_error is not None:
+        st.warning(f"Data refresh failed, still showing the previous data: {snapshots.reload_error}")
+
     # Quick Actions
     st.markdown("### ⚡ Quick Actions")
     col1, col2 = st.columns(2)
@@ -383,6 +513,9 @@ with st.sidebar:
         "⚖️ Leverage": "Leverage-based performance comparison",
         "⏱️ Frequency": "Trading frequency analysis",
         "📈 Trends": "Time-based trends and patterns",
+        "🧪 Significance": "Significance tests and bootstrap confidence intervals by sentiment",
+        "🤖 PnL Model": "Score the filtered traders with the cached PnL-bucket model",
+        "🔎 Trader Drill-down": "One trader's rolling PnL, win rate, trades and drawdown",
         "📋 Data": "Raw data preview and exploration"
     }
 
@@ -393,7 +526,7 @@ with st.sidebar:
     for chart_name, description in chart_options.items():
         with cols[col_idx % 2]:
             # Create unique key
-            key = chart_name.lower().replace(' ', '_').replace('📊', '').replace('🎭', '').replace('💰', '').replace('🏆', '').replace('⚖️', '').replace('⏱️', '').replace('📈', '').replace('📋', '')
+            key = chart_name.lower().replace(' ', '_').replace('📊', '').replace('🎭', '').replace('💰', '').replace('🏆', '').replace('⚖️', '').replace('⏱️', '').replace('📈', '').replace('🧪', '').replace('🤖', '').replace('🔎', '').replace('📋', '')
 
             # Check if show all is selected
             default = st.session_state.get('show_all', False)
@@ -414,8 +547,7 @@ with st.sidebar:
     # Filters Section
     with st.expander("🔍 Advanced Filters", expanded=False):
         st.markdown("#### 📅 Date Range")
-        min_date = pd.to_datetime(daily_metrics['date']).min()
-        max_date = pd.to_datetime(daily_metrics['date']).max()
+        min_date, max_date = query_backend.date_bounds()
         date_range = st.date_input(
             "Select date range:",
             [min_date, max_date],
@@ -423,7 +555,7 @@ with st.sidebar:
         )
 
         st.markdown("#### 🎭 Market Sentiment")
-        sentiments = sorted([s for s in daily_metrics['classification'].unique() if pd.notna(s)])
+        sentiments = query_backend.options('classification')
         selected_sentiments = st.multiselect(
             "Select sentiments:",
             sentiments,
@@ -434,7 +566,7 @@ with st.sidebar:
         st.markdown("#### 👥 Trader Segments")
         col1, col2 = st.columns(2)
         with col1:
-            leverages = sorted(daily_metrics['leverage_segment'].unique())
+            leverages = query_backend.options('leverage_segment')
             selected_leverages = st.multiselect(
                 "Leverage:",
                 leverages,
@@ -443,7 +575,7 @@ with st.sidebar:
             )
 
         with col2:
-            frequencies = sorted(daily_metrics['frequency_segment'].unique())
+            frequencies = query_backend.options('frequency_segment')
             selected_frequencies = st.multiselect(
                 "Frequency:",
                 frequencies,
@@ -452,13 +584,580 @@ with st.sidebar:
             )
 
     # Apply filters
-    filtered_data = daily_metrics[
-        (daily_metrics['classification'].isin(selected_sentiments)) &
-        (daily_metrics['leverage_segment'].isin(selected_leverages)) &
-        (daily_metrics['frequency_segment'].isin(selected_frequencies)) &
-        (pd.to_datetime(daily_metrics['date']) >= pd.to_datetime(date_range[0])) &
-        (pd.to_datetime(daily_metrics['date']) <= pd.to_datetime(date_range[1]))
-    ].copy()
+    filter_selections = {
+        'classification': selected_sentiments,
+        'leverage_segment': selected_leverages,
+        'frequency_segment': selected_frequencies,
+    }
+    filter_key = filter_signature(filter_selections, (date_range[0], date_range[1]))
+
+# Chart sections. Each section is a fragment, so its own widgets (Trends
+# resolution, Data Explorer paging) rerun only that section. Aggregates and
+# figures are memoized per session on the data version and filter signature,
+# so a full rerun (e.g. ticking another chart) only builds the sections whose
+# inputs changed.
+def section_memo(section, key, build):
+    memo = st.session_state.setdefault('section_memo', {})
+    entry = memo.get(section)
+    if entry is None or entry[0] != (data_version, key):
+        entry = ((data_version, key), build())
+        memo[section] = entry
+    return entry[1]
+
+# Built figures are also shared across sessions: the same view (e.g. the
+# default filters) is queried and drawn once per dataset version
+def section_figure(chart_id, key, build):
+    fig_json = section_memo(chart_id, key, lambda: figure_cache.figure_json((chart_id, key, data_version), build))
+    active_trace.note(payload_bytes=len(fig_json))
+    return json.loads(fig_json)
+
+def traced_section(name):
+    """Time a chart section as one trace stage.
+
+    A fragment rerun happens after the full run's trace was logged, so it is
+    logged as its own ``fragment`` trace.
+    """
+    def decorate(render):
+        @functools.wraps(render)
+        def traced(filter_key, *args):
+            global active_trace, progressive_deadline
+            own_trace = active_trace.finished
+            if own_trace:
+                active_trace = start_trace('fragment')
+                progressive_deadline = time.monotonic() + (progressive_budget or 0)
+                pending_exact.clear()
+            with active_trace.stage(name, rows_in=load_filtered_totals(filter_key)['rows']):
+                render(filter_key, *args)
+            if own_trace:
+                finish_trace(active_trace)
+                poll_exact_results()
+        return traced
+    return decorate
+
+def section_header(icon, title):
+    st.markdown(f"""
+    <div class="content-card">
+        <div class="section-header">
+            <span class="section-icon">{icon}</span>
+            <h3 class="section-title">{title}</h3>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+def filtered_rollup(filter_key, aggs, by=None):
+    selections, date_range = filters_from_signature(filter_key)
+    return query_backend.rollup(selections, date_range, aggs, by=by)
+
+# Progressive rendering. Exact aggregates run on the background pool; a
+# section waits for them only until the run's latency budget is spent, then
+# draws sample estimates with error bars. The jobs behind those estimates are
+# collected, and a poller reruns the page once they have all finished
+progressive_budget = latency_budget()
+progressive_deadline = time.monotonic() + (progressive_budget or 0)
+pending_exact = []
+run_estimates = {}
+
+def progressive_result(job, compute):
+    """``compute()``'s result if it is ready within the run's budget, else None."""
+    if progressive_budget is None:
+        return compute()
+    key = (query_backend.name, data_version, job)
+    result = exact_results.get(key, compute, progressive_deadline - time.monotonic())
+    if result is None:
+        pending_exact.append(key)
+    return result
+
+def progressive_rollup(section, filter_key, aggs, by=None):
+    """``filtered_rollup`` within the latency budget: ``(result, errors)``.
+
+    ``errors`` is None for the exact roll-up (memoized like ``section_memo``);
+    otherwise ``result`` holds sample estimates and ``errors`` their 95% margins.
+    """
+    entry = st.session_state.setdefault('section_memo', {}).get(section)
+    if entry is not None and entry[0] == (data_version, filter_key):
+        return entry[1], None
+    result = progressive_result((section, filter_key), lambda: filtered_rollup(filter_key, aggs, by))
+    if result is None:
+        return sample_rollup(section, filter_key, aggs, by)
+    return section_memo(section, filter_key, lambda: result), None
+
+def progressive_figure(chart_id, filter_key, exact_data, estimate, draw):
+    """A chart within the latency budget: ``(figure, exact)``.
+
+    The exact figure, ``draw(exact_data(), None)``, is built on the background
+    pool (so ``draw`` doesn't touch the run's trace) and cached like
+    ``section_figure``. If it isn't ready in time, the figure is drawn from
+    ``estimate()``, a ``(data, errors)`` pair from the sample, and not cached.
+    """
+    memo = st.session_state.setdefault('section_memo', {})
+    entry = memo.get(chart_id)
+    if entry is None or entry[0] != (data_version, filter_key):
+        figure_key = (chart_id, filter_key, data_version)
+        fig_json = progressive_result((chart_id, filter_key), lambda: figure_cache.figure_json(
+            figure_key, lambda: draw(exact_data(), None)))
+        if fig_json is None:
+            return draw(*estimate()), False
+        memo[chart_id] = entry = ((data_version, filter_key), fig_json)
+    active_trace.note(payload_bytes=len(entry[1]))
+    return json.loads(entry[1]), True
+
+def sample_rollup(section, filter_key, aggs, by=None):
+    """Sample estimate and errors of a roll-up, computed once per run."""
+    key = (section, filter_key, data_version)
+    if key not in run_estimates:
+        selections, date_range = filters_from_signature(filter_key)
+        run_estimates[key] = query_backend.sample.rollup(selections, date_range, aggs, by)
+    return run_estimates[key]
+
+def approximate_caption(error_bars=True):
+    bars = ", with 95% error bars" if error_bars else ""
+    st.caption(f"≈ Approximate: estimated from a stratified sample of {len(query_backend.sample):,} rows{bars}. "
+               "The exact result replaces it as soon as it is ready.")
+
+# Reruns the page once every exact result behind an estimate on it is in
+@st.fragment(run_every=POLL_SECONDS)
+def exact_results_poller(keys):
+    if exact_results.done(keys):
+        st.rerun()
+
+def poll_exact_results():
+    if pending_exact:
+        exact_results_poller(list(pending_exact))
+
+TOTALS_AGGS = {'rows': 'sum', 'total_pnl': 'mean', 'win_rate': 'mean', 'num_trades': 'sum'}
+
+def load_filtered_totals(filter_key):
+    """Filtered totals; sample estimates (counts rounded) while the exact ones compute."""
+    totals, errors = progressive_rollup('totals', filter_key, TOTALS_AGGS)
+    if errors is not None:
+        totals = {**totals, 'rows': int(round(totals['rows'])), 'num_trades': int(round(totals['num_trades']))}
+    return totals
+
+def show_chart(fig):
+    # Cached figures are plain dicts, which st.plotly_chart rejects without
+    # traces (e.g. the Performance boxes when no rows match)
+    data = fig['data'] if isinstance(fig, dict) else fig.data
+    if not data:
+        st.info("No data matches your current filters. Try adjusting the criteria.")
+        return
+    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+@st.fragment
+@traced_section("📊 Overview")
+def overview_section(filter_key):
+    section_header("📊", "Performance Overview")
+    filtered_totals = load_filtered_totals(filter_key)
+    totals_error = progressive_rollup('totals', filter_key, TOTALS_AGGS)[1]
+
+    def approx(text, col, fmt):
+        if totals_error is None:
+            return text
+        return f"≈{text}<div class=\"stat-label\">± {format(totals_error[col], fmt)}</div>"
+
+    # Key metrics in a nice grid
+    st.markdown('<div class="stats-grid">', unsafe_allow_html=True)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.markdown(f"""
+        <div class="stat-card">
+            <div class="stat-value">{approx(f"{filtered_totals['rows']:,}", 'rows', ',.0f')}</div>
+            <div class="stat-label">Trading Days</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        avg_pnl = filtered_totals['total_pnl']
+        st.markdown(f"""
+        <div class="stat-card">
+            <div class="stat-value">{approx(f"${avg_pnl:,.0f}", 'total_pnl', ',.0f')}</div>
+            <div class="stat-label">Avg Daily PnL</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        avg_win_rate = filtered_totals['win_rate']
+        st.markdown(f"""
+        <div class="stat-card">
+            <div class="stat-value">{approx(f"{avg_win_rate:.1%}", 'win_rate', '.1%')}</div>
+            <div class="stat-label">Win Rate</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col4:
+        total_trades = filtered_totals['num_trades']
+        st.markdown(f"""
+        <div class="stat-card">
+            <div class="stat-value">{approx(f"{total_trades:,}", 'num_trades', ',.0f')}</div>
+            <div class="stat-label">Total Trades</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+    if totals_error is not None:
+        approximate_caption()
+
+@st.fragment
+@traced_section("🎭 Sentiment")
+def sentiment_section(filter_key):
+    section_header("🎭", "Market Sentiment Analysis")
+
+    aggs = {'rows': 'sum'}
+
+    def draw(counts, errors):
+        return charts.sentiment_figure(counts['rows'].sort_values(ascending=False))
+
+    fig, exact = progressive_figure(
+        'sentiment', filter_key,
+        lambda: filtered_rollup(filter_key, aggs, by='classification'),
+        lambda: sample_rollup('sentiment', filter_key, aggs, by='classification'),
+        draw)
+    show_chart(fig)
+    if not exact:
+        approximate_caption(error_bars=False)
+
+@st.fragment
+@traced_section("💰 Performance")
+def performance_section(filter_key):
+    section_header("💰", "Performance Analysis")
+
+    selections, date_range = filters_from_signature(filter_key)
+
+    def draw(pnl_box_stats, errors):
+        return charts.performance_figure(pnl_box_stats)
+
+    # The estimate boxes are drawn from the sampled rows themselves
+    fig, exact = progressive_figure(
+        'performance', filter_key,
+        lambda: query_backend.box_stats(selections, date_range, 'total_pnl', 'classification'),
+        lambda: (box_stats_from_frame(query_backend.sample.select(selections, date_range),
+                                      'classification', 'total_pnl'), None),
+        draw)
+    show_chart(fig)
+    if not exact:
+        approximate_caption(error_bars=False)
+
+@st.fragment
+@traced_section("🏆 Win Rates")
+def win_rate_section(filter_key):
+    section_header("🏆", "Win Rate Analysis")
+
+    aggs = {'win_rate': 'mean'}
+
+    def draw(win_data, errors):
+        return charts.win_rate_figure(win_data.reset_index(), None if errors is None else errors.reset_index())
+
+    fig, exact = progressive_figure(
+        'win_rates', filter_key,
+        lambda: filtered_rollup(filter_key, aggs, by='classification'),
+        lambda: sample_rollup('win_rates', filter_key, aggs, by='classification'),
+        draw)
+    show_chart(fig)
+    if not exact:
+        approximate_caption()
+
+@st.fragment
+@traced_section("⚖️ Leverage")
+def leverage_section(filter_key):
+    section_header("⚖️", "Leverage Analysis")
+
+    aggs = {'total_pnl': 'mean', 'win_rate': 'mean'}
+    by = ['classification', 'leverage_segment']
+
+    def draw(leverage_data, errors):
+        return charts.leverage_figure(leverage_data.round(4).reset_index(),
+                                      None if errors is None else errors.reset_index())
+
+    fig, exact = progressive_figure(
+        'leverage', filter_key,
+        lambda: filtered_rollup(filter_key, aggs, by=by),
+        lambda: sample_rollup('leverage', filter_key, aggs, by=by),
+        draw)
+    show_chart(fig)
+    if not exact:
+        approximate_caption()
+
+@st.fragment
+@traced_section("⏱️ Frequency")
+def frequency_section(filter_key):
+    section_header("⏱️", "Trading Frequency Analysis")
+
+    aggs = {'total_pnl': 'mean', 'num_trades': 'mean'}
+    by = ['classification', 'frequency_segment']
+
+    def draw(freq_data, errors):
+        return charts.frequency_figure(freq_data.round(4).reset_index(),
+                                       None if errors is None else errors.reset_index())
+
+    fig, exact = progressive_figure(
+        'frequency', filter_key,
+        lambda: filtered_rollup(filter_key, aggs, by=by),
+        lambda: sample_rollup('frequency', filter_key, aggs, by=by),
+        draw)
+    show_chart(fig)
+    if not exact:
+        approximate_caption()
+
+    # Insights
+    st.info("💡 **Key Insights:** High leverage traders excel in Greed periods but struggle in Fear. Low leverage traders show more consistent performance. Frequent traders generate higher volume but variable profitability.")
+
+@st.fragment
+@traced_section("📈 Trends")
+def trends_section(filter_key):
+    section_header("📈", "Time-Based Trends")
+
+    time_data = section_memo('trends_data', filter_key, lambda: filtered_rollup(filter_key, {
+        'total_pnl': 'mean',
+        'win_rate': 'mean',
+        'num_trades': 'sum'
+    }, by='date').reset_index())
+    active_trace.note(rows_out=len(time_data))
+
+    # Downsample before plotting to the charts' pixel width: LTTB for the lines, summed date buckets for volume
+    width = chart_width()
+    points = {chart: charts.trend_max_points(chart, width) for chart in charts.TREND_PIXELS_PER_POINT}
+    full_resolution = st.checkbox(
+        "Full resolution",
+        value=False,
+        key="trends_full_resolution",
+        help=f"Plot every day instead of at most {points['pnl_trend']} points per line"
+    )
+
+    downsampled = not full_resolution and len(time_data) > min(points.values())
+    trend_key = (filter_key, downsampled, width)
+
+    def build_pnl():
+        pnl_points = lttb(time_data, 'date', 'total_pnl', points['pnl_trend']) if downsampled else time_data
+        return charts.pnl_trend_figure(pnl_points)
+
+    def build_win():
+        win_points = lttb(time_data, 'date', 'win_rate', points['win_rate_trend']) if downsampled else time_data
+        return charts.win_rate_trend_figure(win_points)
+
+    def build_volume():
+        if not downsampled:
+            return charts.volume_figure(time_data, "Daily Trading Volume Over Time")
+        volume_points, bucket_days = bucket_sums(time_data, 'date', 'num_trades', points['volume'])
+        if bucket_days == 1:
+            return charts.volume_figure(volume_points, "Daily Trading Volume Over Time")
+        return charts.volume_figure(volume_points, f"Trading Volume Over Time ({bucket_days}-day buckets)")
+
+    fig_time_pnl = section_figure('trends_pnl', trend_key, build_pnl)
+    fig_time_win = section_figure('trends_win_rate', trend_key, build_win)
+    fig_time_volume = section_figure('trends_volume', trend_key, build_volume)
+    if downsampled:
+        st.caption(f"Showing at most {points['pnl_trend']:,} points per line and {points['volume']:,} volume bars "
+                   f"for {len(time_data):,} days (downsampled to the chart width)")
+
+    tab1, tab2, tab3 = st.tabs(["📈 PnL Trends", "🏆 Win Rate Trends", "📊 Volume Trends"])
+
+    with tab1:
+        show_chart(fig_time_pnl)
+
+    with tab2:
+        show_chart(fig_time_win)
+
+    with tab3:
+        show_chart(fig_time_volume)
+
+@st.fragment
+@traced_section("🧪 Significance")
+def significance_section(filter_key):
+    section_header("🧪", "Significance Tests")
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        ci_metric = st.selectbox("Confidence intervals for:", TEST_METRICS, key="significance_metric")
+    with col2:
+        n_resamples = st.select_slider("Bootstrap resamples:", options=[200, 500, 1000, 2000],
+                                       value=N_RESAMPLES, key="significance_resamples")
+
+    results = section_memo('significance_tests', filter_key, lambda: load_significance(
+        query_backend, query_backend.name, data_version, filter_key))
+    active_trace.note(rows_out=len(results['pairwise']))
+    if results['anova']['rows'].sum() == 0:
+        st.info("No rows match the current filters.")
+        return
+
+    # The bootstrap is an exact job: past the latency budget the tests show
+    # without CIs, and the poller reruns the page once they are in
+    grouped = load_significance_stats(query_backend, query_backend.name, data_version, filter_key)
+    bootstrap = progressive_result(('significance_bootstrap', filter_key, n_resamples),
+                                   lambda: bootstrap_means(grouped, n_resamples, executor=bootstrap_pool))
+    pairwise = results['pairwise']
+    if bootstrap is None:
+        st.caption(f"⏳ Computing the {n_resamples:,}-resample bootstrap CIs; they appear as soon as they are ready.")
+    else:
+        group_cis, pair_cis = bootstrap
+        show_chart(section_figure('significance_ci', (filter_key, n_resamples, ci_metric),
+                                  lambda: charts.mean_ci_figure(group_cis, ci_metric)))
+        pairwise = pairwise.merge(pair_cis[['metric', 'group_a', 'group_b', 'ci_low', 'ci_high']],
+                                  on=['metric', 'group_a', 'group_b'], how='left')
+
+    st.markdown("**One-way ANOVA across sentiments**")
+    st.dataframe(results['anova'], use_container_width=True)
+    st.markdown(f"**Pairwise t-test and Mann-Whitney U, with the {CONFIDENCE:.0%} bootstrap CI of the mean difference**")
+    st.dataframe(pairwise, use_container_width=True, hide_index=True)
+
+TOP_SCORED_TRADERS = 100
+
+@st.fragment
+@traced_section("🤖 PnL Model")
+def model_section(filter_key):
+    section_header("🤖", "PnL Bucket Model")
+
+    path = latest_model_path()
+    if path is None:
+        st.info("No trained model yet. Run `python pnl_model.py` in the data directory to train and cache one.")
+        return
+    record = load_pnl_model(path, os.path.getmtime(path))
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("CV Accuracy", f"{record['cv_scores'].mean():.1%}", help=f"{len(record['cv_scores'])}-fold cross-validation")
+    col2.metric("Training Rows", f"{record['rows']:,}")
+    col3.metric("Trained", record['trained_at'][:10])
+    st.caption(f"Features: {', '.join(record['features'])}")
+
+    missing = [f for f in record['features'] if f not in query_backend.columns()]
+    if missing:
+        st.warning(f"The loaded data has no {', '.join(missing)} column, so the model can't score it.")
+        return
+
+    # Scoring runs the forest over every filtered row, so only on request
+    scored_view = (filter_key, record['key'])
+    if st.button("Score filtered traders", key="score_traders"):
+        st.session_state['scored_view'] = scored_view
+    if st.session_state.get('scored_view') != scored_view:
+        return
+
+    def score():
+        selections, date_range = filters_from_signature(filter_key)
+        return score_traders(record, query_backend.rows(selections, date_range, columns=['account'] + record['features']))
+
+    scores = section_memo('trader_scores', scored_view, score)
+    active_trace.note(rows_out=len(scores))
+    st.dataframe(scores.head(TOP_SCORED_TRADERS), use_container_width=True, hide_index=True)
+    st.caption(f"Top {min(TOP_SCORED_TRADERS, len(scores)):,} of {len(scores):,} traders by mean P(High) over their filtered days")
+
+ACCOUNT_MATCHES = 50
+
+@st.fragment
+@traced_section("🔎 Trader Drill-down")
+def trader_section(filter_key):
+    section_header("🔎", "Trader Drill-down")
+
+    col1, col2, col3 = st.columns([2, 3, 1])
+    with col1:
+        account_search = st.text_input("Search account:", key="trader_search", help="Case-insensitive substring match")
+    matches = query_backend.find_accounts(account_search, ACCOUNT_MATCHES)
+    if not matches:
+        st.info("No account matches the search.")
+        return
+    with col2:
+        account = st.selectbox("Account:", matches, key="trader_account",
+                               help=f"First {ACCOUNT_MATCHES} matching accounts")
+    with col3:
+        window = st.selectbox("Rolling window (days):", ROLLING_WINDOWS, index=1, key="trader_window")
+
+    # The account's whole history: the sidebar filters don't apply here
+    history = section_memo('trader_history', account, lambda: query_backend.account_history(account))
+    active_trace.note(rows_out=len(history))
+    stats = section_memo('trader_stats', (account, window), lambda: rolling_stats(history, window))
+    summary = account_summary(history, stats)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Active Days", f"{summary['days']:,}")
+    col2.metric("Total PnL", f"${summary['total_pnl']:,.2f}")
+    col3.metric("Max Drawdown", f"${summary['max_drawdown']:,.2f}")
+    col4.metric("Win Rate", f"{summary['win_rate']:.1%}", help=f"{summary['trades']:,} trades")
+
+    show_chart(section_figure('trader_history', (account, window),
+                              lambda: charts.account_history_figure(stats, account, window)))
+    st.caption(f"Full history from {pd.Timestamp(summary['first_day']):%Y-%m-%d} to "
+               f"{pd.Timestamp(summary['last_day']):%Y-%m-%d}; the sidebar filters don't apply to this section")
+
+@st.fragment
+@traced_section("📋 Data")
+def data_section(filter_key):
+    section_header("📋", "Data Explorer")
+
+    # Server-side paging: only the requested page is sliced and rendered
+    col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 1, 1])
+    with col1:
+        explorer_search = st.text_input("Search account:", key="explorer_search", help="Case-insensitive substring match")
+    with col2:
+        explorer_columns = query_backend.columns()
+        explorer_sort = st.selectbox("Sort by:", explorer_columns, index=explorer_columns.index('date'), key="explorer_sort")
+    with col3:
+        explorer_order = st.selectbox("Order:", ["Ascending", "Descending"], key="explorer_order")
+    with col4:
+        explorer_page_size = st.selectbox("Rows per page:", [20, 50, 100, 500], key="explorer_page_size")
+    with col5:
+        explorer_page = st.number_input("Page:", min_value=1, value=1, step=1, key="explorer_page")
+
+    selections, date_range = filters_from_signature(filter_key)
+    page_data, explorer_total, page_index = query_backend.page(
+        selections,
+        date_range,
+        page=explorer_page - 1,
+        page_size=explorer_page_size,
+        sort_col=explorer_sort,
+        ascending=explorer_order == "Ascending",
+        search=explorer_search
+    )
+    page_count = max(1, -(-explorer_total // explorer_page_size))
+    active_trace.note(rows_out=len(page_data), payload_bytes=page_data.memory_usage(deep=True).sum())
+    st.dataframe(page_data, use_container_width=True)
+    first_row = page_index * explorer_page_size + 1 if explorer_total else 0
+    st.markdown(f"**Showing rows {first_row:,}–{page_index * explorer_page_size + len(page_data):,} of {explorer_total:,} records (page {page_index + 1} of {page_count:,})**")
+
+def summary_section(filter_key, n_charts):
+    st.markdown("---")
+    st.markdown("### 📋 Analysis Summary")
+    selections, date_range = filters_from_signature(filter_key)
+    filtered_rows = load_filtered_totals(filter_key)['rows']
+    approx_rows = '≈' if progressive_rollup('totals', filter_key, TOTALS_AGGS)[1] is not None else ''
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("**Data Overview:**")
+        st.info(f"""
+        - **Time Period:** {pd.Timestamp(date_range[0]).strftime('%Y-%m-%d')} to {pd.Timestamp(date_range[1]).strftime('%Y-%m-%d')}
+        - **Filtered Records:** {approx_rows}{filtered_rows:,}
+        - **Selected Sentiments:** {', '.join(selections['classification'])}
+        - **Trader Segments:** {len(selections['leverage_segment'])} leverage × {len(selections['frequency_segment'])} frequency types
+        """)
+
+    with col2:
+        st.markdown("**Key Insights:**")
+        if filtered_rows > 0:
+            by_sentiment, sentiment_error = progressive_rollup(
+                'summary_sentiment', filter_key, {'total_pnl': 'mean'}, by='classification')
+            by_leverage, leverage_error = progressive_rollup(
+                'summary_leverage', filter_key, {'win_rate': 'mean'}, by='leverage_segment')
+            approx_sentiment = '≈ ' if sentiment_error is not None else ''
+            approx_leverage = '≈ ' if leverage_error is not None else ''
+            st.success(f"""
+            - **Best Performing Sentiment:** {approx_sentiment}{by_sentiment['total_pnl'].idxmax()}
+            - **Most Consistent Segment:** {approx_leverage}{by_leverage['win_rate'].idxmax()} traders
+            - **Analysis Complete:** {n_charts} visualizations generated
+            """)
+        else:
+            st.warning("No data matches your current filters. Try adjusting the criteria.")
+
+CHART_SECTIONS = {
+    "📊 Overview": overview_section,
+    "🎭 Sentiment": sentiment_section,
+    "💰 Performance": performance_section,
+    "🏆 Win Rates": win_rate_section,
+    "⚖️ Leverage": leverage_section,
+    "⏱️ Frequency": frequency_section,
+    "📈 Trends": trends_section,
+    "🧪 Significance": significance_section,
+    "🤖 PnL Model": model_section,
+    "🔎 Trader Drill-down": trader_section,
+    "📋 Data": data_section,
+}
 
 # Main Content Area
 if selected_charts:
@@ -495,279 +1194,16 @@ if selected_charts:
         - Expand the "Advanced Filters" for more control over your analysis
         """)
 
-    # Overview Section
-    if "📊 Overview" in selected_charts:
-        st.markdown("""
-        <div class="content-card">
-            <div class="section-header">
-                <span class="section-icon">📊</span>
-                <h3 class="section-title">Performance Overview</h3>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        # Key metrics in a nice grid
-        st.markdown('<div class="stats-grid">', unsafe_allow_html=True)
+    with run_trace.stage('filters', rows_in=overview_totals['total_rows']):
+        run_trace.note(rows_out=load_filtered_totals(filter_key)['rows'])
 
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.markdown(f"""
-            <div class="stat-card">
-                <div class="stat-value">{len(filtered_data):,}</div>
-                <div class="stat-label">Trading Days</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col2:
-            avg_pnl = filtered_data['total_pnl'].mean()
-            st.markdown(f"""
-            <div class="stat-card">
-                <div class="stat-value">${avg_pnl:,.0f}</div>
-                <div class="stat-label">Avg Daily PnL</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col3:
-            avg_win_rate = filtered_data['win_rate'].mean()
-            st.markdown(f"""
-            <div class="stat-card">
-                <div class="stat-value">{avg_win_rate:.1%}</div>
-                <div class="stat-label">Win Rate</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col4:
-            total_trades = filtered_data['num_trades'].sum()
-            st.markdown(f"""
-            <div class="stat-card">
-                <div class="stat-value">{total_trades:,}</div>
-                <div class="stat-label">Total Trades</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        st.markdown('</div>', unsafe_allow_html=True)
-
-    # Sentiment Analysis
-    if "🎭 Sentiment" in selected_charts:
-        st.markdown("""
-        <div class="content-card">
-            <div class="section-header">
-                <span class="section-icon">🎭</span>
-                <h3 class="section-title">Market Sentiment Analysis</h3>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        sentiment_counts = filtered_data['classification'].value_counts()
-        fig_sentiment = px.pie(
-            values=sentiment_counts.values,
-            names=sentiment_counts.index,
-            title="Market Sentiment Distribution",
-            color_discrete_sequence=px.colors.qualitative.Set3,
-            hole=0.4
-        )
-        fig_sentiment.update_layout(showlegend=True, title_x=0.5, title_font_color="blue")
-        st.plotly_chart(fig_sentiment, use_container_width=True, config={'displayModeBar': False})
-
-    # Performance Analysis
-    if "💰 Performance" in selected_charts:
-        st.markdown("""
-        <div class="content-card">
-            <div class="section-header">
-                <span class="section-icon">💰</span>
-                <h3 class="section-title">Performance Analysis</h3>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        fig_pnl = px.box(
-            filtered_data,
-            x='classification',
-            y='total_pnl',
-            title="PnL Distribution by Market Sentiment",
-            color='classification',
-            color_discrete_sequence=px.colors.qualitative.Set1
-        )
-        fig_pnl.update_layout(showlegend=False, title_x=0.5, title_font_color="blue")
-        st.plotly_chart(fig_pnl, use_container_width=True, config={'displayModeBar': False})
-
-    # Win Rate Analysis
-    if "🏆 Win Rates" in selected_charts:
-        st.markdown("""
-        <div class="content-card">
-            <div class="section-header">
-                <span class="section-icon">🏆</span>
-                <h3 class="section-title">Win Rate Analysis</h3>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        fig_win = px.bar(
-            filtered_data.groupby('classification')['win_rate'].mean().reset_index(),
-            x='classification',
-            y='win_rate',
-            title="Win Rate by Market Sentiment",
-            color='classification',
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        fig_win.update_layout(showlegend=False, title_x=0.5, title_font_color="blue")
-        st.plotly_chart(fig_win, use_container_width=True, config={'displayModeBar': False})
-
-    # Leverage Analysis
-    if "⚖️ Leverage" in selected_charts:
-        st.markdown("""
-        <div class="content-card">
-            <div class="section-header">
-                <span class="section-icon">⚖️</span>
-                <h3 class="section-title">Leverage Analysis</h3>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        leverage_data = filtered_data.groupby(['classification', 'leverage_segment']).agg({
-            'total_pnl': 'mean',
-            'win_rate': 'mean'
-        }).round(4).reset_index()
-
-        fig_leverage = px.bar(
-            leverage_data,
-            x='classification',
-            y='total_pnl',
-            color='leverage_segment',
-            barmode='group',
-            title="Performance by Leverage Segment",
-            color_discrete_sequence=['#48bb78', '#f56565']
-        )
-        fig_leverage.update_layout(title_x=0.5, title_font_color="blue")
-        st.plotly_chart(fig_leverage, use_container_width=True, config={'displayModeBar': False})
-
-    # Frequency Analysis
-    if "⏱️ Frequency" in selected_charts:
-        st.markdown("""
-        <div class="content-card">
-            <div class="section-header">
-                <span class="section-icon">⏱️</span>
-                <h3 class="section-title">Trading Frequency Analysis</h3>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        freq_data = filtered_data.groupby(['classification', 'frequency_segment']).agg({
-            'total_pnl': 'mean',
-            'num_trades': 'mean'
-        }).round(4).reset_index()
-
-        fig_freq = px.scatter(
-            freq_data,
-            x='num_trades',
-            y='total_pnl',
-            color='classification',
-            size='num_trades',
-            symbol='frequency_segment',
-            title="Trading Frequency vs Performance",
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig_freq.update_layout(title_x=0.5, title_font_color="blue")
-        st.plotly_chart(fig_freq, use_container_width=True, config={'displayModeBar': False})
-
-        # Insights
-        st.info("💡 **Key Insights:** High leverage traders excel in Greed periods but struggle in Fear. Low leverage traders show more consistent performance. Frequent traders generate higher volume but variable profitability.")
-
-    # Trends Analysis
-    if "📈 Trends" in selected_charts:
-        st.markdown("""
-        <div class="content-card">
-            <div class="section-header">
-                <span class="section-icon">📈</span>
-                <h3 class="section-title">Time-Based Trends</h3>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        time_data = filtered_data.groupby('date').agg({
-            'total_pnl': 'mean',
-            'win_rate': 'mean',
-            'num_trades': 'sum'
-        }).reset_index()
-
-        tab1, tab2, tab3 = st.tabs(["📈 PnL Trends", "🏆 Win Rate Trends", "📊 Volume Trends"])
-
-        with tab1:
-            fig_time_pnl = px.line(
-                time_data,
-                x='date',
-                y='total_pnl',
-                title="Average Daily PnL Over Time",
-                markers=True,
-                color_discrete_sequence=['#1f77b4']
-            )
-            fig_time_pnl.update_layout(title_x=0.5, title_font_color="blue")
-            st.plotly_chart(fig_time_pnl, use_container_width=True, config={'displayModeBar': False})
-
-        with tab2:
-            fig_time_win = px.line(
-                time_data,
-                x='date',
-                y='win_rate',
-                title="Win Rate Trend Over Time",
-                markers=True,
-                color_discrete_sequence=['#ff7f0e']
-            )
-            fig_time_win.update_layout(title_x=0.5, title_font_color="blue")
-            st.plotly_chart(fig_time_win, use_container_width=True, config={'displayModeBar': False})
-
-        with tab3:
-            fig_time_volume = px.bar(
-                time_data,
-                x='date',
-                y='num_trades',
-                title="Daily Trading Volume Over Time",
-                color_discrete_sequence=['#2ca02c']
-            )
-            fig_time_volume.update_layout(title_x=0.5, title_font_color="blue")
-            st.plotly_chart(fig_time_volume, use_container_width=True, config={'displayModeBar': False})
-
-    # Data Preview
-    if "📋 Data" in selected_charts:
-        st.markdown("""
-        <div class="content-card">
-            <div class="section-header">
-                <span class="section-icon">📋</span>
-                <h3 class="section-title">Data Explorer</h3>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        st.dataframe(filtered_data.head(20), use_container_width=True)
-        st.markdown(f"**Showing first 20 rows of {len(filtered_data):,} total records**")
+    for chart_name, render_section in CHART_SECTIONS.items():
+        if chart_name in selected_charts:
+            render_section(filter_key)
 
     # Summary Section
-    if len(selected_charts) > 0:
-        st.markdown("---")
-        st.markdown("### 📋 Analysis Summary")
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.markdown("**Data Overview:**")
-            st.info(f"""
-            - **Time Period:** {date_range[0].strftime('%Y-%m-%d')} to {date_range[1].strftime('%Y-%m-%d')}
-            - **Filtered Records:** {len(filtered_data):,}
-            - **Selected Sentiments:** {', '.join(selected_sentiments)}
-            - **Trader Segments:** {len(selected_leverages)} leverage × {len(selected_frequencies)} frequency types
-            """)
-
-        with col2:
-            st.markdown("**Key Insights:**")
-            if len(filtered_data) > 0:
-                best_sentiment = filtered_data.groupby('classification')['total_pnl'].mean().idxmax()
-                best_leverage = filtered_data.groupby('leverage_segment')['win_rate'].mean().idxmax()
-                st.success(f"""
-                - **Best Performing Sentiment:** {best_sentiment}
-                - **Most Consistent Segment:** {best_leverage} traders
-                - **Analysis Complete:** {len(selected_charts)} visualizations generated
-                """)
-            else:
-                st.warning("No data matches your current filters. Try adjusting the criteria.")
+    with run_trace.stage('summary', rows_in=load_filtered_totals(filter_key)['rows']):
+        summary_section(filter_key, len(selected_charts))
 
 else:
     # Empty state with helpful guidance
@@ -790,4 +1226,28 @@ st.markdown("""
         <span style="font-size: 0.8rem;">Analyze trading behavior and optimize performance across market conditions</span>
     </p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+finish_trace(run_trace)
+
+# Hidden timing panel (?debug=1): per-stage p50/p95 over this session's runs
+if debug_panel:
+    with st.sidebar.expander("⏱️ Timings", expanded=True):
+        trace_history = st.session_state.get('trace_history', [])
+        if trace_history:
+            timings = pd.DataFrame.from_dict(stage_percentiles(trace_history), orient='index')
+            st.dataframe(timings.round(1), use_container_width=True)
+        cache_stats = figure_cache.stats()
+        st.caption(
+            f"{len(trace_history)} traced runs | figure cache: {cache_stats['hits']:,} hits, "
+            f"{cache_stats['misses']:,} misses, {cache_stats['bytes'] / 2**20:.1f} MB"
+        )
+
+    with st.sidebar.expander("🧠 Memory", expanded=False):
+        memory = query_backend.memory_report()
+        st.dataframe(memory.round(3), use_container_width=True)
+        st.caption(f"{memory['mb'].sum():,.1f} MB held by the {query_backend.name} backend")
+
+# Last, since its st.rerun() ends the run: the trace, footer and debug panel
+# above are already written when the exact results come in
+poll_exact_results()
@@ -0,0 +1,227 @@
+"""Typed columnar store for the dashboard's input tables.
+
+The notebook writes ``daily_metrics`` and the Fear/Greed index as Parquet with
+``date`` already parsed and the low-cardinality text columns stored as
+categoricals. The dashboard reads them back with column projection and only
+falls back to the CSV files when no Parquet store is present.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import SEGMENTS, cut_segment, segment_cuts, sketch_column
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, CSV keeps working without it
+    pq = None
+
+DAILY_METRICS_CSV = 'daily_metrics.csv'
+DAILY_METRICS_PARQUET = 'daily_metrics.parquet'
+FEAR_GREED_CSV = 'fear_greed_index.csv'
+FEAR_GREED_PARQUET = 'fear_greed_index.parquet'
+# Segment cut-points computed when the segments were assigned
+SEGMENT_CUTS_JSON = 'segment_cuts.json'
+
+# Dictionary-encoded columns: the sentiment and segment labels, and the
+# account ids (a 42-character hex string repeated on every row of an account)
+CATEGORICAL_COLUMNS = ['account', 'classification', 'leverage_segment', 'frequency_segment', 'consistency_segment']
+
+# Segment labels from low to high, the order roll-ups and charts list them in
+SEGMENT_ORDER = {col: labels for col, _, labels in SEGMENTS}
+
+# Segments derived at load time for stores written without them:
+# (segment column, source column, labels)
+DERIVED_SEGMENTS = [
+    ('leverage_segment', 'avg_position', SEGMENT_ORDER['leverage_segment']),
+    ('frequency_segment', 'num_trades', SEGMENT_ORDER['frequency_segment']),
+]
+
+# Integer columns stored narrower than int64 when every value fits
+COMPACT_INTEGER_DTYPES = {'num_trades': 'int32', 'winning_trades': 'int32', 'value': 'int8'}
+
+# Derived sentiment features (index points and day counts) need no float64
+COMPACT_FLOAT_COLUMNS = ['sentiment_7d_mean', 'sentiment_ewm', 'days_since_extreme_fear']
+
+# Columns the dashboard reads; anything else in the store is skipped on load
+DASHBOARD_COLUMNS = [
+    'account', 'date', 'total_pnl', 'num_trades', 'winning_trades', 'win_rate',
+    'avg_trade_size', 'avg_position', 'long_short_ratio', 'classification', 'value',
+    'leverage_segment', 'frequency_segment',
+    'sentiment_7d_mean', 'sentiment_ewm', 'regime_change', 'days_since_extreme_fear',
+]
+FEAR_GREED_COLUMNS = ['date', 'value', 'classification']
+
+
+def label_order(col, labels):
+    """``labels`` in display order: segments low to high, other labels sorted."""
+    labels = set(labels)
+    known = [label for label in SEGMENT_ORDER.get(col, []) if label in labels]
+    return known + sorted(labels.difference(known))
+
+
+def apply_schema(df):
+    """Apply the compact in-memory schema.
+
+    Parses ``date``, dictionary-encodes the account and label columns and
+    narrows the count columns. Floats stay float64, since the PnL sums need
+    the precision, except the derived sentiment features (float32).
+    """
+    if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
+        df['date'] = pd.to_datetime(df['date'])
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+        if col in SEGMENT_ORDER and col in df.columns:
+            # A CSV store comes back with alphabetical categories (High before Low)
+            df[col] = df[col].cat.reorder_categories(label_order(col, df[col].cat.categories))
+    for col, dtype in COMPACT_INTEGER_DTYPES.items():
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]) and len(df):
+            limits = np.iinfo(dtype)
+            if limits.min <= df[col].min() and df[col].max() <= limits.max:
+                df[col] = df[col].astype(dtype)
+    for col in COMPACT_FLOAT_COLUMNS:
+        if col in df.columns and df[col].dtype != 'float32':
+            df[col] = df[col].astype('float32')
+    return df
+
+
+def memory_report(df):
+    """Per-column memory use (deep), largest first, with each column's share."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'mb': usage / 2**20,
+        'share': usage / max(usage.sum(), 1),
+    })
+    return report.sort_values('mb', ascending=False)
+
+
+def parquet_available():
+    return pq is not None
+
+
+def atomic_write(path, write):
+    """Call ``write(tmp_path)`` and move the result over ``path`` in one step.
+
+    Readers see either the old file or the new one, never a partial write.
+    """
+    tmp_path = f'{path}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_segment_cuts(cuts, data_dir='.'):
+    def write(path):
+        with open(path, 'w') as f:
+            json.dump(cuts, f, indent=1)
+
+    atomic_write(os.path.join(data_dir, SEGMENT_CUTS_JSON), write)
+
+
+def read_segment_cuts(data_dir='.'):
+    """Stored segment cut-points ``{source column: [cuts]}``, or None."""
+    try:
+        with open(os.path.join(data_dir, SEGMENT_CUTS_JSON)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def derived_segment_cuts(sketch_source, data_dir='.'):
+    """Cut-points for the ``DERIVED_SEGMENTS``: the stored ones, else sketched.
+
+    ``sketch_source(col)`` returns a KLL sketch of a source column; it is only
+    called when ``segment_cuts.json`` lacks one of them. Both query backends
+    derive missing segments through here, so they assign the same rows.
+    """
+    cuts = read_segment_cuts(data_dir) or {}
+    sources = [source for _, source, _ in DERIVED_SEGMENTS]
+    if not set(sources) <= cuts.keys():
+        cuts = segment_cuts({source: sketch_source(source) for source in sources})
+    return cuts
+
+
+def add_derived_segments(daily_metrics, data_dir='.'):
+    """Add the ``DERIVED_SEGMENTS`` missing from a loaded store (in place)."""
+    missing = [segment for segment in DERIVED_SEGMENTS if segment[0] not in daily_metrics.columns]
+    if not missing:
+        return daily_metrics
+    cuts = derived_segment_cuts(lambda col: sketch_column(daily_metrics[col]), data_dir)
+    if 'leverage_segment' not in daily_metrics.columns:
+        daily_metrics['leverage_proxy'] = daily_metrics['avg_position']
+    for segment, source, labels in missing:
+        daily_metrics[segment] = cut_segment(daily_metrics[source], cuts[source], labels)
+    return daily_metrics
+
+
+def write_store(daily_metrics, fear_greed_df, data_dir='.', write_csv=True):
+    """Write the typed Parquet store (and the CSV fallback) for the dashboard.
+
+    Segment cut-points left in ``daily_metrics.attrs`` by
+    ``pipeline.add_segments`` are written alongside.
+    """
+    daily_metrics = apply_schema(daily_metrics.copy())
+    fear_greed_df = apply_schema(fear_greed_df.copy())
+    if 'segment_cuts' in daily_metrics.attrs:
+        write_segment_cuts(daily_metrics.attrs['segment_cuts'], data_dir)
+
+    if write_csv:
+        atomic_write(os.path.join(data_dir, DAILY_METRICS_CSV),
+                     lambda path: daily_metrics.to_csv(path, index=False))
+
+    if pq is None:
+        return
+    atomic_write(os.path.join(data_dir, DAILY_METRICS_PARQUET),
+                 lambda path: daily_metrics.to_parquet(path, index=False))
+    atomic_write(os.path.join(data_dir, FEAR_GREED_PARQUET),
+                 lambda path: fear_greed_df.to_parquet(path, index=False))
+
+
+def _read_table(data_dir, parquet_name, csv_name, columns, fmt):
+    parquet_path = os.path.join(data_dir, parquet_name)
+    csv_path = os.path.join(data_dir, csv_name)
+
+    use_parquet = fmt == 'parquet' or (fmt == 'auto' and pq is not None and os.path.exists(parquet_path))
+    if use_parquet:
+        available = pq.read_schema(parquet_path).names
+        selected = [c for c in columns if c in available] if columns else None
+        return apply_schema(pd.read_parquet(parquet_path, columns=selected))
+
+    if columns:
+        wanted = set(columns)
+        df = pd.read_csv(csv_path, usecols=lambda c: c in wanted)
+    else:
+        df = pd.read_csv(csv_path)
+    return apply_schema(df)
+
+
+def read_daily_metrics(data_dir='.', columns=DASHBOARD_COLUMNS, fmt='auto'):
+    """Load daily_metrics from Parquet if present, otherwise from CSV.
+
+    ``fmt`` may be ``'auto'``, ``'parquet'`` or ``'csv'``.
+    """
+    return _read_table(data_dir, DAILY_METRICS_PARQUET, DAILY_METRICS_CSV, columns, fmt)
+
+
+def read_fear_greed(data_dir='.', columns=FEAR_GREED_COLUMNS, fmt='auto'):
+    return _read_table(data_dir, FEAR_GREED_PARQUET, FEAR_GREED_CSV, columns, fmt)
+
+
+def dataset_version(data_dir='.'):
+    """Short identifier of the store files currently on disk.
+
+    Derived from each file's name, size and modification time, so it changes
+    whenever the notebook or pipeline rewrites the store.
+    """
+    identity = []
+    for name in (DAILY_METRICS_PARQUET, DAILY_METRICS_CSV, FEAR_GREED_PARQUET, FEAR_GREED_CSV, SEGMENT_CUTS_JSON):
+        try:
+            stat = os.stat(os.path.join(data_dir, name))
+        except FileNotFoundError:
+            continue
+        identity.append(f'{name}:{stat.st_size}:{stat.st_mtime_ns}')
+    return hashlib.sha1('|'.join(identity).encode()).hexdigest()[:12]
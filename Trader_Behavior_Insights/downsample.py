@@ -0,0 +1,92 @@
+"""Server-side downsampling for the time-series charts.
+
+Line charts use Largest-Triangle-Three-Buckets (LTTB), which keeps the points
+that preserve the visual shape of the series. Bar charts of additive
+quantities (trade volume) are re-bucketed into equal-width date buckets and
+summed, so totals are preserved.
+
+The point budget follows the chart's plot width (``max_points``): the
+caller passes the width it renders at, and each chart's pixels per point.
+Streamlit doesn't report the browser's width to the server, so the
+dashboard takes it from ``DASHBOARD_CHART_WIDTH_PX`` (``chart_width``) and
+falls back to ``DEFAULT_MAX_POINTS`` when it is unset.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# Budget when the chart width is unknown: about one point per two pixels of
+# a full-width chart on a typical laptop screen
+DEFAULT_MAX_POINTS = 500
+
+
+def chart_width():
+    """Pixel width of a full-width chart (``DASHBOARD_CHART_WIDTH_PX``); None when unset."""
+    pixels = int(os.environ.get('DASHBOARD_CHART_WIDTH_PX', 0))
+    return pixels if pixels > 0 else None
+
+
+def max_points(plot_width, pixels_per_point=2):
+    """Points worth drawing across ``plot_width`` pixels; ``DEFAULT_MAX_POINTS`` if the width is unknown."""
+    if not plot_width:
+        return DEFAULT_MAX_POINTS
+    # LTTB always keeps the first and last point
+    return max(3, int(plot_width // pixels_per_point))
+
+
+def lttb_indices(x, y, n_out):
+    """Positions of the ``n_out`` points LTTB keeps from ``(x, y)``.
+
+    ``x`` must be sorted ascending. The first and last points are always kept.
+    """
+    x = np.asarray(pd.to_numeric(pd.Series(x)), dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    kept = np.empty(n_out, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+    bucket_size = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        # Candidates in this bucket, scored against the mean of the next one
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+
+def lttb(df, x, y, n_out=DEFAULT_MAX_POINTS):
+    """Rows of ``df`` kept by LTTB on columns ``x``/``y`` (NaN ``y`` rows are skipped)."""
+    series = df[df[y].notna()]
+    return series.iloc[lttb_indices(series[x], series[y], n_out)]
+
+
+def bucket_sums(df, date_col, value_col, n_out=DEFAULT_MAX_POINTS):
+    """Sum ``value_col`` into at most ``n_out`` equal-width date buckets.
+
+    Returns ``(buckets, bucket_days)``: a frame of bucket start dates and
+    sums, and the bucket width in days.
+    """
+    dates = pd.to_datetime(df[date_col])
+    span_days = (dates.max() - dates.min()).days + 1 if len(df) else 0
+    bucket_days = max(1, -(-span_days // n_out))
+    if bucket_days == 1:
+        return df[[date_col, value_col]], 1
+
+    start = dates.min()
+    bucket = (dates - start).dt.days // bucket_days
+    sums = df[value_col].groupby(bucket.to_numpy()).sum()
+    buckets = pd.DataFrame({
+        date_col: start + pd.to_timedelta(sums.index * bucket_days, unit='D'),
+        value_col: sums.to_numpy(),
+    })
+    return buckets, bucket_days
@@ -0,0 +1,85 @@
+"""Process-wide LRU cache of serialized Plotly figures.
+
+Figures are stored as JSON keyed by ``(chart id, filter signature, dataset
+version)``, so every session looking at the same view gets the figure without
+querying or building it again. The cache is bounded by the total size of the
+stored JSON and evicts the least recently used figures first.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def figure_cache_bytes():
+    """Memory budget from ``DASHBOARD_FIGURE_CACHE_MB`` (default 64 MB)."""
+    megabytes = os.environ.get('DASHBOARD_FIGURE_CACHE_MB')
+    return DEFAULT_MAX_BYTES if megabytes is None else int(float(megabytes) * 1024 * 1024)
+
+
+class FigureCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Streamlit serves sessions from several threads
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Serialized figure for ``key``, or None."""
+        with self.lock:
+            fig_json = self.entries.get(key)
+            if fig_json is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return fig_json
+
+    def put(self, key, fig_json):
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            if len(fig_json) > self.max_bytes:
+                return
+            self.entries[key] = fig_json
+            self.size += len(fig_json)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def figure_json(self, key, build):
+        """Serialized figure for ``key``; ``build()`` makes the Plotly figure on a miss."""
+        fig_json = self.get(key)
+        if fig_json is None:
+            fig_json = build().to_json()
+            self.put(key, fig_json)
+        return fig_json
+
+    def figure(self, key, build):
+        """Figure dict for ``key`` (see ``figure_json``)."""
+        return json.loads(self.figure_json(key, build))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+            }
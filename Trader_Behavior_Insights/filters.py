@@ -0,0 +1,124 @@
+"""Index-backed filter engine for the dashboard's sidebar filters.
+
+Built once per dataset. Each categorical filter column gets one packed bitmap
+per value, and the rows are kept sorted by ``date`` so a date range is a pair
+of binary searches. Applying a filter combination is then a few bitwise
+OR/ANDs over the bytes covering the date range; no column is rescanned.
+
+A filter result is a ``FilteredView``: the matching row positions plus the
+base frame, not a copy of the rows. Aggregations gather just the columns
+they need from it; ``frame()`` materializes rows only for callers that
+really need a DataFrame (the Data Explorer, exports).
+"""
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = ['classification', 'leverage_segment', 'frequency_segment']
+
+
+def filter_signature(selections, date_range=None):
+    """Hashable, order-independent key for a filter state (for caching)."""
+    selected = tuple(sorted((col, tuple(sorted(map(str, values)))) for col, values in selections.items()))
+    if date_range is not None:
+        date_range = tuple(pd.Timestamp(d).isoformat() for d in date_range)
+    return selected, date_range
+
+
+def filters_from_signature(signature):
+    """Inverse of ``filter_signature``: ``(selections, date_range)``."""
+    selected, date_range = signature
+    return {col: list(values) for col, values in selected}, date_range
+
+
+def sort_by_date(df):
+    """Return ``df`` sorted by date (stable) with a fresh RangeIndex."""
+    if df['date'].is_monotonic_increasing:
+        return df.reset_index(drop=True)
+    return df.sort_values('date', kind='stable').reset_index(drop=True)
+
+
+class FilteredView:
+    """Rows of ``df`` at ``positions``, without copying them."""
+
+    def __init__(self, df, positions):
+        self.df = df
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def column(self, col):
+        """The view's values of one column (an array, categoricals stay categorical)."""
+        return self.df[col].array.take(self.positions)
+
+    def frame(self, columns=None, limit=None):
+        """Materialize the view (or ``columns`` of it) as a DataFrame."""
+        positions = self.positions if limit is None else self.positions[:limit]
+        if columns is None:
+            return self.df.iloc[positions]
+        return self.df.iloc[positions, [self.df.columns.get_loc(col) for col in columns]]
+
+
+class FilterEngine:
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        dates = df['date']
+        if not dates.is_monotonic_increasing:
+            raise ValueError("FilterEngine expects rows sorted by date; use sort_by_date() first")
+
+        self.n_rows = len(df)
+        self.dates = dates.to_numpy(dtype='datetime64[ns]')
+        self.bitmaps = {}
+        for col in columns:
+            values = df[col]
+            self.bitmaps[col] = {
+                value: np.packbits((values == value).to_numpy(dtype=bool, na_value=False))
+                for value in values.dropna().unique()
+            }
+
+    @property
+    def min_date(self):
+        return pd.Timestamp(self.dates[0]) if self.n_rows else None
+
+    @property
+    def max_date(self):
+        return pd.Timestamp(self.dates[-1]) if self.n_rows else None
+
+    def options(self, col):
+        """Sorted non-null values of a filter column."""
+        return sorted(self.bitmaps[col])
+
+    def date_bounds(self, start, end):
+        """Row range ``[lo, hi)`` with ``start <= date <= end``."""
+        lo = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+        return int(lo), int(max(lo, hi))
+
+    def rows(self, selections, date_range=None):
+        """Positional row indices matching every filter.
+
+        ``selections`` maps a filter column to the values to keep; an empty
+        selection matches nothing, as ``isin([])`` would.
+        """
+        lo, hi = (0, self.n_rows) if date_range is None else self.date_bounds(*date_range)
+        if lo >= hi:
+            return np.empty(0, dtype=np.intp)
+
+        # Bytes of the packed bitmaps that cover rows [lo, hi)
+        byte_lo, byte_hi = lo // 8, (hi + 7) // 8
+        combined = np.full(byte_hi - byte_lo, 0xFF, dtype=np.uint8)
+        for col, selected in selections.items():
+            column_bits = np.zeros_like(combined)
+            for value in selected:
+                bitmap = self.bitmaps[col].get(value)
+                if bitmap is not None:
+                    column_bits |= bitmap[byte_lo:byte_hi]
+            combined &= column_bits
+
+        bits = np.unpackbits(combined, count=hi - byte_lo * 8)[lo - byte_lo * 8:]
+        return np.flatnonzero(bits) + lo
+
+    def view(self, df, selections, date_range=None):
+        return FilteredView(df, self.rows(selections, date_range))
+
+    def apply(self, df, selections, date_range=None):
+        return self.view(df, selections, date_range).frame()
@@ -0,0 +1,95 @@
+"""Pre-aggregated metrics cube for the dashboard's charts and KPIs.
+
+One cell per (date, classification, leverage_segment, frequency_segment)
+holds mergeable partial aggregates of the chart measures: the row count and,
+per measure, the sum, non-null count and sum of squares. Any chart grouped by
+a subset of the dimensions is a roll-up of the cells that pass the current
+filters, so its cost depends on the number of cells, not on the raw rows.
+"""
+import numpy as np
+import pandas as pd
+
+from filters import FilterEngine
+
+CUBE_DIMENSIONS = ['date', 'classification', 'leverage_segment', 'frequency_segment']
+CUBE_MEASURES = ['total_pnl', 'win_rate', 'num_trades', 'winning_trades']
+
+
+def build_cells(df, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+    """Partial aggregates per dimension cell, sorted by date.
+
+    Rows with a missing dimension value are dropped; they can never pass the
+    sidebar filters either.
+    """
+    partials = {'rows': pd.Series(1, index=df.index, dtype='int64')}
+    for col in measures:
+        values = df[col]
+        # Widen narrow integer columns so the squares can't overflow
+        if pd.api.types.is_integer_dtype(values):
+            values = values.astype('int64')
+        partials[f'{col}_sum'] = values
+        partials[f'{col}_count'] = values.notna().astype('int64')
+        partials[f'{col}_sumsq'] = values * values
+    partials = pd.DataFrame(partials)
+    for col in dimensions:
+        partials[col] = df[col]
+
+    cells = partials.groupby(dimensions, observed=True, sort=True).sum().reset_index()
+    return cells
+
+
+def rollup(cells, aggs, by=None):
+    """Combine cube cells into final aggregates.
+
+    ``aggs`` maps a measure to ``'sum'``, ``'count'``, ``'mean'`` or ``'std'``;
+    the special measure ``'rows'`` is the number of underlying rows. With
+    ``by`` the result is indexed like ``DataFrame.groupby(by).agg(...)``,
+    without it a dict of scalars is returned.
+    """
+    needed = []
+    for col, how in aggs.items():
+        if col == 'rows':
+            needed.append('rows')
+        else:
+            needed += [f'{col}_sum', f'{col}_count']
+            if how == 'std':
+                needed.append(f'{col}_sumsq')
+
+    if by is None:
+        # Per column, so integer measures stay integers
+        totals = {col: cells[col].sum() for col in needed}
+    else:
+        totals = cells.groupby(by, observed=True, sort=True)[needed].sum()
+
+    result = {}
+    for col, how in aggs.items():
+        if col == 'rows':
+            result[col] = totals['rows']
+            continue
+        total, count = totals[f'{col}_sum'], totals[f'{col}_count']
+        # Empty selections give NaN means, as pandas does
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if how == 'sum':
+                result[col] = total
+            elif how == 'count':
+                result[col] = count
+            elif how == 'mean':
+                result[col] = total / count
+            elif how == 'std':
+                result[col] = ((totals[f'{col}_sumsq'] - total * total / count) / (count - 1)) ** 0.5
+            else:
+                raise ValueError(f"Unsupported aggregation {how!r} for {col}")
+
+    if by is None:
+        return result
+    return pd.DataFrame(result, index=totals.index)
+
+
+class MetricsCube:
+    def __init__(self, df):
+        self.cells = build_cells(df)
+        self.filter_engine = FilterEngine(self.cells)
+
+    def select(self, selections, date_range=None):
+        """Cells matching the sidebar filters."""
+        return self.filter_engine.apply(self.cells, selections, date_range)
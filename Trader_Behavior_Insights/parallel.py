@@ -0,0 +1,11 @@
+"""Worker counts for the parallel code paths (pipeline aggregation, bootstrap).
+
+Kept apart from ``pipeline`` so modules that only need the worker count
+don't import the batch pipeline.
+"""
+import os
+
+
+def resolve_workers(workers):
+    """``None``/``0`` means one worker per CPU core."""
+    return workers or os.cpu_count() or 1
@@ -0,0 +1,276 @@
+"""Build ``daily_metrics`` from the raw trade export in bounded memory.
+
+This is the notebook's Part A aggregation (timestamp parsing, the per
+(account, date) ``groupby().agg``, the BUY/SELL ``side_counts`` and the
+Fear/Greed join) as an importable module. The join is a lookup into the
+dense ``SentimentCalendar``, which also adds the sentiment-window features. ``historical_data.csv`` is streamed
+in chunks; each chunk is reduced to mergeable per-(account, date) partial
+aggregates, so peak memory depends on the chunk size and the number of
+account-days, not on the number of trades.
+
+    python pipeline.py --trades historical_data.csv --fear-greed fear_greed_index.csv
+
+The partial aggregates are stored next to the dashboard's data files, so a
+batch of new trades can later be folded in with ``--update`` without
+re-reading the full history:
+
+    python pipeline.py --update new_trades.csv --fear-greed fear_greed_index.csv
+
+With ``--workers N`` each chunk is split into N shards by account hash and
+the shards are parsed and aggregated in a process pool. Shards never share
+an (account, date) key and are merged in a fixed order, so the result is
+identical to the single-process build.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_store import atomic_write, read_daily_metrics, write_store
+from parallel import resolve_workers
+from quantile_sketch import SEGMENTS, column_cuts, cut_segment, leverage_source
+from sentiment_calendar import SentimentCalendar, add_sentiment
+
+# Raw export columns the aggregation needs ('Leverage' is used when present)
+TRADE_COLUMNS = ['Account', 'Execution Price', 'Size USD', 'Side', 'Timestamp IST',
+                 'Start Position', 'Closed PnL', 'Fee', 'Leverage']
+NUMERIC_COLUMNS = ['execution_price', 'size_tokens', 'size_usd', 'start_position', 'closed_pnl', 'fee', 'leverage']
+TIMESTAMP_FORMAT = '%d-%m-%Y %H:%M'
+KEY_COLUMNS = ['account', 'date']
+PARTIALS_PARQUET = 'daily_partials.parquet'
+
+# Columns averaged per (account, date); each keeps a sum and a non-null count
+MEAN_COLUMNS = {
+    'size_usd': 'avg_trade_size',
+    'execution_price': 'avg_price',
+    'start_position': 'avg_position',
+}
+
+
+def normalize_trades(trades):
+    """Parse timestamps, add the trade ``date`` and snake_case the columns."""
+    trades = trades.copy()
+    trades['Timestamp IST'] = pd.to_datetime(trades['Timestamp IST'], format=TIMESTAMP_FORMAT)
+    trades['date'] = trades['Timestamp IST'].dt.normalize()
+    trades.columns = trades.columns.str.lower().str.replace(' ', '_')
+
+    for col in NUMERIC_COLUMNS:
+        if col in trades.columns:
+            trades[col] = pd.to_numeric(trades[col], errors='coerce')
+    return trades
+
+
+def load_sentiment(path):
+    """The Fear/Greed index and its day-indexed ``SentimentCalendar``."""
+    fear_greed_df = pd.read_csv(path)
+    fear_greed_df['date'] = pd.to_datetime(fear_greed_df['date'])
+    return fear_greed_df, SentimentCalendar(fear_greed_df)
+
+
+def partial_aggregates(trades):
+    """Reduce normalized trades to mergeable per-(account, date) partials."""
+    pnl = trades['closed_pnl']
+    side = trades['side']
+    partials = {
+        'account': trades['account'],
+        'date': trades['date'],
+        'pnl_sum': pnl,
+        'pnl_count': pnl.notna().astype('int64'),
+        'winning_trades': (pnl > 0).astype('int64'),
+        'fee_sum': trades['fee'],
+        'buy_count': (side == 'BUY').astype('int64'),
+        'sell_count': (side == 'SELL').astype('int64'),
+    }
+    mean_columns = list(MEAN_COLUMNS)
+    if 'leverage' in trades.columns:
+        mean_columns.append('leverage')
+    for col in mean_columns:
+        partials[f'{col}_sum'] = trades[col]
+        partials[f'{col}_count'] = trades[col].notna().astype('int64')
+
+    return pd.DataFrame(partials).groupby(['account', 'date'], sort=False).sum()
+
+
+def merge_partials(frames):
+    """Combine partial aggregates computed over disjoint sets of trades."""
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames).groupby(level=['account', 'date'], sort=False).sum()
+
+
+def finalize_daily_metrics(partials, calendar):
+    """Turn partial aggregates into the ``daily_metrics`` table.
+
+    ``calendar`` is a ``SentimentCalendar``; a Fear/Greed frame is wrapped in one.
+    """
+    if not isinstance(calendar, SentimentCalendar):
+        calendar = SentimentCalendar(calendar)
+    partials = partials.sort_index()
+    daily_metrics = pd.DataFrame({
+        'total_pnl': partials['pnl_sum'],
+        'num_trades': partials['pnl_count'],
+        'winning_trades': partials['winning_trades'],
+    })
+    for col, name in MEAN_COLUMNS.items():
+        daily_metrics[name] = partials[f'{col}_sum'] / partials[f'{col}_count']
+    daily_metrics['total_fees'] = partials['fee_sum']
+    daily_metrics['win_rate'] = daily_metrics['winning_trades'] / daily_metrics['num_trades']
+    daily_metrics['long_short_ratio'] = partials['buy_count'] / (partials['sell_count'] + 1)
+
+    daily_metrics = add_sentiment(daily_metrics.reset_index(), calendar)
+    if 'leverage_sum' in partials.columns:
+        daily_metrics['leverage'] = (partials['leverage_sum'] / partials['leverage_count']).to_numpy()
+    return daily_metrics
+
+
+def add_segments(daily_metrics, cuts=None):
+    """Leverage, frequency and consistency segments, as in the notebook.
+
+    The tercile/median cut-points come from quantile sketches of the columns
+    (built chunk by chunk, no full sort) unless ``cuts`` are given. They are
+    kept in ``daily_metrics.attrs['segment_cuts']``, and ``write_store``
+    saves them with the dataset.
+    """
+    if 'leverage' not in daily_metrics.columns:
+        daily_metrics['leverage_proxy'] = daily_metrics['avg_position']
+    cuts = cuts or column_cuts(daily_metrics)
+
+    for col, source, labels in SEGMENTS:
+        source = leverage_source(daily_metrics.columns) if source == 'leverage' else source
+        daily_metrics[col] = cut_segment(daily_metrics[source], cuts[source], labels)
+    daily_metrics.attrs['segment_cuts'] = cuts
+    return daily_metrics
+
+
+def shard_by_account(trades, n_shards, column='Account'):
+    """Split trades into ``n_shards`` frames by a stable hash of the account."""
+    shard_ids = pd.util.hash_array(trades[column].to_numpy(dtype=object)) % np.uint64(n_shards)
+    order = np.argsort(shard_ids, kind='stable')
+    bounds = np.searchsorted(shard_ids[order], np.arange(1, n_shards, dtype=np.uint64))
+    return [trades.iloc[rows] for rows in np.split(order, bounds)]
+
+
+def aggregate_raw_trades(raw_trades):
+    """Partials for trades straight from the export (process pool entry point)."""
+    return partial_aggregates(normalize_trades(raw_trades))
+
+
+def parallel_partial_aggregates(raw_trades, workers=None):
+    """Partials for an in-memory frame of raw trades, sharded across processes."""
+    workers = resolve_workers(workers)
+    if workers == 1:
+        return aggregate_raw_trades(raw_trades)
+    with ProcessPoolExecutor(workers) as pool:
+        parts = list(pool.map(aggregate_raw_trades, shard_by_account(raw_trades, workers)))
+    return merge_partials(parts)
+
+
+def read_raw_chunks(path, chunksize):
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in TRADE_COLUMNS if c in header]
+    return pd.read_csv(path, usecols=usecols, chunksize=chunksize)
+
+
+def build_partials(trades_path, chunksize=500_000, workers=1):
+    partials = None
+    workers = resolve_workers(workers)
+    if workers == 1:
+        for raw in read_raw_chunks(trades_path, chunksize):
+            partials = merge_partials([partials, aggregate_raw_trades(raw)])
+        return partials
+
+    with ProcessPoolExecutor(workers) as pool:
+        # Shards of one chunk aggregate while the next chunk is read
+        pending = []
+        for raw in read_raw_chunks(trades_path, chunksize):
+            futures = [pool.submit(aggregate_raw_trades, shard) for shard in shard_by_account(raw, workers)]
+            partials = merge_partials([partials] + [f.result() for f in pending])
+            pending = futures
+        partials = merge_partials([partials] + [f.result() for f in pending])
+    return partials
+
+
+def write_partials(partials, data_dir='.'):
+    atomic_write(os.path.join(data_dir, PARTIALS_PARQUET),
+                 lambda path: partials.reset_index().to_parquet(path, index=False))
+
+
+def read_partials(data_dir='.'):
+    path = os.path.join(data_dir, PARTIALS_PARQUET)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; run a full build with pipeline.py before using --update")
+    return pd.read_parquet(path).set_index(KEY_COLUMNS)
+
+
+def build_daily_metrics(trades_path, fear_greed_path, chunksize=500_000, workers=1):
+    """Full build. Returns ``(daily_metrics, fear_greed_df, partials)``."""
+    fear_greed_df, calendar = load_sentiment(fear_greed_path)
+    partials = build_partials(trades_path, chunksize, workers)
+    if partials is None:
+        raise ValueError(f"No trades found in {trades_path}")
+    daily_metrics = add_segments(finalize_daily_metrics(partials, calendar))
+    return daily_metrics, fear_greed_df, partials.sort_index()
+
+
+def update_daily_metrics(new_trades_path, fear_greed_path, data_dir='.', chunksize=500_000, workers=1):
+    """Fold a batch of new trades into the stored daily metrics.
+
+    Only the (account, date) groups the batch touches are recomputed: their
+    stored partials are merged with the batch's partials, finalized and
+    joined to the sentiment data, then patched into ``daily_metrics``. The
+    segment cut-points are re-derived over the patched table since they
+    depend on every row. The batch must not repeat trades already folded in.
+
+    Returns ``(daily_metrics, fear_greed_df, partials, n_touched)``.
+    """
+    fear_greed_df, calendar = load_sentiment(fear_greed_path)
+    stored = read_partials(data_dir)
+    batch = build_partials(new_trades_path, chunksize, workers)
+    daily_metrics = read_daily_metrics(data_dir, columns=None)
+    if batch is None:
+        return daily_metrics, fear_greed_df, stored, 0
+
+    touched = batch.index
+    touched_partials = merge_partials([stored[stored.index.isin(touched)], batch])
+    patch = finalize_daily_metrics(touched_partials, calendar)
+
+    keys = pd.MultiIndex.from_frame(daily_metrics[KEY_COLUMNS])
+    daily_metrics = pd.concat([daily_metrics[~keys.isin(touched)], patch], ignore_index=True)
+    daily_metrics = add_segments(daily_metrics.sort_values(KEY_COLUMNS, ignore_index=True))
+
+    partials = pd.concat([stored[~stored.index.isin(touched)], touched_partials]).sort_index()
+    return daily_metrics, fear_greed_df, partials, len(touched)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build daily_metrics from the raw trade export.")
+    parser.add_argument('--trades', default='historical_data.csv', help="raw trade export (CSV)")
+    parser.add_argument('--fear-greed', default='fear_greed_index.csv', help="Fear/Greed index (CSV)")
+    parser.add_argument('--out-dir', default='.', help="where the dashboard's data files are written")
+    parser.add_argument('--chunksize', type=int, default=500_000, help="trade rows read per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="aggregation processes (0 = one per CPU core)")
+    parser.add_argument('--update', metavar='NEW_TRADES',
+                        help="patch the existing store in --out-dir with a batch of new trades instead of rebuilding")
+    args = parser.parse_args(argv)
+
+    if args.update:
+        daily_metrics, fear_greed_df, partials, n_touched = update_daily_metrics(
+            args.update, args.fear_greed, args.out_dir, args.chunksize, args.workers)
+        summary = f"Updated {n_touched:,} account-days ({len(daily_metrics):,} total) in {args.out_dir}"
+    else:
+        daily_metrics, fear_greed_df, partials = build_daily_metrics(
+            args.trades, args.fear_greed, args.chunksize, args.workers)
+        summary = f"Wrote {len(daily_metrics):,} account-days to {args.out_dir}"
+
+    write_store(daily_metrics, fear_greed_df, args.out_dir)
+    write_partials(partials, args.out_dir)
+    print(summary)
+
+
+if __name__ == '__main__':
+    main()
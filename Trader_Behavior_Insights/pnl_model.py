@@ -0,0 +1,184 @@
+"""Train and cache the notebook's PnL-bucket RandomForest.
+
+This is the notebook's bonus model (daily PnL split into Low/Medium/High
+terciles, predicted from sentiment and behavior features with a
+``RandomForestClassifier(n_estimators=100)`` and 5-fold cross-validation)
+as an importable module with a command-line entry point:
+
+    python pnl_model.py --data-dir . --jobs -1
+
+The CV folds are fitted in parallel (one process per fold), and the final
+model grows its trees in parallel. The fitted model, CV scores and feature
+importances are stored in ``model_cache/`` under a key hashed from the
+training rows, the feature list and the model settings; a run whose key is
+already cached loads the stored model instead of retraining. The dashboard
+loads the latest model to score the filtered traders.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from data_store import atomic_write, read_daily_metrics
+from sentiment_calendar import SENTIMENT_FEATURES
+
+MODEL_DIR = 'model_cache'
+FEATURES = ['value', 'num_trades', 'avg_trade_size', 'win_rate', 'long_short_ratio']
+BUCKET_LABELS = ['Low', 'Medium', 'High']
+MODEL_PARAMS = {'n_estimators': 100, 'random_state': 42}
+CV_FOLDS = 5
+
+
+def model_dir():
+    return os.environ.get('DASHBOARD_MODEL_DIR', MODEL_DIR)
+
+
+def model_features(daily_metrics, sentiment_features=False):
+    """The notebook's features plus ``leverage`` when the data has it.
+
+    The sentiment-window features are opt-in: they are missing before the
+    first Extreme Fear day, and the rows lacking a feature are left out of
+    training, so adding them changes the training sample.
+    """
+    extra = ['leverage'] + (SENTIMENT_FEATURES if sentiment_features else [])
+    return FEATURES + [f for f in extra if f in daily_metrics.columns]
+
+
+def training_data(daily_metrics, features):
+    """``(X, y, bucket_edges)``: complete rows and their PnL tercile codes."""
+    rows = daily_metrics[features + ['total_pnl']].dropna()
+    buckets, edges = pd.qcut(rows['total_pnl'], q=len(BUCKET_LABELS), labels=False, retbins=True)
+    return rows[features], buckets.to_numpy(), edges
+
+
+def model_key(X, y, features, params=MODEL_PARAMS, cv=CV_FOLDS):
+    """Short hash of the training rows, the feature list and the settings."""
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    digest.update(json.dumps({'features': features, 'params': params, 'cv': cv}, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def model_path(key, directory=None):
+    return os.path.join(directory or model_dir(), f'pnl_rf-{key}.joblib')
+
+
+def write_json(data, path):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=1)
+
+
+def train(daily_metrics, features=None, params=MODEL_PARAMS, cv=CV_FOLDS, n_jobs=-1, directory=None, force=False):
+    """Fit (or load from the cache) the PnL-bucket model.
+
+    Returns the stored record: ``model``, ``features``, ``cv_scores``,
+    ``importance``, ``bucket_edges``, ``rows``, ``key``, ``trained_at`` and
+    ``cached`` (whether it came from the cache).
+    """
+    import joblib
+
+    features = features or model_features(daily_metrics)
+    X, y, edges = training_data(daily_metrics, features)
+    key = model_key(X, y, features, params, cv)
+    path = model_path(key, directory)
+    if os.path.exists(path) and not force:
+        # Mark it as the latest model, which is the one the dashboard loads
+        os.utime(path)
+        record = joblib.load(path)
+        record['cached'] = True
+        return record
+
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import cross_val_score
+
+    # Folds in parallel with single-threaded forests, then the final forest's
+    # trees in parallel; nesting both would oversubscribe the cores
+    cv_scores = cross_val_score(RandomForestClassifier(**params, n_jobs=1), X, y, cv=cv,
+                                scoring='accuracy', n_jobs=n_jobs)
+    model = RandomForestClassifier(**params, n_jobs=n_jobs).fit(X, y)
+    record = {
+        'model': model,
+        'features': features,
+        'cv_scores': cv_scores,
+        'importance': pd.Series(model.feature_importances_, index=features).sort_values(ascending=False),
+        'bucket_edges': edges,
+        'rows': len(X),
+        'key': key,
+        'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, lambda tmp_path: joblib.dump(record, tmp_path))
+    summary = {k: record[k] for k in ('key', 'features', 'rows', 'trained_at')}
+    summary.update(cv_scores=cv_scores.tolist(), importance=record['importance'].to_dict(),
+                   bucket_edges=edges.tolist(), params=params)
+    atomic_write(path.replace('.joblib', '.json'), lambda tmp_path: write_json(summary, tmp_path))
+    record['cached'] = False
+    return record
+
+
+def latest_model_path(directory=None):
+    """Most recently written model file, or None."""
+    paths = glob.glob(model_path('*', directory))
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def load_model(path):
+    import joblib
+
+    return joblib.load(path)
+
+
+def score_traders(record, rows):
+    """Per-account bucket probabilities over ``rows`` (daily_metrics rows).
+
+    Rows missing a feature are skipped. Returns one row per account with the
+    scored days, the mean probability of each bucket and the most likely
+    bucket, highest ``P(High)`` first.
+    """
+    features = record['features']
+    rows = rows.dropna(subset=features)
+    columns = [f'P({label})' for label in BUCKET_LABELS]
+    if rows.empty:
+        return pd.DataFrame(columns=['account', 'days'] + columns + ['bucket'])
+
+    proba = pd.DataFrame(record['model'].predict_proba(rows[features]), columns=columns, index=rows.index)
+    proba['account'] = rows['account'].to_numpy()
+    scores = proba.groupby('account', observed=True).agg(days=(columns[0], 'size'), **{c: (c, 'mean') for c in columns})
+    scores['bucket'] = np.array(BUCKET_LABELS)[scores[columns].to_numpy().argmax(axis=1)]
+    return scores.sort_values(columns[-1], ascending=False).reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train (or load the cached) PnL-bucket RandomForest.")
+    parser.add_argument('--data-dir', default='.', help="directory with the daily_metrics store")
+    parser.add_argument('--model-dir', default=None, help=f"model cache directory (default: {MODEL_DIR})")
+    parser.add_argument('--trees', type=int, default=MODEL_PARAMS['n_estimators'])
+    parser.add_argument('--cv', type=int, default=CV_FOLDS, help="cross-validation folds")
+    parser.add_argument('--jobs', type=int, default=-1, help="parallel folds/trees (-1 = one per CPU core)")
+    parser.add_argument('--force', action='store_true', help="retrain even when the cache has this model")
+    parser.add_argument('--sentiment-features', action='store_true',
+                        help="also train on the sentiment-window features (drops the rows before the first Extreme Fear day)")
+    args = parser.parse_args(argv)
+
+    daily_metrics = read_daily_metrics(args.data_dir, columns=None)
+    params = dict(MODEL_PARAMS, n_estimators=args.trees)
+    features = model_features(daily_metrics, args.sentiment_features)
+    record = train(daily_metrics, features, params=params, cv=args.cv, n_jobs=args.jobs,
+                   directory=args.model_dir, force=args.force)
+
+    source = 'Loaded cached model' if record['cached'] else 'Trained model'
+    print(f"{source} {record['key']} ({record['rows']:,} rows, trained {record['trained_at']})")
+    print("Cross-Validation Accuracy Scores:", np.round(record['cv_scores'], 3))
+    print(f"Mean CV Accuracy: {record['cv_scores'].mean():.3f} (+/- {record['cv_scores'].std() * 2:.3f})")
+    print("\nFeature Importance:")
+    print(record['importance'].to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""Progressive rendering: sample estimates first, exact aggregates in the background.
+
+Each query backend keeps a ``StratifiedSample`` of ``daily_metrics``: a
+fixed number of rows drawn at random within every (classification,
+leverage_segment, frequency_segment) stratum, in proportion to its size
+(with a floor, so small strata are still estimated). Any roll-up of the
+dashboard's filters and groupings can be estimated from it in time that
+depends on the sample size, not on how many rows match:
+
+* totals (``'rows'`` and ``'sum'``) with the stratified expansion estimator
+* means as ratios of two estimated totals
+* 95% error bars from the stratified variance (with the finite-population
+  correction, so a fully sampled stratum adds no error), linearized for the
+  means
+
+Only the date range and value filters cut through a stratum; the groupings
+are unions of whole strata. A dataset no larger than the sample is sampled
+in full and its estimates are exact.
+
+``ExactResults`` runs the exact queries on a small thread pool shared by all
+sessions. A chart waits for its exact result until the run's latency budget
+(``DASHBOARD_LATENCY_BUDGET_MS``, default 300; 0 turns progressive rendering
+off) is spent, then shows the estimate, and the dashboard reruns when the
+exact results are in.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_ROWS = 20_000
+# Floor per stratum, so small strata get a usable variance estimate
+MIN_STRATUM_ROWS = 30
+STRATA = ['classification', 'leverage_segment', 'frequency_segment']
+SAMPLE_COLUMNS = STRATA + ['date', 'total_pnl', 'win_rate', 'num_trades']
+# Two-sided 95% normal quantile, for the error bars
+Z_95 = 1.96
+
+DEFAULT_BUDGET_MS = 300
+POLL_SECONDS = 0.5
+EXACT_WORKERS = 2
+
+
+def latency_budget():
+    """Seconds a run waits for exact results (``DASHBOARD_LATENCY_BUDGET_MS``); None when off."""
+    milliseconds = float(os.environ.get('DASHBOARD_LATENCY_BUDGET_MS', DEFAULT_BUDGET_MS))
+    return milliseconds / 1000 if milliseconds > 0 else None
+
+
+def allocate(population, n_rows=SAMPLE_ROWS, min_rows=MIN_STRATUM_ROWS):
+    """Sample size per stratum: proportional to ``population``, at least ``min_rows``, at most all."""
+    population = np.asarray(population, dtype=np.int64)
+    share = np.round(n_rows * population / max(population.sum(), 1)).astype(np.int64)
+    return np.minimum(np.maximum(share, min_rows), population)
+
+
+class StratifiedSample:
+    """Sampled rows plus the population and sample size of each stratum.
+
+    ``sizes`` has one row per stratum: the ``STRATA`` columns, ``population``
+    and ``sampled``; ``rows`` holds the sampled rows with the same columns.
+    """
+
+    def __init__(self, rows, sizes):
+        self.rows = rows.reset_index(drop=True)
+        self.sizes = sizes.reset_index(drop=True)
+        strata = pd.MultiIndex.from_frame(self.sizes[STRATA].astype(str))
+        self.codes = strata.get_indexer(pd.MultiIndex.from_frame(self.rows[STRATA].astype(str)))
+        population = self.sizes['population'].to_numpy(dtype=float)
+        sampled = self.sizes['sampled'].to_numpy(dtype=float)
+        # Variance factor of a stratum total: N^2 (1 - n/N) / n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.variance_scale = np.nan_to_num(population ** 2 * (1 - sampled / population) / sampled)
+        self.expansion = np.nan_to_num(population / np.maximum(sampled, 1))
+
+    @classmethod
+    def from_frame(cls, df, n_rows=SAMPLE_ROWS, seed=0):
+        columns = [c for c in SAMPLE_COLUMNS if c in df.columns]
+        groups = df.groupby(STRATA, observed=True, sort=True).indices
+        keys = list(groups)
+        population = np.array([len(groups[k]) for k in keys], dtype=np.int64)
+        sampled = allocate(population, n_rows)
+        rng = np.random.default_rng(seed)
+        positions = np.sort(np.concatenate(
+            [rng.choice(groups[k], size, replace=False) for k, size in zip(keys, sampled)] or [np.empty(0, dtype=np.intp)]))
+        sizes = pd.DataFrame(keys, columns=STRATA)
+        for col in STRATA:
+            # Keep the label order, so estimates are grouped like the exact roll-ups
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                sizes[col] = pd.Categorical(sizes[col], categories=df[col].cat.categories)
+        sizes['population'], sizes['sampled'] = population, sampled
+        return cls(df.iloc[positions, df.columns.get_indexer(columns)], sizes)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def complete(self):
+        """Whether every row was sampled (the estimates are then exact)."""
+        return bool((self.sizes['sampled'] == self.sizes['population']).all())
+
+    def _domain(self, selections, date_range):
+        domain = np.ones(len(self.rows), dtype=bool)
+        for col, values in selections.items():
+            domain &= self.rows[col].astype(str).isin([str(v) for v in values]).to_numpy()
+        if date_range is not None:
+            dates = self.rows['date']
+            domain &= ((dates >= pd.Timestamp(date_range[0])) & (dates <= pd.Timestamp(date_range[1]))).to_numpy()
+        return domain
+
+    def select(self, selections, date_range, columns=None):
+        """The sampled rows matching the filters (unweighted, e.g. for box plots)."""
+        rows = self.rows[self._domain(selections, date_range)]
+        return rows if columns is None else rows[columns]
+
+    def _stratum_sums(self, values):
+        return np.bincount(self.codes, weights=values, minlength=len(self.sizes))
+
+    def _stratum_moments(self, y, x):
+        """Per stratum: estimated totals of ``y`` and ``x`` and their (co)variance terms."""
+        n = self.sizes['sampled'].to_numpy(dtype=float)
+        sum_y, sum_x = self._stratum_sums(y), self._stratum_sums(x)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            def covariance(sum_uv, sum_u, sum_v):
+                return np.where(n > 1, (sum_uv - sum_u * sum_v / n) / (n - 1), 0.0)
+
+            return {
+                'y': self.expansion * sum_y,
+                'x': self.expansion * sum_x,
+                'var_y': self.variance_scale * covariance(self._stratum_sums(y * y), sum_y, sum_y),
+                'cov_xy': self.variance_scale * covariance(self._stratum_sums(x * y), sum_x, sum_y),
+                'var_x': self.variance_scale * covariance(self._stratum_sums(x * x), sum_x, sum_x),
+            }
+
+    def rollup(self, selections, date_range, aggs, by=None):
+        """Estimated ``rollup`` and its 95% error margins: ``(estimate, error)``.
+
+        Takes the arguments of the backends' ``rollup`` with ``'sum'`` and
+        ``'mean'`` aggregations (``'rows'`` counts rows) and ``by`` limited to
+        the ``STRATA`` columns. Both results have the roll-up's shape.
+        """
+        keys = [] if by is None else [by] if isinstance(by, str) else list(by)
+        if not set(keys) <= set(STRATA):
+            raise ValueError(f"Sample estimates group by {STRATA} only, not {keys}")
+        domain = self._domain(selections, date_range).astype(float)
+
+        per_stratum = {'present': self._stratum_sums(domain)}
+        for col, how in aggs.items():
+            y = x = domain
+            if col != 'rows':
+                values = self.rows[col].to_numpy(dtype=float, na_value=np.nan)
+                y = domain * np.nan_to_num(values)
+                if how == 'mean':
+                    x = domain * ~np.isnan(values)
+                elif how != 'sum':
+                    raise ValueError(f"Unsupported sample aggregation {how!r} for {col}")
+            for name, values in self._stratum_moments(y, x).items():
+                per_stratum[f'{col}.{name}'] = values
+        per_stratum = pd.DataFrame(per_stratum)
+
+        if keys:
+            groups = per_stratum.groupby([self.sizes[k] for k in keys], observed=True, sort=True).sum()
+            groups = groups[groups['present'] > 0]
+        else:
+            groups = per_stratum.sum().to_frame().T
+
+        estimate, error = {}, {}
+        for col, how in aggs.items():
+            y, x = groups[f'{col}.y'], groups[f'{col}.x']
+            var_y, cov_xy, var_x = groups[f'{col}.var_y'], groups[f'{col}.cov_xy'], groups[f'{col}.var_x']
+            with np.errstate(invalid='ignore', divide='ignore'):
+                if col == 'rows' or how == 'sum':
+                    value, variance = y, var_y
+                else:
+                    # Linearized variance of the ratio y / x
+                    value = y / x
+                    variance = (var_y - 2 * value * cov_xy + value ** 2 * var_x) / x ** 2
+            estimate[col] = value
+            error[col] = Z_95 * np.sqrt(np.maximum(variance, 0.0))
+
+        if not keys:
+            return ({col: values.iloc[0] for col, values in estimate.items()},
+                    {col: values.iloc[0] for col, values in error.items()})
+        estimate, error = pd.DataFrame(estimate), pd.DataFrame(error)
+        estimate.index.names = error.index.names = keys
+        return estimate, error
+
+
+class ExactResults:
+    """Exact query results computed on a shared thread pool, keyed by job.
+
+    Keys must identify the result, including the dataset version. Finished
+    results are kept (up to ``max_entries``, least recently used dropped).
+    """
+
+    def __init__(self, workers=EXACT_WORKERS, max_entries=256):
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix='exact-results')
+        self.max_entries = max_entries
+        self.futures = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, key, compute):
+        with self.lock:
+            future = self.futures.get(key)
+            # A failed job is retried on the next request
+            if future is None or (future.done() and future.exception() is not None):
+                future = self.pool.submit(compute)
+                self.futures[key] = future
+            self.futures.move_to_end(key)
+            while len(self.futures) > self.max_entries:
+                oldest = next(iter(self.futures))
+                if not self.futures[oldest].done():
+                    break
+                del self.futures[oldest]
+            return future
+
+    def get(self, key, compute, timeout):
+        """The exact result if it is ready within ``timeout`` seconds, else None.
+
+        The job keeps running after a timeout; ``done`` tells when it finished.
+        """
+        future = self.submit(key, compute)
+        try:
+            return future.result(timeout=max(timeout, 0))
+        except TimeoutError:
+            return None
+
+    def done(self, keys):
+        with self.lock:
+            return all(key not in self.futures or self.futures[key].done() for key in keys)
@@ -0,0 +1,165 @@
+"""Mergeable KLL quantile sketches for the segment cut-points.
+
+The leverage, frequency and consistency segments split ``daily_metrics`` at
+quantiles of ``avg_position`` (or ``leverage``), ``num_trades`` and
+``win_rate``. ``pd.qcut`` needs the whole column in memory and sorts it; a
+KLL sketch (Karnin, Lang & Liberty, 2016) instead keeps a few hundred values
+in levels of compactors, where a value on level ``h`` stands for ``2**h``
+inputs. Compacting a level sorts it, so each chunk fed to the sketch is
+sorted once (``O(n log chunk)`` overall, plus the small upper levels as they
+fill), but no more than a chunk and the kept values is held or sorted at a
+time. A sketch can be updated chunk by chunk, and sketches built on
+separate shards merge into one, with a rank error of about ``1.7 / k``
+(under 1% for the default ``k=200``) whatever the number of rows; the
+worst of many quantiles can reach about 1.5 times that, and
+``tests/test_quantile_sketch.py`` holds it under ``3 / k``.
+
+``segment_cuts`` turns the sketches into the segments' cut-points, which
+``pipeline.add_segments`` applies with ``cut_segment`` and stores with the
+dataset (``segment_cuts.json``), so the dashboard never recomputes them.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 200
+# Capacity of each level relative to the one above it
+CAPACITY_DECAY = 2 / 3
+# Rows fed to a sketch per update when building from an in-memory column
+SKETCH_CHUNK = 1_000_000
+
+# (segment column, source column, labels); the leverage source falls back to
+# avg_position (as leverage_proxy) when the data has no leverage column
+SEGMENTS = [
+    ('leverage_segment', 'leverage', ['Low Leverage', 'High Leverage']),
+    ('frequency_segment', 'num_trades', ['Infrequent', 'Frequent']),
+    ('consistency_segment', 'win_rate', ['Low Consistency', 'Medium Consistency', 'High Consistency']),
+]
+
+
+class KLLSketch:
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def update(self, values):
+        """Add a batch of values (NaNs are skipped)."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += len(values)
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold ``other`` (a sketch of disjoint data) into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self.capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays behind; every other of the rest moves up
+            # with double weight, starting at a random offset
+            keep = items[:1] if len(items) % 2 else items[:0]
+            paired = items[len(keep):]
+            promoted = paired[self.rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Large batches can overflow a level several times over, and
+            # compacting a level can shrink the capacity of the ones below
+            level = 0
+
+    def quantiles(self, qs):
+        """Approximate quantiles ``qs`` (0..1); NaN for an empty sketch."""
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if not self.n:
+            return np.full(len(qs), np.nan)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, ranks = values[order], np.cumsum(weights[order])
+        positions = np.searchsorted(ranks, qs * ranks[-1], side='left')
+        return values[np.minimum(positions, len(values) - 1)]
+
+    def __len__(self):
+        return sum(len(items) for items in self.levels)
+
+
+def sketch_column(values, k=DEFAULT_K, chunk=SKETCH_CHUNK, seed=0):
+    """A sketch of ``values`` built ``chunk`` rows at a time."""
+    return sketch_chunks([values], k, chunk, seed)
+
+
+def sketch_chunks(batches, k=DEFAULT_K, chunk=SKETCH_CHUNK, seed=0):
+    """A sketch of the concatenated ``batches`` (arrays of any length), built ``chunk`` rows at a time.
+
+    The batches are re-cut into the same updates ``sketch_column`` makes, so a
+    column streamed in batches gets the same sketch as the whole array.
+    """
+    sketch = KLLSketch(k, seed)
+    pending, n_pending = [], 0
+    for values in batches:
+        pending.append(np.asarray(values, dtype=float))
+        n_pending += len(pending[-1])
+        if n_pending < chunk:
+            continue
+        values = np.concatenate(pending)
+        full = len(values) - len(values) % chunk
+        for start in range(0, full, chunk):
+            sketch.update(values[start:start + chunk])
+        pending, n_pending = [values[full:]], len(values) - full
+    if n_pending:
+        sketch.update(np.concatenate(pending))
+    return sketch
+
+
+def leverage_source(columns):
+    return 'leverage' if 'leverage' in columns else 'avg_position'
+
+
+def segment_cuts(sketches):
+    """Inner cut-points per source column, from their sketches.
+
+    ``sketches`` maps each source column of ``SEGMENTS`` to its sketch.
+    """
+    cuts = {}
+    for _, source, labels in SEGMENTS:
+        sketch = sketches.get(source)
+        if sketch is None and source == 'leverage':
+            source, sketch = 'avg_position', sketches.get('avg_position')
+        if sketch is None:
+            continue
+        cuts[source] = [float(v) for v in sketch.quantiles(np.arange(1, len(labels)) / len(labels))]
+    return cuts
+
+
+def column_cuts(df, k=DEFAULT_K):
+    """``segment_cuts`` for the columns of an in-memory frame."""
+    sources = [leverage_source(df.columns), 'num_trades', 'win_rate']
+    return segment_cuts({source: sketch_column(df[source], k) for source in sources if source in df.columns})
+
+
+def cut_segment(values, cuts, labels):
+    """Segment labels for ``values`` at the cut-points (right-closed bins, as ``qcut``)."""
+    values = np.asarray(values, dtype=float)
+    codes = np.searchsorted(np.asarray(cuts, dtype=float), values, side='left')
+    return pd.Categorical.from_codes(np.where(np.isnan(values), -1, codes), categories=labels)
@@ -0,0 +1,522 @@
+"""Query backends behind the dashboard's filters and charts.
+
+Both backends answer the same questions: filter options, headline totals,
+grouped roll-ups for the charts, box-plot statistics, (bounded) filtered
+rows, sorted and searchable pages for the Data Explorer, one account's full
+history for the trader drill-down, and the statistics behind the
+significance tests. Each also keeps a stratified sample
+(``progressive.StratifiedSample``) for approximate charts.
+
+* ``PandasBackend`` (default) works on the in-memory frame from
+  ``load_data()`` via the filter engine and the metrics cube.
+* ``DuckDBBackend`` pushes filters and group-bys down to an embedded DuckDB
+  engine reading the Parquet/CSV files in place; only aggregated results
+  come back to Python, so the dataset does not have to fit in RAM. It reads
+  a hard link to the file taken when it was built (see ``pin_file``), so a
+  reload or a pipeline ``--update`` replacing the store doesn't show up
+  mid-session.
+
+Select one with the ``DASHBOARD_QUERY_BACKEND`` environment variable
+(``pandas`` or ``duckdb``).
+"""
+import functools
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from box_stats import MAX_OUTLIERS, STAT_COLUMNS, box_stats_from_arrays
+from data_store import (DAILY_METRICS_CSV, DAILY_METRICS_PARQUET, DERIVED_SEGMENTS, SEGMENT_ORDER, derived_segment_cuts,
+                        label_order, memory_report)
+from filters import FilterEngine, filter_signature, filters_from_signature
+from metrics_cube import MetricsCube, rollup
+from progressive import SAMPLE_COLUMNS, SAMPLE_ROWS, STRATA, StratifiedSample, allocate
+from quantile_sketch import sketch_chunks
+from stat_tests import BOOTSTRAP_BUCKETS, TEST_METRICS, GroupedArrays, GroupedBuckets
+from trader_history import HISTORY_COLUMNS, AccountIndex
+
+QUERY_BACKENDS = ['pandas', 'duckdb']
+
+SQL_AGGREGATES = {
+    # A sum over no rows is 0 in pandas, NULL in SQL
+    'sum': 'COALESCE(SUM({col}), 0)',
+    'count': 'COUNT({col})',
+    'mean': 'AVG({col})',
+    'std': 'STDDEV_SAMP({col})',
+}
+
+# DuckDB vectors (2,048 rows each) fetched per batch when streaming a column
+SCAN_VECTORS = 64
+
+# Explorer pages break ties in the sort column by these (ascending), so equal
+# values page the same way on both backends
+PAGE_TIEBREAKERS = ['date', 'account']
+
+
+class PandasBackend:
+    name = 'pandas'
+
+    def __init__(self, daily_metrics):
+        self.daily_metrics = daily_metrics
+        self.filter_engine = FilterEngine(daily_metrics)
+        self.metrics_cube = MetricsCube(daily_metrics)
+        self.account_index = AccountIndex(daily_metrics['account'])
+        self.sample = StratifiedSample.from_frame(daily_metrics)
+        # Full-frame sort orders, built the first time a column is sorted on
+        self._sort_orders = {}
+        # Row positions of recent explorer views, so paging only slices
+        self._explorer_positions = functools.lru_cache(maxsize=16)(self._compute_explorer_positions)
+
+    def columns(self):
+        return list(self.daily_metrics.columns)
+
+    def overview(self):
+        daily_metrics = self.daily_metrics
+        return {
+            'total_rows': len(daily_metrics),
+            'total_traders': daily_metrics['account'].nunique(),
+            'total_days': daily_metrics['date'].nunique(),
+            'avg_win_rate': daily_metrics['win_rate'].mean(),
+            'total_pnl': daily_metrics['total_pnl'].sum(),
+        }
+
+    def date_bounds(self):
+        return self.filter_engine.min_date, self.filter_engine.max_date
+
+    def memory_report(self):
+        """Memory of each daily_metrics column plus the filter index, cube and account index."""
+        report = memory_report(self.daily_metrics)
+        index_bytes = self.filter_engine.dates.nbytes + sum(
+            bitmap.nbytes for bitmaps in self.filter_engine.bitmaps.values() for bitmap in bitmaps.values())
+        structures = {
+            'filter index': index_bytes,
+            'metrics cube': self.metrics_cube.cells.memory_usage(deep=True).sum(),
+            'account index': self.account_index.nbytes,
+            'progressive sample': self.sample.rows.memory_usage(deep=True).sum(),
+            'sort orders': sum(order.nbytes for order in self._sort_orders.values()),
+        }
+        for name, nbytes in structures.items():
+            report.loc[name] = ['', nbytes / 2**20, 0.0]
+        report['share'] = report['mb'] / report['mb'].sum()
+        return report
+
+    def options(self, col):
+        return self.filter_engine.options(col)
+
+    def rollup(self, selections, date_range, aggs, by=None):
+        return rollup(self.metrics_cube.select(selections, date_range), aggs, by)
+
+    def view(self, selections, date_range):
+        """The filtered rows as a ``FilteredView`` (positions, no copy)."""
+        return self.filter_engine.view(self.daily_metrics, selections, date_range)
+
+    def box_stats(self, selections, date_range, col, by, max_outliers=MAX_OUTLIERS):
+        view = self.view(selections, date_range)
+        return box_stats_from_arrays(view.column(by), view.column(col), max_outliers)
+
+    def rows(self, selections, date_range, columns=None, limit=None):
+        return self.view(selections, date_range).frame(columns, limit)
+
+    def significance_stats(self, selections, date_range, metrics=TEST_METRICS, by='classification'):
+        """The filtered rows of ``metrics`` by ``by``, as ``GroupedArrays``."""
+        columns = [by] + [m for m in metrics if m in self.daily_metrics.columns]
+        return GroupedArrays.from_frame(self.rows(selections, date_range, columns), by, metrics)
+
+    def _sort_key(self, col):
+        values = self.daily_metrics[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Labels in display order (segments low to high, the rest as strings), as DuckDB sorts them
+            return values.cat.reorder_categories(label_order(col, values.cat.categories))
+        return values
+
+    def _sort_order(self, col, ascending):
+        order = self._sort_orders.get((col, ascending))
+        if order is None:
+            keys = [col] + [k for k in PAGE_TIEBREAKERS if k != col]
+            frame = pd.DataFrame({k: self._sort_key(k) for k in keys})
+            # Positions, since load_data() leaves daily_metrics with a RangeIndex
+            order = frame.sort_values(keys, ascending=[ascending] + [True] * (len(keys) - 1),
+                                      kind='stable', na_position='last').index.to_numpy()
+            self._sort_orders[(col, ascending)] = order
+        return order
+
+    def _compute_explorer_positions(self, signature, sort_col, ascending, search):
+        selections, date_range = filters_from_signature(signature)
+        view = self.view(selections, date_range)
+        positions = view.positions
+        if search:
+            # On the categorical account column this matches each distinct id once
+            accounts = pd.Series(view.column('account'))
+            positions = positions[accounts.str.contains(search, case=False, regex=False, na=False).to_numpy(dtype=bool)]
+        order = self._sort_order(sort_col, ascending)
+        selected = np.zeros(len(self.daily_metrics), dtype=bool)
+        selected[positions] = True
+        return order[selected[order]]
+
+    def page(self, selections, date_range, page, page_size, sort_col=None, ascending=True, search=''):
+        """One page of the filtered rows: ``(frame, total_rows, page)``.
+
+        ``page`` is 0-based and clamped to the last page. Rows are sorted by
+        ``sort_col`` (date if none), then by ``PAGE_TIEBREAKERS``.
+        """
+        if not sort_col:
+            sort_col, ascending = 'date', True
+        positions = self._explorer_positions(
+            filter_signature(selections, date_range), sort_col, ascending, search.strip())
+        total = len(positions)
+        page = min(max(page, 0), max(0, (total - 1) // page_size))
+        start = page * page_size
+        return self.daily_metrics.iloc[positions[start:start + page_size]], total, page
+
+    def find_accounts(self, search='', limit=50):
+        return self.account_index.search(search.strip(), limit)
+
+    def account_history(self, account):
+        """All of ``account``'s rows in date order, sliced via the account index."""
+        columns = [c for c in HISTORY_COLUMNS if c in self.daily_metrics.columns]
+        positions = self.account_index.positions(account)
+        return self.daily_metrics.iloc[positions, self.daily_metrics.columns.get_indexer(columns)]
+
+
+def pin_file(path, owner):
+    """A hard link to ``path`` that lives as long as ``owner``; ``path`` if linking fails.
+
+    The store is replaced with ``os.replace``, so the link keeps the file as
+    it was while newer versions land at ``path``. The link sits next to the
+    file (a hidden directory in the data folder), since hard links can't
+    cross filesystems. Without one (read-only folder, no hard links), the
+    live file is read and changes can show up before the snapshot swap.
+    """
+    try:
+        pin_dir = tempfile.mkdtemp(prefix='.duckdb_snapshot_', dir=os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        return path
+    weakref.finalize(owner, shutil.rmtree, pin_dir, True)
+    pinned = os.path.join(pin_dir, os.path.basename(path))
+    try:
+        os.link(path, pinned)
+    except OSError:
+        return path
+    return pinned
+
+
+def in_label_order(frame, keys):
+    """Sort grouped rows by ``keys`` like the pandas backend: segments low to high.
+
+    DuckDB returns the labels as plain strings, whose ``ORDER BY`` puts High
+    before Low; the segment keys become categoricals in ``SEGMENT_ORDER``.
+    """
+    segments = [k for k in keys if k in SEGMENT_ORDER]
+    if not segments:
+        return frame
+    for k in segments:
+        frame[k] = pd.Categorical(frame[k], categories=label_order(k, frame[k].dropna().unique()))
+    return frame.sort_values(keys, kind='stable').reset_index(drop=True)
+
+
+class DuckDBBackend:
+    name = 'duckdb'
+
+    def __init__(self, data_dir='.', database=':memory:'):
+        # Imported on first use: the default pandas backend never loads duckdb
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("The duckdb query backend needs the 'duckdb' package (pip install duckdb)") from None
+
+        parquet_path = os.path.join(data_dir, DAILY_METRICS_PARQUET)
+        csv_path = os.path.join(data_dir, DAILY_METRICS_CSV)
+        if os.path.exists(parquet_path):
+            source = f"read_parquet('{pin_file(parquet_path, self)}')"
+        elif os.path.exists(csv_path):
+            source = f"read_csv_auto('{pin_file(csv_path, self)}')"
+        else:
+            raise FileNotFoundError(f"No {DAILY_METRICS_PARQUET} or {DAILY_METRICS_CSV} in {data_dir}")
+
+        self.con = duckdb.connect(database)
+        self.con.execute(f"CREATE OR REPLACE VIEW raw_daily_metrics AS SELECT * FROM {source}")
+        self.column_types = {row[0]: row[1] for row in self.con.execute("DESCRIBE raw_daily_metrics").fetchall()}
+        columns = list(self.column_types)
+
+        # Segments the store lacks, cut where read_data() cuts them: at the
+        # stored cut-points, or at the same sketch of the column streamed from DuckDB
+        derived = []
+        missing_segments = [s for s in DERIVED_SEGMENTS if s[0] not in columns]
+        if missing_segments:
+            cuts = derived_segment_cuts(lambda col: sketch_chunks(self._column_batches(col)), data_dir)
+            if 'leverage_segment' not in columns and 'leverage_proxy' not in columns:
+                derived.append('avg_position AS leverage_proxy')
+            for segment, source, labels in missing_segments:
+                derived.append(self._cut_segment(source, cuts[source], segment, labels))
+        extra = ''.join(f', {expr}' for expr in derived)
+        self.con.execute(
+            "CREATE OR REPLACE VIEW daily_metrics AS "
+            f"SELECT * REPLACE (CAST(date AS TIMESTAMP) AS date){extra} FROM raw_daily_metrics"
+        )
+        self.sample = self._stratified_sample()
+
+    def columns(self):
+        return [row[0] for row in self.con.cursor().execute("DESCRIBE daily_metrics").fetchall()]
+
+    def _column_batches(self, col):
+        """``col`` of the stored rows, in file order, as float arrays of a few thousand rows."""
+        cursor = self.con.cursor().execute(f'SELECT CAST("{col}" AS DOUBLE) AS v FROM raw_daily_metrics')
+        while True:
+            batch = cursor.fetch_df_chunk(SCAN_VECTORS)
+            if not len(batch):
+                return
+            yield batch['v'].to_numpy(dtype=float, na_value=np.nan)
+
+    @staticmethod
+    def _cut_segment(col, cuts, name, labels):
+        """SQL for ``quantile_sketch.cut_segment``: right-closed bins at ``cuts``."""
+        bins = ''.join(f" WHEN {col} <= '{cut!r}'::DOUBLE THEN '{label}'" for cut, label in zip(cuts, labels))
+        return f"CASE WHEN {col} IS NULL OR isnan({col}) THEN NULL{bins} ELSE '{labels[-1]}' END AS {name}"
+
+    def _stratified_sample(self, n_rows=SAMPLE_ROWS):
+        # Stratum sizes first, then the first rows of each stratum in a hashed (repeatable) order
+        strata = ', '.join(f'"{c}"' for c in STRATA)
+        not_null = ' AND '.join(f'"{c}" IS NOT NULL' for c in STRATA)
+        sizes = self._query(f"SELECT {strata}, COUNT(*) AS population FROM daily_metrics WHERE {not_null} "
+                            f"GROUP BY {strata} ORDER BY {strata}")
+        sizes['sampled'] = allocate(sizes['population'], n_rows)
+        cursor = self.con.cursor()
+        cursor.register('sample_sizes', sizes.copy())
+        # Estimates are grouped in the strata's label order, as the exact roll-ups
+        sizes = in_label_order(sizes, STRATA)
+        columns = ', '.join(f'"{c}"' for c in SAMPLE_COLUMNS if c in self.columns())
+        rows = cursor.execute(f"""
+            SELECT {columns} FROM (
+                SELECT d.*, s.sampled,
+                       ROW_NUMBER() OVER (PARTITION BY {strata} ORDER BY hash(d.account, d."date")) AS rn
+                FROM daily_metrics d JOIN sample_sizes s USING ({strata})
+            ) WHERE rn <= sampled ORDER BY "date"
+        """).df()
+        return StratifiedSample(rows, sizes)
+
+    def _aggregate(self, col, how):
+        if col == 'rows':
+            return 'COUNT(*)'
+        expr = SQL_AGGREGATES[how].format(col=f'"{col}"')
+        # DuckDB widens integer sums to HUGEINT; keep them as int64 like pandas
+        if how == 'sum' and self.column_types.get(col, '').endswith(('INT', 'INTEGER')):
+            expr = f'CAST({expr} AS BIGINT)'
+        return expr
+
+    def _query(self, sql, params=None):
+        # A cursor per query: Streamlit serves sessions from several threads
+        return self.con.cursor().execute(sql, params or []).df()
+
+    def _where(self, selections, date_range):
+        clauses, params = [], []
+        for col, selected in selections.items():
+            clauses.append(f'list_contains(?, "{col}")')
+            params.append([str(v) for v in selected])
+        if date_range is not None:
+            clauses.append('"date" BETWEEN ? AND ?')
+            params += [pd.Timestamp(date_range[0]).to_pydatetime(), pd.Timestamp(date_range[1]).to_pydatetime()]
+        return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def overview(self):
+        row = self._query("""
+            SELECT COUNT(*) AS total_rows, COUNT(DISTINCT account) AS total_traders, COUNT(DISTINCT "date") AS total_days,
+                   AVG(win_rate) AS avg_win_rate, COALESCE(SUM(total_pnl), 0) AS total_pnl
+            FROM daily_metrics
+        """)
+        return {col: row[col].iloc[0] for col in row.columns}
+
+    def date_bounds(self):
+        row = self._query('SELECT MIN("date") AS lo, MAX("date") AS hi FROM daily_metrics').iloc[0]
+        return row['lo'], row['hi']
+
+    def memory_report(self):
+        """DuckDB's own memory by component; the data stays in the files."""
+        usage = self._query("SELECT tag, memory_usage_bytes FROM duckdb_memory() WHERE memory_usage_bytes > 0")
+        report = pd.DataFrame({'dtype': '', 'mb': usage['memory_usage_bytes'].to_numpy() / 2**20},
+                              index=usage['tag'].to_numpy())
+        report['share'] = report['mb'] / max(report['mb'].sum(), 1e-9)
+        return report.sort_values('mb', ascending=False)
+
+    def options(self, col):
+        values = self._query(f'SELECT DISTINCT "{col}" AS v FROM daily_metrics WHERE "{col}" IS NOT NULL')['v']
+        return sorted(values)
+
+    def rollup(self, selections, date_range, aggs, by=None):
+        select = [f'{self._aggregate(col, how)} AS "{col}"' for col, how in aggs.items()]
+        where, params = self._where(selections, date_range)
+
+        if by is None:
+            result = self._query(f"SELECT {', '.join(select)} FROM daily_metrics {where}", params)
+            return {col: result[col].iloc[0] for col in result.columns}
+
+        keys = [by] if isinstance(by, str) else list(by)
+        key_sql = ', '.join(f'"{k}"' for k in keys)
+        # Rows with a missing key are dropped, as pandas' groupby does
+        not_null = ' AND '.join(f'"{k}" IS NOT NULL' for k in keys)
+        where = f'{where} AND {not_null}' if where else f'WHERE {not_null}'
+        result = self._query(
+            f"SELECT {key_sql}, {', '.join(select)} FROM daily_metrics {where} "
+            f"GROUP BY {key_sql} ORDER BY {key_sql}",
+            params,
+        )
+        return in_label_order(result, keys).set_index(by)
+
+    def box_stats(self, selections, date_range, col, by, max_outliers=MAX_OUTLIERS):
+        where, params = self._where(selections, date_range)
+        not_null = f'"{by}" IS NOT NULL AND "{col}" IS NOT NULL'
+        where = f'{where} AND {not_null}' if where else f'WHERE {not_null}'
+        # Quartiles first, then whisker ends and a hashed (repeatable) outlier sample against them
+        bounds_sql = f"""
+            WITH f AS (SELECT "{by}" AS k, CAST("{col}" AS DOUBLE) AS v FROM daily_metrics {where}),
+            q AS (
+                SELECT k, COUNT(*) AS "count", AVG(v) AS mean, quantile_cont(v, 0.25) AS q1,
+                       quantile_cont(v, 0.5) AS median, quantile_cont(v, 0.75) AS q3
+                FROM f GROUP BY k
+            ),
+            b AS (SELECT *, q1 - 1.5 * (q3 - q1) AS lo, q3 + 1.5 * (q3 - q1) AS hi FROM q)
+        """
+        stats = self._query(bounds_sql + """
+            SELECT b.k, ANY_VALUE(b."count") AS "count", ANY_VALUE(b.mean) AS mean, ANY_VALUE(b.q1) AS q1,
+                   ANY_VALUE(b.median) AS median, ANY_VALUE(b.q3) AS q3,
+                   MIN(f.v) FILTER (WHERE f.v >= b.lo) AS lowerfence,
+                   MAX(f.v) FILTER (WHERE f.v <= b.hi) AS upperfence
+            FROM f JOIN b USING (k) GROUP BY b.k ORDER BY b.k
+        """, params).set_index('k')
+        outliers = self._query(bounds_sql + f"""
+            SELECT k, v FROM (
+                SELECT f.k, f.v,
+                       ROW_NUMBER() OVER (PARTITION BY f.k ORDER BY hash(f.v)) AS rn,
+                       f.v = MIN(f.v) OVER (PARTITION BY f.k) OR f.v = MAX(f.v) OVER (PARTITION BY f.k) AS extreme
+                FROM f JOIN b USING (k) WHERE f.v < b.lo OR f.v > b.hi
+            ) WHERE extreme OR rn <= {int(max_outliers) - 2}
+        """, params)
+
+        stats = stats[STAT_COLUMNS]
+        if by in SEGMENT_ORDER:
+            stats = stats.reindex(label_order(by, stats.index))
+        stats.index.name = None
+        grouped = outliers.groupby('k')['v']
+        stats['outliers'] = [np.sort(grouped.get_group(k).to_numpy()) if k in grouped.groups else np.empty(0)
+                             for k in stats.index]
+        return stats
+
+    def rows(self, selections, date_range, columns=None, limit=None):
+        select = ', '.join(f'"{c}"' for c in columns) if columns else '*'
+        where, params = self._where(selections, date_range)
+        limit_sql = f' LIMIT {int(limit)}' if limit is not None else ''
+        return self._query(f'SELECT {select} FROM daily_metrics {where} ORDER BY "date"{limit_sql}', params)
+
+    def significance_stats(self, selections, date_range, metrics=TEST_METRICS, by='classification',
+                           buckets=BOOTSTRAP_BUCKETS):
+        """The filtered rows' statistics by ``by``, as ``GroupedBuckets``.
+
+        Rows are bucketed by a hash of (account, date); per group and bucket
+        come back the row count and each metric's count, mean and variance.
+        The Mann-Whitney statistics come from each metric's value counts per
+        group: a value of group ``i`` outranks every value of group ``j``
+        below it and half of those equal to it.
+        """
+        metrics = [m for m in metrics if m in self.column_types]
+        where, params = self._where(selections, date_range)
+        not_null = f'"{by}" IS NOT NULL'
+        where = f'{where} AND {not_null}' if where else f'WHERE {not_null}'
+        # NaN is missing, as in pandas
+        values = {m: f"""NULLIF(CAST("{m}" AS DOUBLE), 'NaN'::DOUBLE)""" for m in metrics}
+        select = ', '.join(f'COUNT({values[m]}) AS "n_{m}", AVG({values[m]}) AS "mean_{m}", '
+                           f'VAR_POP({values[m]}) AS "var_{m}"' for m in metrics)
+        cells = self._query(f"""
+            SELECT CAST("{by}" AS VARCHAR) AS g, hash(account, "date") % {int(buckets)} AS b, COUNT(*) AS "rows", {select}
+            FROM daily_metrics {where} GROUP BY g, b
+        """, params)
+
+        groups = sorted(cells['g'].unique())
+        g = pd.Index(groups).get_indexer(cells['g'])
+        b = cells['b'].to_numpy(dtype=np.int64)
+        rows = np.zeros((len(groups), buckets))
+        rows[g, b] = cells['rows'].to_numpy(dtype=float)
+        stats = {}
+        for stat in ['n', 'mean', 'var']:
+            stats[stat] = np.zeros((len(groups), buckets, len(metrics)))
+            for m, metric in enumerate(metrics):
+                stats[stat][g, b, m] = cells[f'{stat}_{metric}'].to_numpy(dtype=float, na_value=np.nan)
+
+        pairs = [(i, j) for i in range(len(groups)) for j in range(i + 1, len(groups))]
+        ranks = {pair: (np.zeros(len(metrics)), np.zeros(len(metrics))) for pair in pairs}
+        if pairs:
+            for m, metric in enumerate(metrics):
+                counts = ', '.join(f'CAST(COUNT(*) FILTER (WHERE g = ?) AS DOUBLE) AS c{i}' for i in range(len(groups)))
+                below = ', '.join(f'SUM(c{i}) OVER (ORDER BY x ROWS UNBOUNDED PRECEDING) - c{i} AS below{i}'
+                                  for i in range(len(groups)))
+                sums = ', '.join(f'SUM(c{i} * (below{j} + 0.5 * c{j})) AS u{i}_{j}, '
+                                 f'SUM(POW(c{i} + c{j}, 3) - (c{i} + c{j})) AS t{i}_{j}' for i, j in pairs)
+                result = self._query(f"""
+                    WITH v AS (
+                        SELECT CAST("{by}" AS VARCHAR) AS g, {values[metric]} AS x FROM daily_metrics {where}
+                    ),
+                    c AS (SELECT x, {counts} FROM v WHERE x IS NOT NULL GROUP BY x),
+                    r AS (SELECT *, {below} FROM c)
+                    SELECT {sums} FROM r
+                """, params + groups).iloc[0]
+                for i, j in pairs:
+                    ranks[(i, j)][0][m] = result[f'u{i}_{j}']
+                    ranks[(i, j)][1][m] = result[f't{i}_{j}']
+        return GroupedBuckets(groups, metrics, rows, stats['n'], stats['mean'], stats['var'], ranks)
+
+    def page(self, selections, date_range, page, page_size, sort_col=None, ascending=True, search=''):
+        where, params = self._where(selections, date_range)
+        search = search.strip()
+        if search:
+            where = f'{where} AND' if where else 'WHERE'
+            where = f"{where} CAST(account AS VARCHAR) ILIKE '%' || ? || '%'"
+            params = params + [search]
+
+        total = self._query(f'SELECT COUNT(*) AS n FROM daily_metrics {where}', params)['n'].iloc[0]
+        page = min(max(page, 0), max(0, (int(total) - 1) // page_size))
+        if not sort_col:
+            sort_col, ascending = 'date', True
+        frame = self._query(
+            f'SELECT * FROM daily_metrics {where} ORDER BY {self._page_order(sort_col, ascending)} '
+            f'LIMIT {int(page_size)} OFFSET {int(page * page_size)}',
+            params,
+        )
+        return frame, int(total), page
+
+    def _page_order(self, col, ascending):
+        """``ORDER BY`` terms matching ``PandasBackend._sort_order``."""
+        direction = 'ASC' if ascending else 'DESC'
+        # NULLs last either way; segment labels low to high, then any other labels by name
+        terms = [f'"{col}" IS NULL']
+        if col in SEGMENT_ORDER:
+            known = ', '.join("'{}'".format(label.replace("'", "''")) for label in SEGMENT_ORDER[col])
+            terms.append(f'COALESCE(list_position([{known}], "{col}"), {len(SEGMENT_ORDER[col]) + 1}) {direction}')
+        terms.append(f'"{col}" {direction}')
+        terms += [f'"{k}"' for k in PAGE_TIEBREAKERS if k != col]
+        return ', '.join(terms)
+
+    def find_accounts(self, search='', limit=50):
+        search = search.strip()
+        where, params = '', []
+        if search:
+            where, params = "WHERE CAST(account AS VARCHAR) ILIKE '%' || ? || '%'", [search]
+        accounts = self._query(
+            f'SELECT DISTINCT CAST(account AS VARCHAR) AS account FROM daily_metrics {where} '
+            f'ORDER BY account LIMIT {int(limit)}',
+            params,
+        )
+        return accounts['account'].tolist()
+
+    def account_history(self, account):
+        columns = [c for c in HISTORY_COLUMNS if c in self.column_types]
+        select = ', '.join(f'"{c}"' for c in columns)
+        return self._query(
+            f'SELECT {select} FROM daily_metrics WHERE CAST(account AS VARCHAR) = ? ORDER BY "date"', [str(account)])
+
+
+def query_backend_name():
+    name = os.environ.get('DASHBOARD_QUERY_BACKEND', 'pandas').lower()
+    if name not in QUERY_BACKENDS:
+        raise ValueError(f"DASHBOARD_QUERY_BACKEND must be one of {QUERY_BACKENDS}, not {name!r}")
+    return name
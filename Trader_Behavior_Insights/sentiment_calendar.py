@@ -0,0 +1,135 @@
+"""Fear/Greed index on a dense day grid, and sentiment-window features.
+
+The notebook joins the Fear/Greed index to the trades with a ``merge`` on
+``date`` after ``drop_duplicates``, which hashes every trade row and only
+gives the same day's sentiment. ``SentimentCalendar`` instead lays the index
+out as arrays with one slot per calendar day from its first to its last
+date, so a row's sentiment is at ``(date - start).days``: the join is an
+array lookup.
+
+The window features are computed once on the day grid, with cumulative
+sums and running maxima (no per-row Python), and looked up the same way:
+
+* ``sentiment_7d_mean``: mean index value over the trailing 7 days
+* ``sentiment_ewm``: exponentially weighted mean of the index (7-day half-life)
+* ``regime_change``: the classification differs from the previous day's
+  with data
+* ``days_since_extreme_fear``: days since the last Extreme Fear day (0 on
+  one; missing before the first)
+
+Days missing from the index (and dates outside it) have no value or
+classification, as with the left merge; the window features skip them.
+"""
+import numpy as np
+import pandas as pd
+
+SENTIMENT_FEATURES = ['sentiment_7d_mean', 'sentiment_ewm', 'regime_change', 'days_since_extreme_fear']
+SENTIMENT_COLUMNS = ['classification', 'value'] + SENTIMENT_FEATURES
+
+WINDOW_DAYS = 7
+EWM_HALFLIFE_DAYS = 7
+EXTREME_FEAR = 'Extreme Fear'
+
+ONE_DAY = np.timedelta64(1, 'D')
+
+
+class SentimentCalendar:
+    """The index as dense per-day arrays from its first to its last date.
+
+    Each array has one extra trailing slot for "no sentiment", so a lookup
+    with slot -1 (a missing or out-of-range date) lands on it.
+    """
+
+    def __init__(self, fear_greed_df):
+        dates = pd.to_datetime(fear_greed_df['date']).dt.normalize().to_numpy(dtype='datetime64[D]')
+        # First row per date, as drop_duplicates('date') keeps
+        _, first = np.unique(dates, return_index=True)
+        dates = dates[first]
+        classification = pd.Categorical(fear_greed_df['classification'].to_numpy()[first])
+        values = fear_greed_df['value'].to_numpy()[first]
+
+        self.start = dates.min() if len(dates) else np.datetime64('1970-01-01')
+        self.n_days = int((dates.max() - self.start) // ONE_DAY) + 1 if len(dates) else 0
+        days = ((dates - self.start) // ONE_DAY).astype(np.int64)
+
+        self.value_dtype = values.dtype
+        self.value = np.full(self.n_days + 1, np.nan)
+        self.value[days] = values
+        self.categories = classification.categories
+        self.codes = np.full(self.n_days + 1, -1, dtype=np.int8)
+        self.codes[days] = classification.codes
+        self.features = self._features()
+
+    def __len__(self):
+        return self.n_days
+
+    def _features(self):
+        n_slots = len(self.value)
+        day = np.arange(n_slots)
+        present = ~np.isnan(self.value)
+
+        # Trailing window sums from prefix sums of the (gap-filled) values
+        value_prefix = np.concatenate([[0.0], np.cumsum(np.where(present, self.value, 0.0))])
+        count_prefix = np.concatenate([[0], np.cumsum(present)])
+        window_start = np.maximum(day - WINDOW_DAYS + 1, 0)
+        window_count = count_prefix[1:] - count_prefix[window_start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            window_mean = (value_prefix[1:] - value_prefix[window_start]) / window_count
+
+        ewm = pd.Series(self.value).ewm(halflife=EWM_HALFLIFE_DAYS, ignore_na=True).mean().to_numpy()
+
+        # Code of the previous classified day, via a running max of classified slots
+        classified = self.codes >= 0
+        last_classified = np.maximum.accumulate(np.where(classified, day, -1))
+        previous = np.concatenate([[-1], last_classified[:-1]])
+        previous_code = np.where(previous >= 0, self.codes[previous], -1)
+        regime_change = classified & (previous_code >= 0) & (self.codes != previous_code)
+
+        is_extreme = classified & (self.codes == self.categories.get_indexer([EXTREME_FEAR])[0])
+        last_extreme = np.maximum.accumulate(np.where(is_extreme, day, -1))
+        days_since = np.where(last_extreme >= 0, day - last_extreme, np.nan)
+
+        features = {
+            'sentiment_7d_mean': np.where(window_count > 0, window_mean, np.nan),
+            'sentiment_ewm': ewm,
+            'days_since_extreme_fear': days_since,
+        }
+        for col, values in features.items():
+            # The windows reach into the "no sentiment" slot too; blank it
+            features[col] = values.astype(np.float32)
+            features[col][-1] = np.nan
+        features['regime_change'] = regime_change
+        return features
+
+    def positions(self, dates):
+        """Day slot of each date; -1 for missing dates and dates outside the index."""
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype='datetime64[D]')
+        missing = np.isnat(dates)
+        days = (np.where(missing, self.start, dates) - self.start) // ONE_DAY
+        return np.where(missing | (days < 0) | (days >= self.n_days), -1, days).astype(np.int64)
+
+    def lookup(self, dates, columns=SENTIMENT_COLUMNS):
+        """The sentiment ``columns`` for each of ``dates``, as a dict of arrays."""
+        slots = self.positions(dates)
+        result = {}
+        for col in columns:
+            if col == 'classification':
+                result[col] = pd.Categorical.from_codes(self.codes[slots], categories=self.categories)
+            elif col == 'value':
+                values = self.value[slots]
+                # Integer like the source when every row has a value, as merge leaves it
+                result[col] = values if np.isnan(values).any() else values.astype(self.value_dtype)
+            else:
+                result[col] = self.features[col][slots]
+        return result
+
+
+def add_sentiment(daily_metrics, calendar, columns=SENTIMENT_COLUMNS, dates=None):
+    """Add the sentiment ``columns`` to ``daily_metrics`` by day lookup (in place).
+
+    ``dates`` defaults to the ``date`` column.
+    """
+    looked_up = calendar.lookup(daily_metrics['date'] if dates is None else dates, columns)
+    for col in columns:
+        daily_metrics[col] = looked_up[col]
+    return daily_metrics
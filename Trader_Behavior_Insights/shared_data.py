@@ -0,0 +1,124 @@
+"""Share one read-only copy of the loaded dataset between server processes.
+
+Within a process the dashboard already serves every session from a single
+snapshot. With several Streamlit processes (e.g. one per core behind a load
+balancer) each would still hold its own copy, so the first process to load a
+dataset version publishes its tables as uncompressed Arrow IPC files in a
+shared-memory directory, and every process then memory-maps those files.
+The DataFrames built on the mapping do not copy the columns: N processes
+cost one copy of the data in the page cache, and the arrays are read-only.
+For that the tables are written in the layout pandas uses (``arrow_table``):
+missing floats stay NaN rather than nulls, whose bitmap ``to_pandas`` would
+fill into a private copy, and bools are stored one byte each rather than as
+Arrow's packed bits.
+
+Enable it with ``DASHBOARD_SHARED_DATA=/dev/shm/trader_insights`` (any
+directory works; on Linux ``/dev/shm`` keeps the files in RAM). Files from
+older dataset versions are removed when a new version is published;
+processes still mapping them keep working until they swap snapshots.
+"""
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pyarrow is optional, each process then loads its own copy
+    pa = None
+
+
+def shared_data_dir():
+    """Directory for the shared tables, or None when sharing is off."""
+    return os.environ.get('DASHBOARD_SHARED_DATA') or None
+
+
+def shared_path(shared_dir, name, version):
+    return os.path.join(shared_dir, f'{name}-{version}.arrow')
+
+
+# Schema metadata key listing the bool columns stored as uint8
+BOOL_COLUMNS_KEY = b'shared_data.bool_columns'
+
+
+def arrow_table(df):
+    """``df`` as an Arrow table that ``to_pandas`` can wrap column by column without copying."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    bool_columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        if pd.api.types.is_float_dtype(values.dtype) and table.column(i).null_count:
+            # NaN values, no validity bitmap
+            array = pa.array(values.to_numpy(), from_pandas=False)
+        elif values.dtype == bool:
+            array = pa.array(values.to_numpy().view(np.uint8))
+            bool_columns.append(col)
+        else:
+            continue
+        table = table.set_column(i, pa.field(col, array.type), array)
+    metadata = dict(table.schema.metadata or {})
+    metadata[BOOL_COLUMNS_KEY] = json.dumps(bool_columns).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def publish(df, path):
+    """Write ``df`` as an Arrow IPC file, replacing ``path`` in one step."""
+    table = arrow_table(df)
+    # Per-process temporary name: several processes may publish at once
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def open_shared(path):
+    """Memory-map an Arrow IPC file as a read-only DataFrame (no column copies)."""
+    table = ipc.open_file(pa.memory_map(path)).read_all()
+    df = table.to_pandas(split_blocks=True)
+    for col in json.loads((table.schema.metadata or {}).get(BOOL_COLUMNS_KEY, b'[]')):
+        # A bool view of the mapped bytes; assigning a Series keeps it uncopied
+        df[col] = pd.Series(df[col].to_numpy().view(bool), index=df.index, copy=False)
+    return df
+
+
+def remove_stale(shared_dir, name, version):
+    """Delete the published files of ``name`` for every other version."""
+    keep = shared_path(shared_dir, name, version)
+    for path in glob.glob(shared_path(shared_dir, name, '*')):
+        if path != keep:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def load_shared(shared_dir, version, names, load):
+    """Tables ``{name: DataFrame}`` mapped from ``shared_dir``.
+
+    ``load()`` builds them (as a dict keyed by ``names``) when this dataset
+    version has not been published yet. Without a ``shared_dir`` or pyarrow
+    it is simply called.
+    """
+    if shared_dir is None or pa is None:
+        return load()
+
+    paths = {name: shared_path(shared_dir, name, version) for name in names}
+    if all(os.path.exists(path) for path in paths.values()):
+        try:
+            return {name: open_shared(path) for name, path in paths.items()}
+        except FileNotFoundError:
+            # Removed by a process that just published a newer version; this
+            # process will reload that one too, so don't republish the old one
+            return load()
+
+    os.makedirs(shared_dir, exist_ok=True)
+    tables = load()
+    for name in names:
+        publish(tables[name], paths[name])
+        remove_stale(shared_dir, name, version)
+    # Map the published files, so this process holds no private copy either
+    return {name: open_shared(path) for name, path in paths.items()}
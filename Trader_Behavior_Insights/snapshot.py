@@ -0,0 +1,99 @@
+"""Versioned data snapshots with non-blocking background reloads.
+
+The dashboard serves every session from one immutable ``Snapshot`` (the
+query backend plus the version of the files it was built from). Script runs
+poll the files' identity at most every few seconds; when it changes, a new
+snapshot is built in a background thread while sessions keep being served
+from the old one, and the new snapshot replaces it in a single reference
+assignment. A run therefore sees either the old data or the new data, never
+a mix, and a data refresh never blocks a page or needs a restart.
+
+While a reload runs, both snapshots are held in memory.
+"""
+import threading
+import time
+
+DEFAULT_CHECK_SECONDS = 5.0
+
+
+class Snapshot:
+    def __init__(self, version, data):
+        self.version = version
+        self.data = data
+        self.loaded_at = time.time()
+
+
+class SnapshotManager:
+    """Serve the latest loaded snapshot and reload it when the files change.
+
+    ``load()`` builds the data; ``version()`` identifies the files on disk
+    (e.g. ``data_store.dataset_version``) and must be cheap.
+    """
+
+    def __init__(self, load, version, check_seconds=DEFAULT_CHECK_SECONDS):
+        self.load = load
+        self.version = version
+        self.check_seconds = check_seconds
+        self.snapshot = None
+        self.reloading = False
+        self.reload_error = None
+        self.failed_version = None
+        self.last_check = time.monotonic()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def _build(self):
+        # Read the version first: if the files change during the load, the
+        # snapshot is tagged as outdated and the next check reloads it
+        version = self.version()
+        return Snapshot(version, self.load())
+
+    def current(self):
+        """The snapshot to serve; starts a background reload if the files changed.
+
+        The first call loads synchronously, since there is nothing to serve yet.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            with self.lock:
+                if self.snapshot is None:
+                    self.snapshot = self._build()
+                return self.snapshot
+
+        now = time.monotonic()
+        if now - self.last_check >= self.check_seconds:
+            self.last_check = now
+            self._maybe_reload(snapshot)
+        return snapshot
+
+    def _maybe_reload(self, snapshot):
+        version = self.version()
+        # Don't retry files that already failed to load until they change again
+        if version == snapshot.version or version == self.failed_version:
+            return
+        with self.lock:
+            if self.reloading:
+                return
+            self.reloading = True
+        self.thread = threading.Thread(target=self._reload, name='data-reload', daemon=True)
+        self.thread.start()
+
+    def _reload(self):
+        try:
+            snapshot = self._build()
+        except Exception as e:
+            self.reload_error = e
+            self.failed_version = self.version()
+        else:
+            # Sessions pick up the new snapshot on their next run
+            self.snapshot = snapshot
+            self.reload_error = None
+            self.failed_version = None
+        finally:
+            self.reloading = False
+
+    def wait(self, timeout=None):
+        """Block until a running background reload finishes (for scripts and benchmarks)."""
+        thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,356 @@
+"""Batched significance tests of trader behavior across sentiment groups.
+
+The notebook runs one ``f_oneway`` per metric and one ``ttest_ind`` /
+``mannwhitneyu`` for Fear vs Greed, each over lists built by iterating a
+``groupby``. Here the rows are sorted by group once into a (rows × metrics)
+array, and every test is computed for all metrics at once from per-group
+counts, means and variances:
+
+* ``anova``: one-way ANOVA per metric (as ``scipy.stats.f_oneway``)
+* ``pairwise_tests``: Student's t-test (as ``ttest_ind``) and the
+  Mann-Whitney U test (as ``mannwhitneyu``, two-sided, asymptotic) for every
+  metric and every pair of groups; the U test ranks all metrics of a pair
+  in one column-wise pass
+* ``bootstrap_means``: percentile bootstrap CIs of each group's mean and of
+  every pairwise mean difference. The resamples are drawn in fixed-size
+  chunks with their own seeds, so the result depends on the seed, not on
+  how the chunks are run: in-process, on an ``executor`` (the dashboard
+  passes a thread pool with one thread per core; numpy releases the GIL in
+  the resampling kernels) or on a process pool of ``workers``, as the
+  benchmark does.
+
+The tests take the rows as ``GroupedArrays``, or, from a database that
+shouldn't ship every row to Python, as ``GroupedBuckets``: per group and
+hash bucket of rows, the counts, means and variances, plus the
+Mann-Whitney rank statistics of every pair. The ANOVA and t-tests only need
+the group moments, which combine exactly from the buckets. The bootstrap
+resamples the buckets (how many draws land in each is multinomial, as when
+resampling rows) and draws each bucket's sum from its normal approximation,
+which is exact for buckets of one row.
+
+Missing values are left out per metric (``nan_policy='omit'``). scipy is
+imported inside the test functions, so importing this module stays cheap for
+dashboard pages that don't show the tests.
+"""
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from parallel import resolve_workers
+
+# The notebook's behavior_metrics plus daily PnL
+TEST_METRICS = ['total_pnl', 'num_trades', 'avg_trade_size', 'long_short_ratio', 'win_rate']
+
+N_RESAMPLES = 1000
+CONFIDENCE = 0.95
+# Resamples per pool task; fixed so the seeds don't depend on the worker count
+BOOTSTRAP_CHUNK = 100
+# Draw counts per batch inside a task (bounds its memory)
+BOOTSTRAP_BATCH_VALUES = 2**22
+# Hash buckets per group in ``GroupedBuckets``
+BOOTSTRAP_BUCKETS = 1024
+
+
+class GroupedArrays:
+    """Rows of ``values`` (rows × metrics) sorted into contiguous groups."""
+
+    def __init__(self, keys, values, metrics):
+        codes, groups = pd.factorize(keys, sort=True)
+        keep = codes >= 0
+        order = np.argsort(codes[keep], kind='stable')
+        self.values = np.asarray(values, dtype=float)[keep][order]
+        self.metrics = list(metrics)
+        self.groups = list(groups)
+        self.bounds = np.searchsorted(codes[keep][order], np.arange(len(groups) + 1))
+
+    @classmethod
+    def from_frame(cls, df, by='classification', metrics=TEST_METRICS):
+        metrics = [m for m in metrics if m in df.columns]
+        return cls(df[by].array, df[metrics].to_numpy(dtype=float, na_value=np.nan), metrics)
+
+    def group(self, i):
+        return self.values[self.bounds[i]:self.bounds[i + 1]]
+
+    def moments(self):
+        """Per group × metric non-missing counts, means and variances (ddof=1)."""
+        shape = (len(self.groups), len(self.metrics))
+        n, mean, var = np.zeros(shape), np.full(shape, np.nan), np.full(shape, np.nan)
+        for i in range(len(self.groups)):
+            values = self.group(i)
+            n[i] = (~np.isnan(values)).sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean[i] = np.nansum(values, axis=0) / n[i]
+                var[i] = np.nansum((values - mean[i]) ** 2, axis=0) / (n[i] - 1)
+        return n, mean, var
+
+    def pairs(self):
+        return list(combinations(range(len(self.groups)), 2))
+
+    def rank_statistics(self, i, j):
+        return rank_statistics(self.group(i), self.group(j))
+
+    def resampler(self, i):
+        """``(function, args)`` drawing bootstrap means of group ``i`` (``function(*args, n, seed)``)."""
+        values = self.group(i)
+        return (resample_means, (values,)) if len(values) else None
+
+
+class GroupedBuckets:
+    """Per-group statistics of hash buckets of rows, in place of the rows.
+
+    ``rows`` is (groups × buckets); ``n``, ``mean`` and ``var`` (population
+    variance) are (groups × buckets × metrics) over each metric's non-missing
+    values. ``ranks`` maps a pair of group positions to ``(U, tie_sums)``
+    per metric, as ``rank_statistics`` returns them for the rows.
+    """
+
+    def __init__(self, groups, metrics, rows, n, mean, var, ranks):
+        self.groups = list(groups)
+        self.metrics = list(metrics)
+        self.rows = np.asarray(rows, dtype=float)
+        self.n = np.asarray(n, dtype=float)
+        # Empty buckets add nothing
+        self.mean = np.nan_to_num(np.asarray(mean, dtype=float))
+        self.var = np.nan_to_num(np.asarray(var, dtype=float))
+        self.ranks = ranks
+
+    def moments(self):
+        """Per group × metric counts, means and variances (ddof=1), combined from the buckets."""
+        n = self.n.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (self.n * self.mean).sum(axis=1) / n
+            spread = (self.n * (self.var + (self.mean - mean[:, None]) ** 2)).sum(axis=1)
+            var = spread / (n - 1)
+        return n, np.where(n > 0, mean, np.nan), np.where(n > 1, var, np.nan)
+
+    def pairs(self):
+        return list(combinations(range(len(self.groups)), 2))
+
+    def rank_statistics(self, i, j):
+        n, _, _ = self.moments()
+        u_stat, ties = self.ranks[(i, j)]
+        return u_stat, n[i], n[j], ties
+
+    def resampler(self, i):
+        # Empty buckets only cost draws
+        keep = self.rows[i] > 0
+        if not keep.any():
+            return None
+        return resample_bucket_means, (self.rows[i, keep], self.n[i, keep], self.mean[i, keep], self.var[i, keep])
+
+
+def anova(grouped):
+    """One-way ANOVA of every metric across the groups (groups with data only)."""
+    from scipy import stats
+
+    n, mean, var = grouped.moments()
+    present = n > 0
+    k = present.sum(axis=0)
+    total = n.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        grand = np.nansum(n * mean, axis=0) / total
+        between = np.nansum(n * (mean - grand) ** 2, axis=0)
+        within = np.nansum(np.where(n > 1, (n - 1) * var, 0.0), axis=0)
+        df_between, df_within = k - 1, total - k
+        f_stat = (between / df_between) / (within / df_within)
+    p_value = stats.f.sf(f_stat, df_between, df_within)
+    invalid = (k < 2) | (df_within <= 0)
+    return pd.DataFrame({
+        'groups': k,
+        'rows': total.astype(int),
+        'F': np.where(invalid, np.nan, f_stat),
+        'p_value': np.where(invalid, np.nan, p_value),
+    }, index=pd.Index(grouped.metrics, name='metric'))
+
+
+def tie_sums(values):
+    """Per column, the tie term sum(t**3 - t) over runs of equal non-missing values."""
+    ordered = np.sort(values, axis=0).T
+    n_cols, n_rows = ordered.shape
+    present = ~np.isnan(ordered)
+    # A run starts at the first row of a column or where the value changes
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    starts &= present
+    start_positions = np.flatnonzero(starts)
+    # Runs end at the next start or at the column's last non-missing value
+    ends = np.append(start_positions[1:], n_cols * n_rows)
+    column_ends = np.arange(n_cols) * n_rows + present.sum(axis=1)
+    columns = start_positions // n_rows
+    run_lengths = (np.minimum(ends, column_ends[columns]) - start_positions).astype(float)
+    return np.bincount(columns, weights=run_lengths ** 3 - run_lengths, minlength=n_cols)
+
+
+def rank_statistics(x, y):
+    """Per column of ``x`` vs ``y``: Mann-Whitney ``U`` of ``x``, the sizes and the tie term."""
+    from scipy import stats
+
+    combined = np.concatenate([x, y])
+    ranks = stats.rankdata(combined, axis=0, nan_policy='omit')
+    n1 = (~np.isnan(x)).sum(axis=0).astype(float)
+    n2 = (~np.isnan(y)).sum(axis=0).astype(float)
+    u_stat = np.nansum(ranks[:len(x)], axis=0) - n1 * (n1 + 1) / 2
+    return u_stat, n1, n2, tie_sums(combined)
+
+
+def mann_whitney_p(u_stat, n1, n2, ties):
+    """``(U, p)`` of the two-sided test from ``rank_statistics``.
+
+    Normal approximation with tie and continuity corrections, as
+    ``mannwhitneyu(method='asymptotic')``.
+    """
+    from scipy import stats
+
+    n = n1 + n2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+        z = (np.maximum(u_stat, n1 * n2 - u_stat) - n1 * n2 / 2 - 0.5) / sigma
+    p_value = np.clip(2 * stats.norm.sf(z), 0, 1)
+    empty = (n1 == 0) | (n2 == 0)
+    return np.where(empty, np.nan, u_stat), np.where(empty, np.nan, p_value)
+
+
+def mann_whitney(x, y):
+    """Two-sided Mann-Whitney U of each column of ``x`` vs ``y``; ``U`` is the statistic of ``x``."""
+    return mann_whitney_p(*rank_statistics(x, y))
+
+
+def pairwise_tests(grouped):
+    """t-test and Mann-Whitney U for every metric and pair of groups."""
+    from scipy import stats
+
+    n, mean, var = grouped.moments()
+    frames = []
+    for i, j in grouped.pairs():
+        n1, n2 = n[i], n[j]
+        dof = n1 + n2 - 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pooled = ((n1 - 1) * var[i] + (n2 - 1) * var[j]) / dof
+            t_stat = (mean[i] - mean[j]) / np.sqrt(pooled * (1 / n1 + 1 / n2))
+        t_p = 2 * stats.t.sf(np.abs(t_stat), dof)
+        u_stat, u_p = mann_whitney_p(*grouped.rank_statistics(i, j))
+        frames.append(pd.DataFrame({
+            'metric': grouped.metrics,
+            'group_a': grouped.groups[i],
+            'group_b': grouped.groups[j],
+            'n_a': n1.astype(int),
+            'n_b': n2.astype(int),
+            'mean_diff': mean[i] - mean[j],
+            't': t_stat,
+            't_p_value': np.where(dof > 0, t_p, np.nan),
+            'U': u_stat,
+            'u_p_value': u_p,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=['metric', 'group_a', 'group_b', 'n_a', 'n_b', 'mean_diff',
+                                     't', 't_p_value', 'U', 'u_p_value'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def call(args):
+    """``function(*rest)`` for ``args = (function, *rest)`` (pool entry point)."""
+    function, *rest = args
+    return function(*rest)
+
+
+def resample_means(values, n_resamples, seed):
+    """Means of ``n_resamples`` bootstrap resamples of ``values``.
+
+    Each resample is a vector of draw counts per row, so a batch of
+    resamples is two matrix products instead of a gather of every value.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = len(values)
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    present = present.astype(float)
+    means = np.empty((n_resamples, values.shape[1]))
+    batch = max(1, BOOTSTRAP_BATCH_VALUES // n_rows)
+    for start in range(0, n_resamples, batch):
+        size = min(batch, n_resamples - start)
+        rows = rng.integers(0, n_rows, size=(size, n_rows)) + np.arange(size)[:, None] * n_rows
+        counts = np.bincount(rows.ravel(), minlength=size * n_rows).reshape(size, n_rows).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[start:start + size] = (counts @ filled) / (counts @ present)
+    return means
+
+
+def resample_bucket_means(rows, n, mean, var, n_resamples, seed):
+    """Bootstrap means of one group from its buckets (``GroupedBuckets``).
+
+    The draws landing in each bucket are multinomial over the bucket sizes,
+    and binomial among a metric's non-missing values, as when resampling the
+    rows. A bucket's sum over ``k`` draws is normal with mean ``k * mean``
+    and variance ``k * var``, so the resample's sum is one normal draw; with
+    one row per bucket the variances are 0 and this is the row bootstrap.
+    """
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(int(rows.sum()), rows / rows.sum(), size=n_resamples).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        present = np.where(rows[:, None] > 0, n / rows[:, None], 0.0)
+    means = np.empty((n_resamples, n.shape[1]))
+    for m in range(n.shape[1]):
+        counts = draws
+        if (present[:, m] < 1).any():
+            counts = rng.binomial(draws.astype(np.int64), present[:, m]).astype(float)
+        noise = np.sqrt(counts @ var[:, m]) * rng.standard_normal(n_resamples)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[:, m] = (counts @ mean[:, m] + noise) / counts.sum(axis=1)
+    return means
+
+
+def bootstrap_means(grouped, n_resamples=N_RESAMPLES, confidence=CONFIDENCE, seed=0, workers=1, executor=None):
+    """Bootstrap CIs of group means and pairwise mean differences.
+
+    Returns ``(group_cis, pair_cis)``: one row per group (or pair) and metric
+    with the observed value and the percentile interval. The resample chunks
+    run on ``executor`` when given; otherwise ``workers`` above 1 (or 0/None
+    for one per core) runs them in a process pool.
+    """
+    # (group, first resample, resamples) per task, each seeded from its position
+    resamplers = [grouped.resampler(i) for i in range(len(grouped.groups))]
+    tasks = [(i, start, min(BOOTSTRAP_CHUNK, n_resamples - start))
+             for i, resampler in enumerate(resamplers) if resampler is not None
+             for start in range(0, n_resamples, BOOTSTRAP_CHUNK)]
+    calls = [(resamplers[i][0], *resamplers[i][1], size, np.random.SeedSequence([seed, i, start]))
+             for i, start, size in tasks]
+
+    workers = min(resolve_workers(workers), max(len(tasks), 1))
+    if executor is not None:
+        results = list(executor.map(call, calls))
+    elif workers == 1:
+        results = [call(args) for args in calls]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(call, calls))
+
+    draws = np.full((len(grouped.groups), n_resamples, len(grouped.metrics)), np.nan)
+    for (i, start, size), means in zip(tasks, results):
+        draws[i, start:start + size] = means
+
+    _, observed, _ = grouped.moments()
+    quantiles = [(1 - confidence) / 2, (1 + confidence) / 2]
+
+    def interval(samples):
+        with warnings.catch_warnings():
+            # Metrics without data in a group have an all-NaN interval
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanquantile(samples, quantiles, axis=0)
+
+    group_cis = pd.DataFrame([
+        {'metric': metric, 'group': group, 'mean': observed[i, m], 'ci_low': low[m], 'ci_high': high[m]}
+        for i, group in enumerate(grouped.groups)
+        for low, high in [interval(draws[i])]
+        for m, metric in enumerate(grouped.metrics)
+    ], columns=['metric', 'group', 'mean', 'ci_low', 'ci_high'])
+    pair_cis = pd.DataFrame([
+        {'metric': metric, 'group_a': grouped.groups[i], 'group_b': grouped.groups[j],
+         'mean_diff': observed[i, m] - observed[j, m], 'ci_low': low[m], 'ci_high': high[m]}
+        for i, j in grouped.pairs()
+        for low, high in [interval(draws[i] - draws[j])]
+        for m, metric in enumerate(grouped.metrics)
+    ], columns=['metric', 'group_a', 'group_b', 'mean_diff', 'ci_low', 'ci_high'])
+    return group_cis, pair_cis
@@ -0,0 +1,297 @@
+"""Seeded synthetic versions of the project's data files, at any scale.
+
+Generates ``historical_data.csv`` (the raw trade export), ``fear_greed_index.csv``
+and ``daily_metrics.csv`` with the same columns and formats as the real files,
+so the notebook, ``pipeline.py`` and the dashboard run on them unchanged.
+Output is produced and written in chunks, so row counts from 10k to 100M fit
+in bounded memory; the same seed always produces the same files.
+
+    python synthetic_data.py --trades 1000000 --daily-metrics 1000000 --out-dir bench_data
+
+The values are random, not realistic: they exercise the data paths and their
+performance, not the analysis.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import (DAILY_METRICS_CSV, DAILY_METRICS_PARQUET, FEAR_GREED_CSV, FEAR_GREED_PARQUET,
+                        apply_schema, atomic_write, pq, write_segment_cuts)
+from pipeline import TIMESTAMP_FORMAT, add_segments
+from quantile_sketch import column_cuts
+from sentiment_calendar import SentimentCalendar, add_sentiment
+
+TRADES_CSV = 'historical_data.csv'
+
+# Span of the real Fear/Greed export (2018-02-01 onwards, one row per day)
+FEAR_GREED_START = '2018-02-01'
+FEAR_GREED_DAYS = 2644
+
+# Upper bound of each class on the 0-100 index
+SENTIMENT_BINS = [-1, 24, 46, 54, 75, 100]
+SENTIMENTS = ['Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed']
+
+COINS = ['BTC', 'ETH', 'SOL', 'HYPE', 'XRP', 'DOGE', '@107', 'kPEPE']
+COIN_PRICES = np.array([60_000.0, 3_000.0, 150.0, 25.0, 0.6, 0.15, 12.0, 0.01])
+DIRECTIONS = np.array(['Open Long', 'Close Long', 'Open Short', 'Close Short'])
+
+# Days of trading history, counted back from the end of the Fear/Greed index
+DEFAULT_DAYS = 730
+DEFAULT_CHUNKSIZE = 1_000_000
+# Rows generated up front to fix the segment cut-points for every chunk
+SEGMENT_PILOT_ROWS = 200_000
+
+EPOCH = pd.Timestamp('1970-01-01')
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype='S1')
+
+
+def hex_strings(rng, n, n_bytes):
+    """``n`` random ``0x``-prefixed hex strings of ``n_bytes`` bytes."""
+    raw = rng.integers(0, 256, (n, n_bytes), dtype=np.uint8)
+    digits = np.empty((n, 2 * n_bytes), dtype='S1')
+    digits[:, 0::2] = _HEX_DIGITS[raw >> 4]
+    digits[:, 1::2] = _HEX_DIGITS[raw & 15]
+    return np.char.add('0x', digits.view(f'S{2 * n_bytes}').ravel().astype(str))
+
+
+def account_ids(n_accounts, seed=42):
+    return hex_strings(np.random.default_rng([seed, 0]), n_accounts, 20)
+
+
+def fear_greed_index(n_days=FEAR_GREED_DAYS, start=FEAR_GREED_START, seed=42):
+    """Daily Fear/Greed index in the ``fear_greed_index.csv`` layout."""
+    rng = np.random.default_rng([seed, 1])
+    # Mean-reverting walk around 50, like the real index
+    noise = rng.normal(0, 7, n_days)
+    value = np.empty(n_days)
+    level = 50.0
+    for i in range(n_days):
+        level += 0.03 * (52 - level) + noise[i]
+        level = min(max(level, 1), 99)
+        value[i] = level
+    value = value.round().astype(int)
+
+    dates = pd.date_range(start, periods=n_days, freq='D')
+    return pd.DataFrame({
+        'timestamp': (dates - EPOCH) // pd.Timedelta(seconds=1),
+        'value': value,
+        'classification': pd.cut(value, SENTIMENT_BINS, labels=SENTIMENTS).astype(str),
+        'date': dates.strftime('%Y-%m-%d'),
+    })
+
+
+def trading_days(fear_greed_df, n_days=DEFAULT_DAYS):
+    """The last ``n_days`` dates of the index, as timestamps."""
+    return pd.to_datetime(fear_greed_df['date']).iloc[-n_days:].reset_index(drop=True)
+
+
+def trades(n_rows, accounts, days, seed=42, chunk=0):
+    """``n_rows`` raw trades in the ``historical_data.csv`` layout.
+
+    ``chunk`` selects an independent random stream, so chunks of one large
+    export can be generated separately and still be reproducible.
+    """
+    rng = np.random.default_rng([seed, 2, chunk])
+    coin = rng.integers(0, len(COINS), n_rows)
+    price = COIN_PRICES[coin] * rng.lognormal(0, 0.2, n_rows)
+    size_usd = rng.lognormal(7, 1.2, n_rows)
+    direction = DIRECTIONS[rng.integers(0, len(DIRECTIONS), n_rows)]
+    closing = np.char.startswith(direction, 'Close')
+    side = np.where(np.isin(direction, ['Open Long', 'Close Short']), 'BUY', 'SELL')
+
+    minutes = rng.integers(0, len(days) * 24 * 60, n_rows)
+    timestamps = days.iloc[0] + pd.to_timedelta(minutes, unit='min')
+    return pd.DataFrame({
+        'Account': accounts[rng.integers(0, len(accounts), n_rows)],
+        'Coin': np.asarray(COINS)[coin],
+        'Execution Price': price.round(6),
+        'Size Tokens': (size_usd / price).round(6),
+        'Size USD': size_usd.round(2),
+        'Side': side,
+        'Timestamp IST': timestamps.strftime(TIMESTAMP_FORMAT),
+        'Start Position': rng.normal(0, 5_000, n_rows).round(6),
+        'Direction': direction,
+        'Closed PnL': np.where(closing, rng.normal(5, 300, n_rows), 0.0).round(6),
+        'Transaction Hash': hex_strings(rng, n_rows, 32),
+        'Order ID': rng.integers(10**10, 10**11, n_rows),
+        'Crossed': rng.random(n_rows) < 0.6,
+        'Fee': (size_usd * 0.00035).round(6),
+        'Trade ID': rng.integers(10**14, 10**15, n_rows).astype(float),
+        # Export time in UTC milliseconds; 'Timestamp IST' is 5h30 ahead
+        'Timestamp': ((timestamps - pd.Timedelta(hours=5, minutes=30) - EPOCH) // pd.Timedelta(milliseconds=1)).astype(float),
+    })
+
+
+def iter_trades(n_rows, fear_greed_df, n_accounts=None, n_days=DEFAULT_DAYS, chunksize=DEFAULT_CHUNKSIZE, seed=42):
+    """Chunks of a raw trade export with ``n_rows`` trades in total."""
+    n_accounts = n_accounts or max(32, n_rows // 5_000)
+    accounts = account_ids(n_accounts, seed)
+    days = trading_days(fear_greed_df, n_days)
+    for chunk, start in enumerate(range(0, n_rows, chunksize)):
+        yield trades(min(chunksize, n_rows - start), accounts, days, seed, chunk)
+
+
+def _daily_rows(rng, accounts, dates, calendar):
+    """Daily metrics (before segments) for the given (account, date) keys."""
+    n_rows = len(dates)
+    num_trades = 1 + rng.negative_binomial(1, 0.05, n_rows)
+    winning_trades = rng.binomial(num_trades, rng.beta(4, 5, n_rows))
+    buys = rng.binomial(num_trades, 0.5)
+    avg_trade_size = rng.lognormal(7, 1.2, n_rows)
+    df = pd.DataFrame({
+        'account': accounts,
+        'date': dates.strftime('%Y-%m-%d'),
+        'total_pnl': rng.normal(0, 1, n_rows) * 150 * np.sqrt(num_trades) + 30 * (winning_trades - 0.4 * num_trades),
+        'num_trades': num_trades,
+        'winning_trades': winning_trades,
+        'avg_trade_size': avg_trade_size,
+        'avg_price': rng.lognormal(5, 2, n_rows),
+        'avg_position': rng.normal(0, 5_000, n_rows),
+        'total_fees': num_trades * avg_trade_size * 0.00035,
+        'win_rate': winning_trades / num_trades,
+        'long_short_ratio': buys / (num_trades - buys + 1),
+    })
+    return add_sentiment(df, calendar, dates=dates)
+
+
+def segment_pilot_cuts(fear_greed_df, n_days=DEFAULT_DAYS, seed=42):
+    """Segment cut-points from a fixed pilot sample, shared by every chunk."""
+    days = trading_days(fear_greed_df, n_days)
+    calendar = SentimentCalendar(fear_greed_df)
+    rng = np.random.default_rng([seed, 4])
+    pilot = _daily_rows(rng, account_ids(1, seed).repeat(SEGMENT_PILOT_ROWS),
+                        pd.DatetimeIndex(days.iloc[:1].repeat(SEGMENT_PILOT_ROWS)), calendar)
+    return column_cuts(pilot)
+
+
+def iter_daily_metrics(n_rows, fear_greed_df, n_accounts=None, n_days=DEFAULT_DAYS,
+                       chunksize=DEFAULT_CHUNKSIZE, seed=42, cuts=None):
+    """Chunks of a ``daily_metrics`` table with ``n_rows`` account-days.
+
+    Keys are unique (account, date) pairs in date order. Every chunk is
+    segmented at the same ``cuts`` (by default ``segment_pilot_cuts``).
+    """
+    days = trading_days(fear_greed_df, n_days)
+    n_accounts = n_accounts or max(32, -(-2 * n_rows // len(days)))
+    if n_rows > n_accounts * len(days):
+        raise ValueError(f"{n_rows:,} rows need more than {n_accounts:,} accounts over {len(days):,} days")
+    accounts = account_ids(n_accounts, seed)
+    calendar = SentimentCalendar(fear_greed_df)
+
+    cuts = cuts or segment_pilot_cuts(fear_greed_df, n_days, seed)
+
+    rng = np.random.default_rng([seed, 3])
+
+    # Rows per day, capped at one row per account
+    per_day = np.minimum(rng.multinomial(n_rows, np.full(len(days), 1 / len(days))), n_accounts)
+    shortfall = n_rows - per_day.sum()
+    while shortfall:
+        room = np.flatnonzero(per_day < n_accounts)
+        extra = rng.choice(room, min(shortfall, len(room)), replace=False)
+        per_day[extra] += 1
+        shortfall = n_rows - per_day.sum()
+
+    chunk_accounts, chunk_dates = [], []
+    pending = 0
+    for day, count in zip(days, per_day):
+        chunk_accounts.append(rng.choice(n_accounts, count, replace=False))
+        chunk_dates.append(np.full(count, day.to_datetime64()))
+        pending += count
+        if pending >= chunksize or day == days.iloc[-1]:
+            chunk = _daily_rows(rng, accounts[np.concatenate(chunk_accounts)],
+                                pd.DatetimeIndex(np.concatenate(chunk_dates)), calendar)
+            yield add_segments(chunk, cuts)
+            chunk_accounts, chunk_dates, pending = [], [], 0
+
+
+def daily_metrics(n_rows, fear_greed_df=None, seed=42, **kwargs):
+    """In-memory ``daily_metrics`` table (for benchmarks at moderate scale)."""
+    if fear_greed_df is None:
+        fear_greed_df = fear_greed_index(seed=seed)
+    return pd.concat(iter_daily_metrics(n_rows, fear_greed_df, seed=seed, **kwargs), ignore_index=True)
+
+
+def write_csv_chunks(path, chunks):
+    """Write a sequence of frames to one CSV atomically; returns the row count."""
+    rows = 0
+
+    def write(tmp_path):
+        nonlocal rows
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            rows += len(chunk)
+
+    atomic_write(path, write)
+    return rows
+
+
+def write_parquet_chunks(path, chunks):
+    """Write a sequence of frames to one typed Parquet file (needs pyarrow)."""
+    import pyarrow as pa
+
+    def write(tmp_path):
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(apply_schema(chunk), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    atomic_write(path, write)
+
+
+def write_dataset(out_dir='.', n_trades=0, n_daily_metrics=0, n_days=DEFAULT_DAYS,
+                  chunksize=DEFAULT_CHUNKSIZE, parquet=True, seed=42):
+    """Write the Fear/Greed index plus the requested trade and daily-metric files."""
+    os.makedirs(out_dir, exist_ok=True)
+    fear_greed_df = fear_greed_index(seed=seed)
+    atomic_write(os.path.join(out_dir, FEAR_GREED_CSV), lambda path: fear_greed_df.to_csv(path, index=False))
+    if parquet and pq is not None:
+        atomic_write(os.path.join(out_dir, FEAR_GREED_PARQUET),
+                     lambda path: apply_schema(fear_greed_df.copy()).to_parquet(path, index=False))
+
+    if n_trades:
+        write_csv_chunks(os.path.join(out_dir, TRADES_CSV),
+                         iter_trades(n_trades, fear_greed_df, n_days=n_days, chunksize=chunksize, seed=seed))
+
+    if n_daily_metrics:
+        cuts = segment_pilot_cuts(fear_greed_df, n_days, seed)
+        write_segment_cuts(cuts, out_dir)
+
+        def chunks():
+            return iter_daily_metrics(n_daily_metrics, fear_greed_df, n_days=n_days, chunksize=chunksize,
+                                      seed=seed, cuts=cuts)
+
+        write_csv_chunks(os.path.join(out_dir, DAILY_METRICS_CSV), chunks())
+        if parquet and pq is not None:
+            write_parquet_chunks(os.path.join(out_dir, DAILY_METRICS_PARQUET), chunks())
+    return fear_greed_df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write seeded synthetic copies of the project's data files.")
+    parser.add_argument('--out-dir', default='.', help="directory for the generated files")
+    parser.add_argument('--trades', type=int, default=0, help=f"rows of {TRADES_CSV} (0 = skip)")
+    parser.add_argument('--daily-metrics', type=int, default=0, help=f"rows of {DAILY_METRICS_CSV} (0 = skip)")
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help="days of trading history")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="rows generated per chunk")
+    parser.add_argument('--no-parquet', action='store_true', help="write only the CSV files")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    write_dataset(args.out_dir, args.trades, args.daily_metrics, args.days, args.chunksize,
+                  parquet=not args.no_parquet, seed=args.seed)
+    print(f"Wrote {FEAR_GREED_CSV}"
+          + (f", {args.trades:,} trades" if args.trades else "")
+          + (f", {args.daily_metrics:,} account-days" if args.daily_metrics else "")
+          + f" to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""Shared fixtures: small seeded datasets from ``synthetic_data``.
+
+The modules are flat scripts in the project folder (as the dashboard and
+benchmarks import them), so the folder goes on ``sys.path``.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import write_dataset  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def trades_dir(tmp_path_factory):
+    """``historical_data.csv`` and ``fear_greed_index.csv`` with 20,000 trades."""
+    data_dir = tmp_path_factory.mktemp('trades')
+    write_dataset(str(data_dir), n_trades=20_000, n_days=60)
+    return data_dir
+
+
+@pytest.fixture(scope='session')
+def store_dir(tmp_path_factory):
+    """A dashboard store (Parquet, CSV and segment cut-points) of 5,000 account-days."""
+    data_dir = tmp_path_factory.mktemp('store')
+    write_dataset(str(data_dir), n_daily_metrics=5_000, n_days=60)
+    return data_dir
@@ -0,0 +1,62 @@
+import datetime
+import importlib.util
+import os
+
+import pytest
+
+streamlit_testing = pytest.importorskip('streamlit.testing.v1')
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard.py')
+BACKENDS = ['pandas', pytest.param('duckdb', marks=pytest.mark.skipif(
+    importlib.util.find_spec('duckdb') is None, reason='duckdb not installed'))]
+
+
+@pytest.fixture
+def dashboard(store_dir, monkeypatch, request):
+    """An AppTest of the dashboard with every chart selected, run in the store's folder."""
+    monkeypatch.chdir(store_dir)
+    monkeypatch.setenv('DASHBOARD_QUERY_BACKEND', request.param)
+    # Wait for exact results, so every run renders the same way
+    monkeypatch.setenv('DASHBOARD_LATENCY_BUDGET_MS', '0')
+    app = streamlit_testing.AppTest.from_file(DASHBOARD, default_timeout=120)
+    app.session_state['show_all'] = True
+    app.run()
+    assert not app.exception, [e.value for e in app.exception]
+    return app
+
+
+def empty_states(app):
+    return [info.value for info in app.info if info.value.startswith('No data matches')]
+
+
+@pytest.mark.parametrize('dashboard', BACKENDS, indirect=True)
+def test_all_sections_render(dashboard):
+    assert not empty_states(dashboard)
+    assert dashboard.success, "the summary insights are missing"
+
+
+@pytest.mark.parametrize('dashboard', BACKENDS, indirect=True)
+def test_no_sentiment_selected(dashboard):
+    dashboard.multiselect[0].set_value([]).run()
+    assert not dashboard.exception, [e.value for e in dashboard.exception]
+    assert empty_states(dashboard)
+
+
+@pytest.mark.parametrize('dashboard', BACKENDS, indirect=True)
+def test_date_range_after_the_data(dashboard):
+    _, last_day = dashboard.date_input[0].value
+    dashboard.date_input[0].set_value((last_day + datetime.timedelta(days=10),
+                                       last_day + datetime.timedelta(days=20))).run()
+    assert not dashboard.exception, [e.value for e in dashboard.exception]
+    assert empty_states(dashboard)
+
+
+@pytest.mark.parametrize('dashboard', ['pandas'], indirect=True)
+def test_trends_downsample_to_the_chart_width(dashboard, monkeypatch):
+    assert not [c for c in dashboard.caption if 'downsampled' in c.value]
+    # 300 px wide: 70 points per line and 35 volume bars for the 60 days
+    monkeypatch.setenv('DASHBOARD_CHART_WIDTH_PX', '300')
+    dashboard.run()
+    assert not dashboard.exception, [e.value for e in dashboard.exception]
+    captions = [c.value for c in dashboard.caption if 'downsampled' in c.value]
+    assert captions and 'at most 70 points per line and 35 volume bars' in captions[0]
@@ -0,0 +1,22 @@
+import numpy as np
+
+from data_store import apply_schema
+from pnl_model import FEATURES, model_features, training_data
+from sentiment_calendar import SENTIMENT_FEATURES
+from synthetic_data import daily_metrics
+
+
+def test_sentiment_features_are_opt_in():
+    df = apply_schema(daily_metrics(5_000, seed=5))
+    # As before the first Extreme Fear day
+    df.loc[df.index[:400], 'days_since_extreme_fear'] = np.nan
+
+    features = model_features(df)
+    assert features == [f for f in FEATURES + ['leverage'] if f in df.columns]
+    X, _, _ = training_data(df, features)
+    # The same sample as the notebook's dropna() without the sentiment-window columns
+    assert X.index.equals(df.drop(columns=SENTIMENT_FEATURES).dropna(subset=features + ['total_pnl']).index)
+
+    with_sentiment = model_features(df, sentiment_features=True)
+    assert set(SENTIMENT_FEATURES) <= set(with_sentiment)
+    assert len(training_data(df, with_sentiment)[0]) < len(X)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from data_store import read_daily_metrics
+from filters import sort_by_date
+from progressive import MIN_STRATUM_ROWS, ExactResults, StratifiedSample, allocate
+from query_backend import PandasBackend
+
+AGGS = {'rows': 'sum', 'total_pnl': 'mean', 'win_rate': 'mean', 'num_trades': 'sum'}
+BY = ['classification', 'leverage_segment']
+
+
+@pytest.fixture(scope='module')
+def backend(store_dir):
+    return PandasBackend(sort_by_date(read_daily_metrics(str(store_dir))))
+
+
+def test_allocate_is_proportional_with_a_floor():
+    population = np.array([10, 100, 10_000, 89_890])
+    sampled = allocate(population, 1_000)
+    assert (sampled <= population).all()
+    assert sampled[0] == 10 and sampled[1] == MIN_STRATUM_ROWS
+    assert sampled[3] == pytest.approx(899, abs=1)
+
+
+def test_complete_sample_is_exact(backend):
+    sample = StratifiedSample.from_frame(backend.daily_metrics, n_rows=len(backend.daily_metrics))
+    assert sample.complete
+    lo, hi = backend.date_bounds()
+    selections, date_range = {'frequency_segment': ['Frequent']}, (lo, lo + (hi - lo) / 2)
+    estimate, error = sample.rollup(selections, date_range, AGGS, by=BY)
+    exact = backend.rollup(selections, date_range, AGGS, by=BY)
+    np.testing.assert_allclose(estimate[list(AGGS)].to_numpy(), exact[list(AGGS)].to_numpy(dtype=float))
+    assert (error.to_numpy() == 0).all()
+
+
+def test_error_bars_cover_the_exact_values(backend):
+    lo, hi = backend.date_bounds()
+    date_range = (lo, lo + (hi - lo) / 2)
+    exact = backend.rollup({}, date_range, AGGS, by=BY)[list(AGGS)]
+    covered = []
+    for seed in range(40):
+        estimate, error = StratifiedSample.from_frame(backend.daily_metrics, n_rows=1_000, seed=seed).rollup(
+            {}, date_range, AGGS, by=BY)
+        estimate, error = estimate.reindex(exact.index), error.reindex(exact.index)
+        covered.append(((exact - estimate).abs() <= error).to_numpy())
+    # Nominal 95%; the seeds are fixed
+    assert 0.88 <= np.mean(covered) <= 0.99
+
+
+def test_rollup_rejects_groupings_outside_the_strata(backend):
+    with pytest.raises(ValueError):
+        backend.sample.rollup({}, None, AGGS, by='date')
+
+
+def test_exact_results_time_out_and_keep_running():
+    import threading
+
+    release = threading.Event()
+    results = ExactResults(workers=1)
+    assert results.get('job', lambda: release.wait() and 42, timeout=0.01) is None
+    assert not results.done(['job'])
+    release.set()
+    assert results.get('job', lambda: pytest.fail('the running job is reused'), timeout=5) == 42
+    assert results.done(['job'])
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantile_sketch import DEFAULT_K, KLLSketch, cut_segment, sketch_chunks, sketch_column
+
+QS = np.linspace(0.01, 0.99, 99)
+# The largest error over 99 quantiles averages about 1.7 / k and stayed
+# under 1.3 / 100 across 40 seeds at k=200; the seeds below are fixed
+RANK_ERROR = 3 / DEFAULT_K
+
+
+def rank_error(values, sketch):
+    """Largest distance between each requested q and the rank range of its answer."""
+    ordered = np.sort(values)
+    answers = sketch.quantiles(QS)
+    below = np.searchsorted(ordered, answers, side='left') / len(ordered)
+    at_or_below = np.searchsorted(ordered, answers, side='right') / len(ordered)
+    # With ties an answer covers a range of ranks; q anywhere in it is exact
+    return np.max(np.maximum(below - QS, QS - at_or_below).clip(min=0))
+
+
+DISTRIBUTIONS = {
+    'normal': lambda rng, n: rng.normal(size=n),
+    'lognormal': lambda rng, n: rng.lognormal(sigma=2.0, size=n),
+    'counts': lambda rng, n: rng.poisson(3, size=n).astype(float),
+    'sorted': lambda rng, n: np.arange(n, dtype=float),
+}
+
+
+@pytest.mark.parametrize('name', DISTRIBUTIONS)
+def test_rank_error_within_bound(name):
+    values = DISTRIBUTIONS[name](np.random.default_rng(7), 300_000)
+    sketch = sketch_column(values, chunk=25_000)
+    assert sketch.n == len(values)
+    assert rank_error(values, sketch) <= RANK_ERROR
+    # A few hundred retained values, whatever the row count
+    assert len(sketch) < 4 * DEFAULT_K
+
+
+@pytest.mark.parametrize('name', DISTRIBUTIONS)
+def test_merged_shards_within_bound(name):
+    values = DISTRIBUTIONS[name](np.random.default_rng(11), 300_000)
+    shards = np.array_split(values, 8)
+    merged = KLLSketch(seed=0)
+    for i, shard in enumerate(shards):
+        merged.merge(sketch_column(shard, chunk=10_000, seed=i + 1))
+    assert merged.n == len(values)
+    assert rank_error(values, merged) <= RANK_ERROR
+
+
+def test_streamed_batches_match_the_whole_column():
+    values = np.random.default_rng(7).lognormal(size=50_000)
+    values[::13] = np.nan
+    expected = sketch_column(values, chunk=4_000)
+    # Batches smaller and larger than a chunk, not aligned to it
+    bounds = np.cumsum([0, 1_000, 2_048, 9_999, 3, 17_000])
+    batches = [values[lo:hi] for lo, hi in zip(bounds, list(bounds[1:]) + [len(values)])]
+    actual = sketch_chunks(batches, chunk=4_000)
+    assert actual.n == expected.n
+    np.testing.assert_array_equal(actual.quantiles(QS), expected.quantiles(QS))
+
+
+def test_small_input_is_exact():
+    values = np.random.default_rng(3).normal(size=DEFAULT_K // 2)
+    sketch = KLLSketch().update(np.append(values, np.nan))
+    assert sketch.n == len(values)
+    assert rank_error(values, sketch) == pytest.approx(0, abs=1e-12)
+    assert np.isnan(KLLSketch().quantiles([0.5])).all()
+
+
+def test_cut_segment_matches_qcut_at_exact_cuts():
+    values = pd.Series(np.random.default_rng(5).normal(size=10_001))
+    labels = ['Low', 'Medium', 'High']
+    cuts = values.quantile([1 / 3, 2 / 3]).to_numpy()
+    expected = pd.qcut(values, 3, labels=labels)
+    actual = cut_segment(values.where(values.index != 0), cuts, labels)
+    assert pd.isna(actual[0])
+    assert (np.asarray(actual[1:]) == np.asarray(expected[1:])).all()
@@ -0,0 +1,216 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from data_store import DAILY_METRICS_CSV, DAILY_METRICS_PARQUET, SEGMENT_CUTS_JSON, add_derived_segments, read_daily_metrics
+from filters import sort_by_date
+from query_backend import DuckDBBackend, PandasBackend
+from stat_tests import anova, bootstrap_means, pairwise_tests
+
+AGGS = {'rows': 'sum', 'total_pnl': 'mean', 'win_rate': 'mean', 'num_trades': 'sum'}
+GROUPINGS = [None, 'classification', 'leverage_segment', ['classification', 'frequency_segment'], 'date']
+
+
+@pytest.fixture(scope='module')
+def pandas_backend(store_dir):
+    return PandasBackend(sort_by_date(read_daily_metrics(str(store_dir))))
+
+
+@pytest.fixture(scope='module')
+def backends(pandas_backend, store_dir):
+    pytest.importorskip('duckdb')
+    return pandas_backend, DuckDBBackend(str(store_dir))
+
+
+def filter_states(backend):
+    lo, hi = backend.date_bounds()
+    middle = lo + (hi - lo) / 2
+    return [
+        ({}, None),
+        ({'classification': ['Fear', 'Greed']}, (lo, middle)),
+        ({'leverage_segment': ['High Leverage'], 'frequency_segment': ['Infrequent']}, (middle, hi)),
+        # A single day, both ends inclusive
+        ({}, (middle.normalize(), middle.normalize())),
+        ({'classification': []}, None),
+    ]
+
+
+def plain_index(frame):
+    """``frame`` with its group labels as plain strings (the backends' index dtypes differ)."""
+    frame = frame.copy()
+    if not len(frame):
+        frame.index = pd.RangeIndex(0)
+    elif frame.index.nlevels == 1:
+        frame.index = pd.Index([str(key) for key in frame.index])
+    else:
+        frame.index = pd.MultiIndex.from_tuples([tuple(map(str, key)) for key in frame.index])
+    return frame
+
+
+def groupby_rollup(df, selections, date_range, by):
+    """The pandas groupby the cube roll-ups replace, over the filtered rows."""
+    mask = pd.Series(True, index=df.index)
+    for col, selected in selections.items():
+        mask &= df[col].isin(selected)
+    if date_range is not None:
+        mask &= df['date'].between(*date_range)
+    named = {col: (col, how) for col, how in AGGS.items() if col != 'rows'}
+    if by is None:
+        filtered = df[mask]
+        return {'rows': len(filtered), **{col: filtered[col].agg(how) for col, (_, how) in named.items()}}
+    grouped = df[mask].groupby(by, observed=True)
+    return grouped.agg(rows=('date', 'size'), **named)[list(AGGS)]
+
+
+@pytest.mark.parametrize('by', GROUPINGS, ids=str)
+def test_cube_rollups_match_groupby(pandas_backend, by):
+    df = pandas_backend.daily_metrics
+    for selections, date_range in filter_states(pandas_backend):
+        expected = groupby_rollup(df, selections, date_range, by)
+        actual = pandas_backend.rollup(selections, date_range, AGGS, by)
+        if by is None:
+            assert actual['rows'] == expected['rows']
+            for col in AGGS:
+                assert actual[col] == pytest.approx(expected[col], nan_ok=True)
+        else:
+            tm.assert_frame_equal(plain_index(actual[list(AGGS)]), plain_index(expected),
+                                  check_dtype=False, check_index_type=False)
+
+
+def test_overview_and_options_agree(backends):
+    pandas_backend, duckdb_backend = backends
+    expected, actual = pandas_backend.overview(), duckdb_backend.overview()
+    assert actual.keys() == expected.keys()
+    for key in expected:
+        assert actual[key] == pytest.approx(expected[key])
+    assert pandas_backend.date_bounds() == duckdb_backend.date_bounds()
+    for col in ['classification', 'leverage_segment', 'frequency_segment']:
+        assert pandas_backend.options(col) == duckdb_backend.options(col)
+
+
+@pytest.mark.parametrize('by', GROUPINGS, ids=str)
+def test_rollups_agree(backends, by):
+    pandas_backend, duckdb_backend = backends
+    for selections, date_range in filter_states(pandas_backend):
+        expected = pandas_backend.rollup(selections, date_range, AGGS, by)
+        actual = duckdb_backend.rollup(selections, date_range, AGGS, by)
+        if by is None:
+            assert actual['rows'] == expected['rows']
+            for col in AGGS:
+                assert actual[col] == pytest.approx(expected[col], nan_ok=True)
+        else:
+            # Same groups in the same order (segments low to high), same values
+            tm.assert_frame_equal(plain_index(actual[list(AGGS)]), plain_index(expected[list(AGGS)]),
+                                  check_dtype=False, check_index_type=False)
+
+
+def test_box_stats_agree(backends):
+    pandas_backend, duckdb_backend = backends
+    for by in ['classification', 'leverage_segment']:
+        for selections, date_range in filter_states(pandas_backend):
+            expected = pandas_backend.box_stats(selections, date_range, 'total_pnl', by)
+            actual = duckdb_backend.box_stats(selections, date_range, 'total_pnl', by)
+            assert list(map(str, actual.index)) == list(map(str, expected.index))
+            columns = ['count', 'mean', 'q1', 'median', 'q3', 'lowerfence', 'upperfence']
+            np.testing.assert_allclose(actual[columns].to_numpy(dtype=float), expected[columns].to_numpy(dtype=float))
+
+
+def test_rows_and_accounts_agree(backends):
+    pandas_backend, duckdb_backend = backends
+    for selections, date_range in filter_states(pandas_backend):
+        expected = pandas_backend.rows(selections, date_range, columns=['account', 'date', 'total_pnl'])
+        actual = duckdb_backend.rows(selections, date_range, columns=['account', 'date', 'total_pnl'])
+        assert len(actual) == len(expected)
+        key = ['date', 'account']
+        tm.assert_frame_equal(
+            actual.astype({'account': str}).sort_values(key, ignore_index=True),
+            expected.astype({'account': str}).sort_values(key, ignore_index=True),
+            check_dtype=False)
+
+    account = pandas_backend.find_accounts('', limit=1)[0]
+    assert duckdb_backend.find_accounts(account[:10]) == pandas_backend.find_accounts(account[:10])
+    expected, actual = pandas_backend.account_history(account), duckdb_backend.account_history(account)
+    np.testing.assert_allclose(actual['total_pnl'].to_numpy(dtype=float), expected['total_pnl'].to_numpy(dtype=float))
+    assert (pd.to_datetime(actual['date']).to_numpy() == pd.to_datetime(expected['date']).to_numpy()).all()
+
+
+def test_significance_stats_agree(backends):
+    stats = pytest.importorskip('scipy.stats')
+    pandas_backend, duckdb_backend = backends
+    for selections, date_range in filter_states(pandas_backend):
+        expected = pandas_backend.significance_stats(selections, date_range)
+        actual = duckdb_backend.significance_stats(selections, date_range)
+        assert list(map(str, actual.groups)) == list(map(str, expected.groups))
+        # The tests only need the group moments and rank statistics: the same from buckets as from rows
+        tm.assert_frame_equal(anova(actual), anova(expected), check_dtype=False)
+        tm.assert_frame_equal(pairwise_tests(actual).astype({'group_a': str, 'group_b': str}),
+                              pairwise_tests(expected).astype({'group_a': str, 'group_b': str}), check_dtype=False)
+
+    grouped = pandas_backend.significance_stats({}, None)
+    x, y = grouped.group(0)[:, 0], grouped.group(1)[:, 0]
+    x, y = x[~np.isnan(x)], y[~np.isnan(y)]
+    row = pairwise_tests(grouped).iloc[0]
+    assert row['metric'] == grouped.metrics[0]
+    assert (row['U'], row['u_p_value']) == pytest.approx(tuple(stats.mannwhitneyu(x, y, method='asymptotic')))
+    assert (row['t'], row['t_p_value']) == pytest.approx(tuple(stats.ttest_ind(x, y)))
+
+    # The bucket bootstrap resamples like the row bootstrap, up to Monte-Carlo noise
+    expected, _ = bootstrap_means(grouped, 1000)
+    with ThreadPoolExecutor(2) as pool:
+        actual, _ = bootstrap_means(duckdb_backend.significance_stats({}, None), 1000, executor=pool)
+    width = (expected['ci_high'] - expected['ci_low']).to_numpy()
+    for end in ['ci_low', 'ci_high']:
+        assert (np.abs(actual[end] - expected[end]).to_numpy() < 0.2 * width).all()
+
+
+@pytest.mark.parametrize('sort_col, ascending', [
+    ('classification', True), ('leverage_segment', False), ('num_trades', True), ('date', False), (None, True)])
+def test_pages_agree_through_ties(backends, sort_col, ascending):
+    pandas_backend, duckdb_backend = backends
+    lo, hi = pandas_backend.date_bounds()
+    selections, date_range = {'frequency_segment': ['Frequent']}, (lo, lo + (hi - lo) / 2)
+    page_size = 97
+    pages = {}
+    for backend in backends:
+        frames, page, total = [], 0, None
+        while total is None or page * page_size < total:
+            frame, total, _ = backend.page(selections, date_range, page, page_size, sort_col, ascending)
+            frames.append(frame[['date', 'account']].astype({'account': str}).reset_index(drop=True))
+            page += 1
+        pages[backend.name] = pd.concat(frames, ignore_index=True)
+    # Every row exactly once, in the same order
+    assert not pages['pandas'].duplicated().any()
+    assert len(pages['pandas']) == total
+    tm.assert_frame_equal(pages['duckdb'], pages['pandas'], check_dtype=False)
+
+
+@pytest.mark.parametrize('fmt, stored_cuts', [('parquet', True), ('parquet', False), ('csv', False)])
+def test_segments_derived_alike_without_segment_columns(store_dir, tmp_path, fmt, stored_cuts):
+    pytest.importorskip('duckdb')
+    legacy = pd.read_parquet(store_dir / DAILY_METRICS_PARQUET).drop(columns=['leverage_segment', 'frequency_segment'])
+    if fmt == 'parquet':
+        legacy.to_parquet(tmp_path / DAILY_METRICS_PARQUET, index=False)
+    else:
+        legacy.to_csv(tmp_path / DAILY_METRICS_CSV, index=False)
+    if stored_cuts:
+        shutil.copy(store_dir / SEGMENT_CUTS_JSON, tmp_path / SEGMENT_CUTS_JSON)
+    assert os.path.exists(tmp_path / SEGMENT_CUTS_JSON) == stored_cuts
+
+    # As the dashboard's read_data() loads it: segments first, then date order
+    pandas_backend = PandasBackend(sort_by_date(add_derived_segments(read_daily_metrics(str(tmp_path)), str(tmp_path))))
+    duckdb_backend = DuckDBBackend(str(tmp_path))
+    for by in ['leverage_segment', 'frequency_segment', ['leverage_segment', 'frequency_segment']]:
+        expected = pandas_backend.rollup({}, None, {'rows': 'sum'}, by)
+        actual = duckdb_backend.rollup({}, None, {'rows': 'sum'}, by)
+        tm.assert_frame_equal(plain_index(actual), plain_index(expected), check_dtype=False, check_index_type=False)
+    # Row by row, not just the counts
+    columns = ['account', 'date', 'leverage_segment', 'frequency_segment']
+    key = ['date', 'account']
+    tm.assert_frame_equal(
+        duckdb_backend.rows({}, None, columns).astype(str).sort_values(key, ignore_index=True),
+        pandas_backend.rows({}, None, columns).astype(str).sort_values(key, ignore_index=True))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from pipeline import finalize_daily_metrics, normalize_trades, partial_aggregates
+from sentiment_calendar import SENTIMENT_COLUMNS, SENTIMENT_FEATURES, SentimentCalendar, add_sentiment
+from synthetic_data import fear_greed_index
+
+
+def fear_greed_with_gaps():
+    fear_greed_df = fear_greed_index(n_days=120, seed=3)
+    # Missing days, and a repeated date (the first row wins, as drop_duplicates)
+    fear_greed_df = fear_greed_df.drop(index=[10, 11, 50]).reset_index(drop=True)
+    return pd.concat([fear_greed_df, fear_greed_df.iloc[[20]].assign(value=0)], ignore_index=True)
+
+
+def test_lookup_matches_notebook_merge():
+    fear_greed_df = fear_greed_with_gaps()
+    dates = pd.to_datetime(fear_greed_df['date'])
+    rng = np.random.default_rng(0)
+    # Days inside, between and outside the index, and missing dates
+    offsets = rng.integers(-5, 130, size=2_000)
+    rows = pd.DataFrame({'date': dates.min() + pd.to_timedelta(offsets, unit='D')})
+    rows.loc[::97, 'date'] = pd.NaT
+
+    sentiment_dates = fear_greed_df[['date', 'classification', 'value']].drop_duplicates('date')
+    sentiment_dates = sentiment_dates.assign(date=pd.to_datetime(sentiment_dates['date']))
+    expected = rows.merge(sentiment_dates, on='date', how='left')
+
+    actual = add_sentiment(rows.copy(), SentimentCalendar(fear_greed_df), ['classification', 'value'])
+    tm.assert_series_equal(actual['classification'].astype(object), expected['classification'].astype(object),
+                           check_names=False)
+    np.testing.assert_array_equal(actual['value'].to_numpy(dtype=float), expected['value'].to_numpy(dtype=float))
+
+
+def test_window_features_match_pandas():
+    fear_greed_df = fear_greed_with_gaps().drop_duplicates('date')
+    calendar = SentimentCalendar(fear_greed_df)
+    daily = fear_greed_df.assign(date=pd.to_datetime(fear_greed_df['date'])).set_index('date').asfreq('D')
+
+    expected_mean = daily['value'].rolling('7D', min_periods=1).mean()
+    expected_ewm = daily['value'].ewm(halflife=7, ignore_na=True).mean()
+    looked_up = calendar.lookup(daily.index, SENTIMENT_FEATURES)
+    np.testing.assert_allclose(looked_up['sentiment_7d_mean'], expected_mean.to_numpy(), rtol=1e-6)
+    np.testing.assert_allclose(looked_up['sentiment_ewm'], expected_ewm.to_numpy(), rtol=1e-6)
+
+    extreme = (daily['classification'] == 'Extreme Fear').to_numpy()
+    last = pd.Series(np.where(extreme, np.arange(len(daily)), np.nan)).ffill().to_numpy()
+    np.testing.assert_allclose(looked_up['days_since_extreme_fear'], np.arange(len(daily)) - last)
+
+    classified = daily['classification'].dropna()
+    changed = (classified != classified.shift()) & classified.shift().notna()
+    np.testing.assert_array_equal(looked_up['regime_change'], changed.reindex(daily.index, fill_value=False).to_numpy())
+
+
+def test_finalize_accepts_calendar_or_fear_greed_frame(trades_dir):
+    # The notebook has passed both forms
+    trades = normalize_trades(pd.read_csv(trades_dir / 'historical_data.csv', nrows=2_000))
+    fear_greed_df = pd.read_csv(trades_dir / 'fear_greed_index.csv')
+    partials = partial_aggregates(trades)
+
+    from_calendar = finalize_daily_metrics(partials, SentimentCalendar(fear_greed_df))
+    from_frame = finalize_daily_metrics(partials, fear_greed_df)
+    tm.assert_frame_equal(from_frame, from_calendar)
+    assert set(SENTIMENT_COLUMNS) <= set(from_calendar.columns)
+    assert from_calendar['classification'].notna().all()
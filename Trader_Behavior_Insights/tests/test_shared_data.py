@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from data_store import apply_schema
+from shared_data import load_shared, shared_path
+from synthetic_data import daily_metrics
+
+pytest.importorskip('pyarrow')
+
+
+def mapped_ranges(path):
+    """Address ranges where ``path`` is memory-mapped in this process."""
+    ranges = []
+    with open('/proc/self/maps') as maps:
+        for line in maps:
+            fields = line.split()
+            if fields[-1] == path:
+                lo, hi = fields[0].split('-')
+                ranges.append((int(lo, 16), int(hi, 16)))
+    return ranges
+
+
+def column_array(values):
+    """The numpy array behind a column (a categorical's codes)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.array.codes
+    return values.to_numpy()
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/maps'), reason='needs /proc/self/maps (Linux)')
+def test_shared_tables_map_every_column_without_copies(tmp_path):
+    df = apply_schema(daily_metrics(5_000, seed=3))
+    df.loc[::7, 'long_short_ratio'] = np.nan
+    df.loc[::11, 'days_since_extreme_fear'] = np.nan
+    assert (df.dtypes == bool).any()
+
+    for _ in range(2):  # published, then mapped from the existing file
+        shared = load_shared(str(tmp_path), 'v1', ['daily_metrics'], lambda: {'daily_metrics': df})['daily_metrics']
+        tm.assert_frame_equal(shared, df)
+        ranges = mapped_ranges(shared_path(str(tmp_path), 'daily_metrics', 'v1'))
+        copied = [col for col in shared.columns
+                  if not any(lo <= column_array(shared[col]).ctypes.data < hi for lo, hi in ranges)]
+        assert not copied
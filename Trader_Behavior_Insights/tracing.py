@@ -0,0 +1,127 @@
+"""Opt-in timing of the dashboard's hot path.
+
+Each script run (or fragment rerun) gets a ``RunTrace``. The dashboard
+wraps data loading, the filter block and every chart section in
+``trace.stage(...)``, which records the stage's duration together with the
+rows going in and out and the size of the payload sent to the browser. When
+the run ends, the trace is appended to the log as one JSON line:
+
+    {"ts": "...", "session": "3f9c1a2b", "kind": "run", "total_ms": 412.7,
+     "stages": [{"stage": "load_data", "ms": 3.1, "rows_in": null, "rows_out": 211224, ...}, ...]}
+
+Set ``DASHBOARD_TRACE=1`` to enable it (``DASHBOARD_TRACE_LOG`` changes the
+file, ``dashboard_log.txt`` by default). ``stage_percentiles`` summarizes a
+session's traces for the dashboard's hidden timing panel.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+TRACE_LOG = 'dashboard_log.txt'
+
+# Sessions run in separate threads but share the log file
+_log_lock = threading.Lock()
+
+
+def tracing_enabled():
+    return os.environ.get('DASHBOARD_TRACE', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def trace_log_path():
+    return os.environ.get('DASHBOARD_TRACE_LOG', TRACE_LOG)
+
+
+def _plain(value):
+    """numpy scalars (row counts from the backends) as plain Python numbers."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def write_trace(record, path=None):
+    line = json.dumps(record, default=str, ensure_ascii=False)
+    with _log_lock:
+        with open(path or trace_log_path(), 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+class RunTrace:
+    def __init__(self, session_id, kind='run', enabled=True, log_path=None):
+        self.session_id = session_id
+        self.kind = kind
+        self.enabled = enabled
+        self.log_path = log_path
+        self.stages = []
+        self.current = None
+        self.finished = False
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Time the enclosed block as one stage; ``note()`` adds fields to it."""
+        if not self.enabled:
+            yield
+            return
+        record = {'stage': name, 'ms': None, 'rows_in': _plain(rows_in), 'rows_out': None, 'payload_bytes': None}
+        outer, self.current = self.current, record
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record['ms'] = round((time.perf_counter() - start) * 1000, 3)
+            self.current = outer
+            self.stages.append(record)
+
+    def note(self, **fields):
+        """Set fields on the open stage; ``payload_bytes`` accumulates."""
+        if self.current is None:
+            return
+        payload = fields.pop('payload_bytes', None)
+        if payload is not None:
+            self.current['payload_bytes'] = (self.current['payload_bytes'] or 0) + int(payload)
+        self.current.update({key: _plain(value) for key, value in fields.items()})
+
+    def finish(self):
+        """Close the trace and log it; returns the record (None if disabled)."""
+        if self.finished or not self.enabled:
+            self.finished = True
+            return None
+        self.finished = True
+        record = {
+            'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'session': self.session_id,
+            'kind': self.kind,
+            'total_ms': round((time.perf_counter() - self.start) * 1000, 3),
+            'stages': self.stages,
+        }
+        if self.log_path:
+            write_trace(record, self.log_path)
+        return record
+
+
+def stage_percentiles(records):
+    """Per-stage ``{stage: {'runs', 'p50_ms', 'p95_ms', ...}}`` over trace records."""
+    durations = {}
+    last = {}
+    for record in records:
+        for stage in record['stages']:
+            durations.setdefault(stage['stage'], []).append(stage['ms'])
+            last[stage['stage']] = stage
+        durations.setdefault('total', []).append(record['total_ms'])
+
+    summary = {}
+    for name, values in durations.items():
+        p50, p95 = np.percentile(values, [50, 95])
+        stage = last.get(name, {})
+        summary[name] = {
+            'runs': len(values),
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'rows_in': stage.get('rows_in'),
+            'rows_out': stage.get('rows_out'),
+            'payload_bytes': stage.get('payload_bytes'),
+        }
+    return summary
@@ -0,0 +1,99 @@
+"""Per-trader history: an account index and rolling statistics.
+
+``AccountIndex`` is built once per dataset. It keeps the row positions of
+``daily_metrics`` ordered by (account, date) plus each account's range in
+that order, so one trader's rows are a slice of the permutation instead of
+a scan of the whole table. ``daily_metrics`` itself stays in date order for
+the filter engine.
+
+``rolling_stats`` computes the drill-down's series for one account with
+cumulative-sum kernels: trailing calendar-day windows of PnL, trades and
+win rate are differences of prefix sums at ``searchsorted`` window starts,
+and drawdown is the cumulative PnL minus its running maximum.
+"""
+import numpy as np
+import pandas as pd
+
+ROLLING_WINDOWS = [7, 30, 90]
+HISTORY_COLUMNS = ['date', 'total_pnl', 'num_trades', 'winning_trades', 'win_rate', 'classification']
+
+
+class AccountIndex:
+    def __init__(self, accounts):
+        accounts = pd.Categorical(accounts)
+        self.accounts = accounts.categories
+        # Rows are in date order, so a stable sort by account keeps each
+        # account's rows in date order too
+        self.order = np.argsort(accounts.codes, kind='stable').astype(np.int64)
+        counts = np.bincount(accounts.codes[accounts.codes >= 0], minlength=len(self.accounts))
+        self.starts = np.concatenate([[0], np.cumsum(counts)]) + (accounts.codes < 0).sum()
+
+    @property
+    def nbytes(self):
+        return self.order.nbytes + self.starts.nbytes
+
+    def positions(self, account):
+        """Row positions of ``account`` in date order (empty if unknown)."""
+        code = self.accounts.get_indexer([account])[0]
+        if code < 0:
+            return self.order[:0]
+        return self.order[self.starts[code]:self.starts[code + 1]]
+
+    def search(self, text, limit=50):
+        """Accounts containing ``text`` (case-insensitive), at most ``limit``."""
+        accounts = pd.Series(self.accounts)
+        if text:
+            accounts = accounts[accounts.str.contains(text, case=False, regex=False)]
+        return accounts.head(limit).tolist()
+
+
+def _window_sum(prefix, starts):
+    """Sums over rows ``[starts[i], i]`` from a prefix sum with a leading 0."""
+    return prefix[1:] - prefix[starts]
+
+
+def rolling_stats(history, window):
+    """Rolling, cumulative and drawdown series for one account's history.
+
+    ``history`` holds the account's rows in date order. Windows cover the
+    trailing ``window`` calendar days including the current one; the rolling
+    win rate is trade-weighted (winning trades / trades in the window).
+    """
+    dates = history['date'].to_numpy(dtype='datetime64[ns]')
+    pnl = np.nan_to_num(history['total_pnl'].to_numpy(dtype=float))
+    trades = np.nan_to_num(history['num_trades'].to_numpy(dtype=float))
+    wins = np.nan_to_num(history['winning_trades'].to_numpy(dtype=float))
+
+    starts = np.searchsorted(dates, dates - np.timedelta64(window, 'D'), side='right')
+    pnl_prefix = np.concatenate([[0.0], np.cumsum(pnl)])
+    trade_prefix = np.concatenate([[0.0], np.cumsum(trades)])
+    win_prefix = np.concatenate([[0.0], np.cumsum(wins)])
+
+    cumulative = pnl_prefix[1:]
+    # Peak including the zero starting balance, so an initial loss is a drawdown
+    peak = np.maximum.accumulate(np.maximum(cumulative, 0.0))
+    window_trades = _window_sum(trade_prefix, starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        window_win_rate = _window_sum(win_prefix, starts) / window_trades
+
+    return pd.DataFrame({
+        'date': history['date'].to_numpy(),
+        'rolling_pnl': _window_sum(pnl_prefix, starts),
+        'rolling_trades': window_trades,
+        'rolling_win_rate': np.where(window_trades > 0, window_win_rate, np.nan),
+        'cumulative_pnl': cumulative,
+        'drawdown': cumulative - peak,
+    })
+
+
+def account_summary(history, stats):
+    """Headline numbers for the drill-down."""
+    return {
+        'days': len(history),
+        'first_day': history['date'].min(),
+        'last_day': history['date'].max(),
+        'total_pnl': stats['cumulative_pnl'].iloc[-1] if len(stats) else 0.0,
+        'max_drawdown': stats['drawdown'].min() if len(stats) else 0.0,
+        'win_rate': history['winning_trades'].sum() / max(history['num_trades'].sum(), 1),
+        'trades': int(history['num_trades'].sum()),
+    }